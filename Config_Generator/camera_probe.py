@@ -0,0 +1,330 @@
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from typing import List, NamedTuple, Optional
+
+# Frame rate the replay is recorded at, the mode picked for a camera is
+# the best one that reaches it
+TARGET_FPS = 60
+PROBE_TIMEOUT = 10.0
+SYSFS_VIDEO4LINUX = "/sys/class/video4linux"
+
+# v4l2 fourcc -> ffmpeg input format name
+FOURCC_FORMATS = {
+    "MJPG": "mjpeg",
+    "JPEG": "mjpeg",
+    "YUYV": "yuyv422",
+    "UYVY": "uyvy422",
+    "NV12": "nv12",
+    "YU12": "yuv420p",
+    "H264": "h264",
+}
+COMPRESSED_FORMATS = {"mjpeg", "h264"}
+
+
+class CameraMode(NamedTuple):
+    """One capture mode, fps is 0 when the probe could not tell."""
+
+    pixel_format: str
+    width: int
+    height: int
+    fps: float
+
+    @property
+    def compressed(self) -> bool:
+        return self.pixel_format in COMPRESSED_FORMATS
+
+
+def ffmpeg_exe() -> str:
+    import imageio_ffmpeg
+
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def run_ffmpeg(args: List[str]) -> str:
+    """Run ffmpeg and return its log output (it lists devices on stderr)."""
+    result = subprocess.run(
+        [ffmpeg_exe(), "-hide_banner", *args],
+        capture_output=True,
+        text=True,
+        timeout=PROBE_TIMEOUT,
+    )
+    return result.stderr
+
+
+# --- Device enumeration ---
+
+
+def list_cameras() -> List[dict]:
+    """
+    Cameras on this machine, as dicts with "name", "camera_path" (what
+    ffmpeg opens) and "identity" (stable across reboots and replugs).
+    """
+    if sys.platform == "win32":
+        return parse_dshow_devices(
+            run_ffmpeg(
+                ["-list_devices", "true", "-f", "dshow", "-i", "dummy"]
+            )
+        )
+    if sys.platform == "darwin":
+        return parse_avfoundation_devices(
+            run_ffmpeg(
+                ["-list_devices", "true", "-f", "avfoundation", "-i", '""']
+            )
+        )
+    return list_v4l2_cameras()
+
+
+def parse_dshow_devices(output: str) -> List[dict]:
+    cameras = []
+    video_devices_found = False
+    lines = output.split("\n")
+    for i, line in enumerate(lines):
+        # Older ffmpeg builds head the lists with a section line, newer
+        # ones tag each device with (video) or (audio)
+        if "DirectShow video devices" in line:
+            video_devices_found = True
+            continue
+        if "DirectShow audio devices" in line:
+            break
+        is_video = video_devices_found or line.rstrip().endswith("(video)")
+        if not is_video or '"' not in line or "Alternative name" in line:
+            continue
+
+        camera_name = line.split('"')[1]
+        # The next line carries the device path
+        if i + 1 < len(lines) and "Alternative name" in lines[i + 1]:
+            camera_path = lines[i + 1].split('"')[1]
+            cameras.append(
+                {
+                    "name": camera_name,
+                    "camera_path": camera_path,
+                    "identity": camera_path,
+                }
+            )
+    return cameras
+
+
+def parse_avfoundation_devices(output: str) -> List[dict]:
+    cameras = []
+    for line in output.split("\n"):
+        if "AVFoundation audio devices" in line:
+            break
+        match = re.search(r"\] \[(\d+)\] (.+)$", line)
+        if match and not match.group(2).startswith("Capture screen"):
+            index, name = match.groups()
+            cameras.append(
+                {
+                    "name": name.strip(),
+                    "camera_path": index,
+                    "identity": f"avfoundation:{name.strip()}",
+                }
+            )
+    return cameras
+
+
+def list_v4l2_cameras(sysfs_root: str = SYSFS_VIDEO4LINUX) -> List[dict]:
+    """
+    V4L2 capture devices from sysfs. A UVC camera registers a second
+    metadata node (index 1), only the first node of each device is kept.
+    """
+    cameras = []
+    nodes = glob.glob(os.path.join(sysfs_root, "video*"))
+    for node in sorted(nodes, key=lambda n: int(n.rsplit("video", 1)[1])):
+        if _read_sysfs(node, "index") not in (None, "0"):
+            continue
+        device = os.path.realpath(os.path.join(node, "device"))
+        cameras.append(
+            {
+                "name": _read_sysfs(node, "name") or os.path.basename(node),
+                "camera_path": f"/dev/{os.path.basename(node)}",
+                "identity": _usb_identity(device) or device,
+            }
+        )
+    return cameras
+
+
+def _read_sysfs(directory: str, name: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, name), "r") as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+def _usb_identity(device: str) -> Optional[str]:
+    """vendor:product[:serial] of the USB device a node belongs to."""
+    path = device
+    while path and path != os.path.dirname(path):
+        vendor = _read_sysfs(path, "idVendor")
+        if vendor:
+            identity = f"usb:{vendor}:{_read_sysfs(path, 'idProduct')}"
+            serial = _read_sysfs(path, "serial")
+            # Without a serial, tell identical cameras apart by USB port
+            return f"{identity}:{serial or os.path.basename(path)}"
+        path = os.path.dirname(path)
+    return None
+
+
+# --- Mode probing ---
+
+
+def probe_modes(camera: dict) -> List[CameraMode]:
+    """Supported resolutions, frame rates and pixel formats of a camera."""
+    path = camera["camera_path"]
+    if sys.platform == "win32":
+        return parse_dshow_options(
+            run_ffmpeg(
+                [
+                    "-list_options",
+                    "true",
+                    "-f",
+                    "dshow",
+                    "-i",
+                    f"video={camera['name']}",
+                ]
+            )
+        )
+    if sys.platform == "darwin":
+        # avfoundation only lists modes after a failed open, not reliably
+        return []
+    v4l2_ctl = shutil.which("v4l2-ctl")
+    if v4l2_ctl:
+        result = subprocess.run(
+            [v4l2_ctl, "--list-formats-ext", "-d", path],
+            capture_output=True,
+            text=True,
+            timeout=PROBE_TIMEOUT,
+        )
+        return parse_v4l2_ctl_formats(result.stdout)
+    # ffmpeg lists formats and sizes but no frame rates
+    return parse_ffmpeg_v4l2_formats(
+        run_ffmpeg(["-f", "v4l2", "-list_formats", "all", "-i", path])
+    )
+
+
+def parse_dshow_options(output: str) -> List[CameraMode]:
+    """
+    Parse lines like
+      vcodec=mjpeg  min s=1920x1080 fps=5 max s=1920x1080 fps=60
+      pixel_format=yuyv422  min s=640x480 fps=5 max s=640x480 fps=30
+    """
+    modes = set()
+    pattern = re.compile(
+        r"(?:vcodec|pixel_format)=(\w+)\s+min s=\d+x\d+ fps=[\d.]+"
+        r"\s+max s=(\d+)x(\d+) fps=([\d.]+)"
+    )
+    for match in pattern.finditer(output):
+        pixel_format, width, height, fps = match.groups()
+        modes.add(
+            CameraMode(pixel_format, int(width), int(height), float(fps))
+        )
+    return sorted(modes, key=mode_rank, reverse=True)
+
+
+def parse_v4l2_ctl_formats(output: str) -> List[CameraMode]:
+    """Parse the output of v4l2-ctl --list-formats-ext."""
+    modes = set()
+    pixel_format = size = None
+    for line in output.split("\n"):
+        format_match = re.search(r"\[\d+\]: '(\w+)'", line)
+        size_match = re.search(r"Size: \w+ (\d+)x(\d+)", line)
+        fps_match = re.search(r"\(([\d.]+) fps\)", line)
+        if format_match:
+            fourcc = format_match.group(1)
+            pixel_format = FOURCC_FORMATS.get(fourcc, fourcc.lower())
+        elif size_match:
+            size = (int(size_match.group(1)), int(size_match.group(2)))
+        elif fps_match and pixel_format and size:
+            modes.add(CameraMode(pixel_format, *size, float(fps_match[1])))
+    return sorted(modes, key=mode_rank, reverse=True)
+
+
+def parse_ffmpeg_v4l2_formats(output: str) -> List[CameraMode]:
+    """
+    Parse lines like
+      [video4linux2,v4l2 @ 0x..] Compressed: mjpeg : Motion-JPEG : 1280x720
+    """
+    modes = set()
+    # The description may contain colons too ("YUYV 4:2:2")
+    pattern = re.compile(r"(?:Compressed|Raw)\s*:\s*(\w+)\s*:(.*)")
+    for match in pattern.finditer(output):
+        pixel_format, sizes = match.groups()
+        for width, height in re.findall(r"(\d+)x(\d+)", sizes):
+            modes.add(CameraMode(pixel_format, int(width), int(height), 0.0))
+    return sorted(modes, key=mode_rank, reverse=True)
+
+
+def mode_rank(mode: CameraMode, target_fps: float = TARGET_FPS) -> tuple:
+    """
+    Sort key, best mode last. Modes that reach the target frame rate win,
+    then the largest frame, then the higher frame rate. On a tie MJPEG is
+    preferred, a raw mode at that size usually saturates USB 2.
+    """
+    return (
+        mode.fps >= target_fps,
+        mode.width * mode.height,
+        mode.fps,
+        mode.compressed,
+    )
+
+
+def best_mode(
+    modes: List[CameraMode], target_fps: float = TARGET_FPS
+) -> Optional[CameraMode]:
+    """
+    The mode to record with: the largest that reaches target_fps, or the
+    fastest one if none does.
+    """
+    fast_enough = [mode for mode in modes if mode.fps >= target_fps]
+    if fast_enough:
+        return max(fast_enough, key=lambda m: mode_rank(m, target_fps))
+    if not modes:
+        return None
+    return max(modes, key=lambda m: (m.fps, m.width * m.height, m.compressed))
+
+
+# --- Cache ---
+
+
+def load_mode_cache(path: str) -> dict:
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_mode_cache(path: str, cache: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(cache, file, indent=4)
+
+
+def discover_cameras(cache_file: str, refresh: bool = False) -> List[dict]:
+    """
+    Enumerate the cameras and attach their probed "modes" and "best_mode".
+    Modes are cached by device identity, so only new cameras (or all of
+    them with refresh=True) are probed. Blocking, run it off the GUI
+    thread.
+    """
+    cache = {} if refresh else load_mode_cache(cache_file)
+    cameras = list_cameras()
+    for camera in cameras:
+        cached = cache.get(camera["identity"])
+        if cached is None:
+            try:
+                modes = probe_modes(camera)
+            except (OSError, subprocess.SubprocessError) as e:
+                print(f"Failed to probe {camera['name']}:\n {e}")
+                modes = []
+            cached = [mode._asdict() for mode in modes]
+            cache[camera["identity"]] = cached
+        camera["modes"] = [CameraMode(**mode) for mode in cached]
+        camera["best_mode"] = best_mode(camera["modes"])
+    save_mode_cache(cache_file, cache)
+    return cameras
@@ -1,34 +1,49 @@
 import sys
 import os
-import subprocess
-import imageio_ffmpeg
+import threading
 import json
+from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtWidgets import (
     QApplication,
     QWidget,
     QComboBox,
     QFormLayout,
+    QLabel,
     QPushButton,
 )
 
+from camera_probe import discover_cameras
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_DIR = os.path.join(SCRIPT_DIR, "..", "RePoste", "config")
+# Probed camera modes, keyed by device identity
+CAMERA_CACHE_FILE = os.path.join(CONFIG_DIR, "camera_modes_cache.json")
+
+
+class CameraSearch(QObject):
+    """Hands the cameras found on a worker thread to the GUI thread."""
+
+    finished = pyqtSignal(list)
+
 
 class Config_Generator(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Config Generator")
-        self.setFixedSize(500, 160)
+        self.setFixedSize(500, 220)
 
         self.cam_combo_box = QComboBox()
         self.audio_combo_box = QComboBox()
+        self.mode_label = QLabel()
 
         gui_layout = QFormLayout()
 
-        # Get all cameras on device
-        self.all_cameras = self.Get_Cameras()
-
-        # Add cameras to dropdown
-        for camera in self.all_cameras:
-            self.cam_combo_box.addItem(camera["name"])
+        # Cameras are enumerated and probed in the background, probing
+        # runs ffmpeg for each camera and would block the window
+        self.all_cameras = []
+        self.camera_search = CameraSearch()
+        self.camera_search.finished.connect(self.Set_Cameras)
+        self.cam_combo_box.currentIndexChanged.connect(self.Show_Mode)
 
         # NOTE: Add back if window size is not fixed. Will expand dropdowns to
         # fill the window
@@ -41,12 +56,18 @@ class Config_Generator(QWidget):
 
         self.generate_button = QPushButton("Generate Config")
         self.generate_button.clicked.connect(self.Generate_Config)
+        self.refresh_button = QPushButton("Refresh Cameras")
+        self.refresh_button.clicked.connect(
+            lambda: self.Find_Cameras(refresh=True)
+        )
 
         gui_layout.addRow("Select camera", self.cam_combo_box)
+        gui_layout.addRow("Capture mode", self.mode_label)
         gui_layout.addRow("Select microphone", self.audio_combo_box)
-        gui_layout.addWidget(self.generate_button)
+        gui_layout.addRow(self.refresh_button, self.generate_button)
 
         self.setLayout(gui_layout)
+        self.Find_Cameras()
 
         self.setStyleSheet(
             """
@@ -98,65 +119,50 @@ class Config_Generator(QWidget):
         """
         )
 
-    def Get_Cameras(self):
-        cameras_list = []
-        # TODO: Add Mac command later
+    def Get_Cameras(self, refresh=False):
+        """Cameras with their probed modes (blocking, see Find_Cameras)."""
+        # TODO: Probe Mac capture modes
         try:
-            video_devices_found = False
-            ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
-            # print(f"FFmpeg path: {ffmpeg_path}")
-
-            if sys.platform == "win32":
-                command = [
-                    ffmpeg_path,
-                    "-list_devices",
-                    "true",
-                    "-f",
-                    "dshow",
-                    "-i",
-                    "dummy",
-                ]
-
-            command_result = subprocess.run(
-                command, capture_output=True, text=True
-            )
-            output = command_result.stderr
-            # print(output)
-
-            # Go through each line and extract camera info
-            lines = output.split("\n")
-            for i, line in enumerate(lines):
-                # Check for DirectShow video devices section in ffmpeg
-                if "DirectShow video devices" in line:
-                    video_devices_found = True
-                    continue
-
-                if video_devices_found:
-                    # Find lines with camera names by ('"')
-                    # (may not be robust)
-                    if '"' in line:
-                        camera_name = line.split('"')[1]
-
-                        # Check the next line for the camera path
-                        if i + 1 < len(lines) and '"' in lines[i + 1]:
-                            camera_path = lines[i + 1].split('"')[1]
-
-                            # Append the camera info to the list
-                            cameras_list.append(
-                                {
-                                    "name": camera_name,
-                                    "camera_path": camera_path,
-                                }
-                            )
-
-                    # When at "DirectShow audio devices", stop processing
-                    if "DirectShow audio devices" in line:
-                        break
-            # print(cameras_list)
-
+            return discover_cameras(CAMERA_CACHE_FILE, refresh)
         except Exception as e:
             print(f"Failed to get cameras:\n {e}")
-        return cameras_list
+            return []
+
+    def Find_Cameras(self, refresh=False):
+        """Enumerate the cameras on a worker thread."""
+        self.cam_combo_box.clear()
+        self.cam_combo_box.addItem("Searching for cameras...")
+        self.cam_combo_box.setEnabled(False)
+        self.generate_button.setEnabled(False)
+
+        def search():
+            self.camera_search.finished.emit(self.Get_Cameras(refresh))
+
+        threading.Thread(target=search, daemon=True).start()
+
+    def Set_Cameras(self, cameras):
+        self.all_cameras = cameras
+        self.cam_combo_box.clear()
+        # Add cameras to dropdown
+        for camera in self.all_cameras:
+            self.cam_combo_box.addItem(camera["name"])
+        self.cam_combo_box.setEnabled(bool(cameras))
+        self.generate_button.setEnabled(bool(cameras))
+        if not cameras:
+            self.cam_combo_box.addItem("No cameras found")
+
+    def Show_Mode(self, index):
+        if not 0 <= index < len(self.all_cameras):
+            self.mode_label.setText("")
+            return
+        mode = self.all_cameras[index]["best_mode"]
+        if mode is None:
+            self.mode_label.setText("Unknown, camera default")
+        else:
+            fps = f"{mode.fps:g} fps" if mode.fps else "fps unknown"
+            self.mode_label.setText(
+                f"{mode.width}x{mode.height} {mode.pixel_format} {fps}"
+            )
 
     def Generate_Config(self):
         # Get the selected camera
@@ -173,20 +179,27 @@ class Config_Generator(QWidget):
         )
 
         if selected_camera:
-            # Get the camera path
+            # Get the camera path and the mode to record with
             camera_data = {
                 "name": selected_camera["name"],
                 "camera_path": selected_camera["camera_path"],
             }
+            # dshow and avfoundation cameras are opened by listed index
+            camera_path = selected_camera["camera_path"]
+            camera_data["index"] = (
+                int(camera_path)
+                if camera_path.isdigit()
+                else self.all_cameras.index(selected_camera)
+            )
+            mode = selected_camera["best_mode"]
+            if mode is not None:
+                camera_data["mode"] = mode._asdict()
 
             # Create a config file and write the camera data to it
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            root_dir = os.path.abspath(os.path.join(script_dir, "../"))
-            config_dir = os.path.join(root_dir, "RePoste/config/")
-            os.makedirs(config_dir, exist_ok=True)
+            os.makedirs(CONFIG_DIR, exist_ok=True)
 
             # Write and save config file in RePoste directory
-            config_file_path = os.path.join(config_dir, "camera_config.json")
+            config_file_path = os.path.join(CONFIG_DIR, "camera_config.json")
             with open(config_file_path, "w") as config_file:
                 json.dump(camera_data, config_file, indent=4)
         else:
@@ -0,0 +1,202 @@
+"""
+Microbenchmarks for the SFS-Link decoder and ScoreboardWidget updates, and
+an end-to-end benchmark that replays simulated SFS-Link traffic through
+ScoreboardManager into a ScoreboardWidget.
+
+Run from the RePoste directory:
+    python benchmark_scoreboard.py
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import timeit
+
+from scoreboard_state import (
+    decode_bcd,
+    decode_sfs_link_payload,
+    parse_lamp_bits,
+    parse_matches_and_priorities,
+    parse_penalty_bits,
+)
+from scoring_backends import (
+    FaveroBackend,
+    SfsLinkBackend,
+    encode_favero_frame,
+)
+
+PAYLOAD = b"06125602140A38"
+ITERATIONS = 100_000
+
+
+def legacy_parse(payload: bytes) -> dict:
+    """The original string slicing parser, kept here for comparison."""
+    hex_str = payload.decode("ascii", errors="ignore").strip()
+    # fmt: off
+    hex_pairs = [hex_str[i:i+2] for i in range(0, 14, 2)]
+    # fmt: on
+    values = [int(pair, 16) for pair in hex_pairs]
+    return {
+        "right_score": decode_bcd(values[0]),
+        "left_score": decode_bcd(values[1]),
+        "seconds": f"{decode_bcd(values[2]):02}",
+        "minutes": f"{decode_bcd(values[3]):02}",
+        "lamp_bits": parse_lamp_bits(values[4]),
+        "match_bits": parse_matches_and_priorities(values[5]),
+        "penalty": parse_penalty_bits(values[6]),
+    }
+
+
+def time_per_call(stmt) -> float:
+    """Best of five runs, in nanoseconds per call."""
+    best = min(timeit.repeat(stmt, number=ITERATIONS, repeat=5))
+    return best / ITERATIONS * 1e9
+
+
+def run() -> dict:
+    previous = decode_sfs_link_payload(PAYLOAD, 1.0)
+    current = decode_sfs_link_payload(PAYLOAD, 2.0)
+    # Alternate two frames so the backends never drop a duplicate
+    sfs_link = SfsLinkBackend()
+    sfs_stream = [PAYLOAD + b"\r\n", b"06125702140A38\r\n"]
+    favero = FaveroBackend()
+    favero_stream = [encode_favero_frame(6, 12), encode_favero_frame(7, 12)]
+    return {
+        "legacy_parse_ns": time_per_call(lambda: legacy_parse(PAYLOAD)),
+        "decode_payload_ns": time_per_call(
+            lambda: decode_sfs_link_payload(PAYLOAD)
+        ),
+        "state_compare_ns": time_per_call(lambda: previous == current),
+        "state_hash_ns": time_per_call(lambda: hash(current)),
+        "sfs_link_feed_ns": time_per_call(
+            lambda: sfs_link.feed(sfs_stream.reverse() or sfs_stream[0])
+        ),
+        "favero_feed_ns": time_per_call(
+            lambda: favero.feed(favero_stream.reverse() or favero_stream[0])
+        ),
+    }
+
+
+def run_widget() -> dict:
+    """Cost of ScoreboardWidget updates on the GUI thread."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from gui import ScoreboardWidget
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    widget = ScoreboardWidget(None)
+    lit = decode_sfs_link_payload(b"06125602140A38").lamps
+    dark = decode_sfs_link_payload(b"06125602000A38").lamps
+    toggle = [lit, dark]
+    return {
+        "unchanged_lamps_ns": time_per_call(lambda: widget.set_lamps(lit)),
+        "toggle_lamps_ns": time_per_call(
+            lambda: widget.set_lamps(toggle.reverse() or toggle[0])
+        ),
+        "clock_tick_ns": time_per_call(lambda: widget.set_clock(2, 56)),
+    }
+
+
+def run_end_to_end(
+    rates=(100, 250, 500, 1000, 2000, 5000),
+    seconds: float = 2.0,
+    budget_ms: float = 50.0,
+) -> dict:
+    """
+    Replay a trace where every payload differs at each rate and measure
+    the time from payload receipt to the ScoreboardWidget repaint. Paints
+    coalesce, so a sample is taken from the oldest update not yet painted.
+    A rate is sustainable if every update reached the GUI thread and the
+    p99 latency stayed within budget_ms.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QEvent, QObject
+    from PyQt6.QtWidgets import QApplication
+    from gui import ScoreboardWidget
+    from scoreboard_manager import ScoreboardManager
+    from scoreboard_transport import SimulatedTransport, stress_trace
+    from worker_utils import LatencyStats
+
+    class PaintProbe(QObject):
+        def __init__(self):
+            super().__init__()
+            self.delivered = 0
+            self.oldest_unpainted = None
+            self.latency = LatencyStats(maxlen=None)
+
+        def on_state(self, state):
+            self.delivered += 1
+            if self.oldest_unpainted is None:
+                self.oldest_unpainted = state.timestamp
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and self.oldest_unpainted:
+                self.latency.add(time.monotonic() - self.oldest_unpainted)
+                self.oldest_unpainted = None
+            return False
+
+    app = QApplication.instance() or QApplication([])
+    results = {"budget_ms": budget_ms, "rates": {}, "max_sustainable_hz": 0}
+    for rate in rates:
+        trace = stress_trace(int(rate * seconds), rate)
+        transport = SimulatedTransport(trace)
+        manager = ScoreboardManager(transport=transport)
+        widget = ScoreboardWidget(manager)
+        widget.show()
+        probe = PaintProbe()
+        manager.state_updated.connect(probe.on_state)
+        widget.right_score_label.installEventFilter(probe)
+
+        manager.running = True
+        started = time.perf_counter()
+        worker = threading.Thread(
+            target=lambda: asyncio.run(manager._run_session())
+        )
+        worker.start()
+        while worker.is_alive():
+            app.processEvents()
+        elapsed = time.perf_counter() - started
+        # Let the GUI thread drain what is still queued
+        deadline = time.perf_counter() + 1.0
+        while time.perf_counter() < deadline:
+            app.processEvents()
+            if probe.delivered >= manager.emitted_count:
+                app.processEvents()
+                break
+
+        p99_ms = probe.latency.p99() * 1000
+        complete = probe.delivered >= manager.emitted_count
+        sustainable = complete and p99_ms <= budget_ms
+        results["rates"][rate] = {
+            "achieved_hz": transport.sent_count / elapsed,
+            "emitted": manager.emitted_count,
+            "delivered": probe.delivered,
+            "paints": len(probe.latency.samples),
+            "avg_ms": probe.latency.mean() * 1000,
+            "p99_ms": p99_ms,
+            "sustainable": sustainable,
+        }
+        if sustainable:
+            results["max_sustainable_hz"] = rate
+        widget.close()
+    return results
+
+
+if __name__ == "__main__":
+    # Per-update INFO logging to the console would dominate the timings
+    logging.disable(logging.INFO)
+    for name, value in {**run(), **run_widget()}.items():
+        print(f"{name:>20}: {value:8.0f}")
+
+    end_to_end = run_end_to_end()
+    print(f"\nPayload to repaint (budget {end_to_end['budget_ms']} ms):")
+    for rate, result in end_to_end["rates"].items():
+        print(
+            f"{rate:>6} Hz: achieved {result['achieved_hz']:7.0f} Hz, "
+            f"avg {result['avg_ms']:6.2f} ms, p99 {result['p99_ms']:6.2f} ms,"
+            f" {result['paints']} paints"
+            f"{'' if result['sustainable'] else '  (not sustainable)'}"
+        )
+    print(f"Max sustainable rate: {end_to_end['max_sustainable_hz']} Hz")
@@ -1,4 +1,8 @@
 import os
+import logging
+import time
+from concurrent.futures import Future
+from datetime import datetime
 from PyQt6.QtWidgets import (
     QSizePolicy,
     QMainWindow,
@@ -8,30 +12,224 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QHBoxLayout,
 )
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QFont, QIcon
+from PyQt6.QtCore import (
+    QObject,
+    QPoint,
+    QRect,
+    Qt,
+    QSize,
+    QTimer,
+    pyqtSignal,
+)
+from PyQt6.QtGui import (
+    QColor,
+    QFont,
+    QFontDatabase,
+    QGuiApplication,
+    QIcon,
+    QImage,
+    QPainter,
+    QPixmap,
+)
 
-from video_manager import VideoRecorder
+from memory_governor import MemoryGovernor, PRESSURE_CHECK_INTERVAL_MS
+from mjpeg_stream import MjpegBroadcaster
+from perf_counters import (
+    HUD_INTERVAL_MS,
+    FrameCounters,
+    HudSampler,
+    format_hud,
+    hud_alerts,
+)
+from remote_control import DEFAULT_HOST, RemoteControlServer
+from scoreboard_state import LampState, MatchState, PenaltyState
+from shutdown import ShutdownCoordinator
+from tracing import traced, tracer
+from video_manager import ProcessVideoRecorder, VideoRecorder
 from settings import SettingsWindow
 
+logger = logging.getLogger("reposte.gui")
+
+# Per-component shutdown deadlines (seconds), within SHUTDOWN_BUDGET
+REMOTE_STOP_BUDGET = 0.02
+CAPTURE_STOP_BUDGET = 0.05
+REPLAY_FLUSH_BUDGET = 0.13
+SCOREBOARD_STOP_BUDGET = 0.3
+# Fastest replay a remote client may ask for
+MAX_REMOTE_REPLAY_SPEED = 4.0
+# Size of the audience window's scoreboard, relative to the operator's
+AUDIENCE_SCOREBOARD_SCALE = 2.5
+
+NO_LAMPS = dict.fromkeys(LampState._fields, False)
+NO_CARDS = dict.fromkeys(PenaltyState._fields, False)
+FIRST_MATCH = {
+    "num_matches": 1,
+    "right_priority": False,
+    "left_priority": False,
+}
+
+# Shared colour instances for the lamp and card lights. Lights compare
+# colours by identity, so an unchanged light costs nothing to "update".
+LIGHT_COLORS = {
+    "green": QColor("green"),
+    "red": QColor("red"),
+    "white": QColor("white"),
+    "yellow": QColor("yellow"),
+}
+
+
+class GuiCalls(QObject):
+    """Runs functions handed over from other threads on the GUI thread."""
+
+    requested = pyqtSignal(object, object)  # function, Future
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.requested.connect(self._run)
+
+    def call(self, function) -> Future:
+        """Queue function for the GUI thread, a Future of its result."""
+        future = Future()
+        self.requested.emit(function, future)
+        return future
+
+    def _run(self, function, future):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function())
+        except Exception as e:
+            future.set_exception(e)
+
+
+class TracedLabel(QLabel):
+    """A QLabel whose repaints are recorded as trace spans."""
+
+    def __init__(self, text="", span_name="paint label", parent=None):
+        super().__init__(text, parent)
+        self.span_name = span_name
+
+    def paintEvent(self, event):
+        with tracer.span(self.span_name):
+            super().paintEvent(event)
+
+
+class VideoFeed(TracedLabel):
+    """The video view, counting the frames it paints and skips."""
+
+    def __init__(self, parent=None):
+        super().__init__(span_name="paint video", parent=parent)
+        # Replaced by the recorder's counters once it exists
+        self.counters = FrameCounters()
+        # Capture time of the frame waiting to be painted, None if painted
+        self._pending_capture_ns = None
+
+    def show_frame(self, pixmap, captured_ns: int = 0):
+        """Show pixmap, captured at captured_ns (0 for replayed frames)."""
+        if self._pending_capture_ns is not None:
+            self.counters.skipped += 1
+        self._pending_capture_ns = captured_ns
+        self.setPixmap(pixmap)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._pending_capture_ns is not None:
+            self.counters.frame_displayed(
+                self._pending_capture_ns, time.perf_counter_ns()
+            )
+            self._pending_capture_ns = None
+
+
+class PerfHud(QLabel):
+    """
+    Overlay of the capture, display, buffer, encode and scoreboard
+    figures, refreshed from the components' counters while it is shown.
+    """
+
+    STYLE = (
+        "background-color: rgba(0, 0, 0, 170); color: {color};"
+        "border-radius: 6px; padding: 6px;"
+    )
+
+    def __init__(self, sampler, parent=None):
+        super().__init__(parent)
+        self.sampler = sampler
+        self.alerting = False
+        self.setFont(
+            QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont)
+        )
+        self.setStyleSheet(self.STYLE.format(color="#ffffff"))
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.move(10, 10)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+            return
+        # The first sample starts the rates off, they show from the next
+        self.show_stats(self.sampler.sample())
+        self.show()
+        self.raise_()
+        self.timer.start(HUD_INTERVAL_MS)
+
+    def refresh(self):
+        self.show_stats(self.sampler.sample())
+
+    def show_stats(self, stats):
+        alerting = bool(hud_alerts(stats))
+        if alerting != self.alerting:
+            self.alerting = alerting
+            color = "#ffcc00" if alerting else "#ffffff"
+            self.setStyleSheet(self.STYLE.format(color=color))
+        self.setText(format_hud(stats))
+        self.adjustSize()
+
+
+class IndicatorLight(QWidget):
+    """
+    A lamp or penalty card light, painted directly with QPainter.
+    Switching colour schedules an update() instead of restyling the widget.
+    """
+
+    def __init__(self, radius: int, size: int = 30, parent=None):
+        super().__init__(parent)
+        self.radius = radius
+        self.color = None
+        self.setFixedSize(size, size)
+
+    def set_color(self, color):
+        if color is self.color:
+            return
+        self.color = color
+        self.update()
+
+    @traced("paint light")
+    def paintEvent(self, event):
+        if self.color is None:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.color)
+        painter.drawRoundedRect(self.rect(), self.radius, self.radius)
+        painter.end()
+
 
 class ScoreboardWidget(QWidget):
-    def __init__(self, scoreboard_manager):
+    def __init__(self, scoreboard_manager, scale: float = 1.0):
         super().__init__()
         self.scoreboard_manager = scoreboard_manager
+        # Size of the text and lights, 1 for the operator's window
+        self.scale = scale
+        # Last valid minutes, kept when the scoreboard sends a bad value
+        self.minutes = 3
         self.init_ui()
-
-    # (keep the rest of init_ui and update_from_data)
-
-    def get_hit_style(self, color):
-        if color == "green":
-            return "background: green; border-radius: 15px;"
-        elif color == "red":
-            return "background: red; border-radius: 15px;"
-        elif color == "white":
-            return "background: white; border-radius: 15px;"
-        else:
-            return "background: transparent; border-radius: 15px;"
+        if scoreboard_manager is not None:
+            self.connect_to_manager(scoreboard_manager)
 
     def init_ui(self):
         self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
@@ -40,77 +238,54 @@ class ScoreboardWidget(QWidget):
             "border-radius: 12px; padding: 10px;"
         )
 
-        font = QFont("Segoe UI", 24, QFont.Weight.Bold)
-        font.setLetterSpacing(QFont.SpacingType.AbsoluteSpacing, 1)
+        scale = self.scale
+        font = QFont("Segoe UI", round(24 * scale), QFont.Weight.Bold)
+        font.setLetterSpacing(QFont.SpacingType.AbsoluteSpacing, scale)
+        light_size = round(30 * scale)
 
         # --- Left side ---
-        self.left_red_flag = QLabel()
-        self.left_red_flag.setFixedSize(30, 30)
-        self.left_red_flag.setStyleSheet(
-            "border-radius: 8px; background: transparent;"
-        )
+        self.left_red_flag = IndicatorLight(round(8 * scale), light_size)
 
-        self.left_yellow_flag = QLabel()
-        self.left_yellow_flag.setFixedSize(30, 30)
-        self.left_yellow_flag.setStyleSheet(
-            "border-radius: 8px; background: transparent;"
-        )
+        self.left_yellow_flag = IndicatorLight(round(8 * scale), light_size)
 
         # --- Right side ---
-        self.right_red_flag = QLabel()
-        self.right_red_flag.setFixedSize(30, 30)
-        self.right_red_flag.setStyleSheet(
-            "border-radius: 8px; background: transparent;"
-        )
+        self.right_red_flag = IndicatorLight(round(8 * scale), light_size)
 
-        self.right_yellow_flag = QLabel()
-        self.right_yellow_flag.setFixedSize(30, 30)
-        self.right_yellow_flag.setStyleSheet(
-            "border-radius: 8px; background: transparent;"
-        )
+        self.right_yellow_flag = IndicatorLight(round(8 * scale), light_size)
 
-        self.left_score_label = QLabel("0")
+        self.left_score_label = TracedLabel("0", "paint scoreboard")
         self.left_score_label.setFont(font)
         self.left_score_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.left_score_label.setStyleSheet("color: #ffffff;")
 
-        self.right_score_label = QLabel("0")
+        self.right_score_label = TracedLabel("0", "paint scoreboard")
         self.right_score_label.setFont(font)
         self.right_score_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.right_score_label.setStyleSheet("color: #ffffff;")
 
-        self.timer_label = QLabel("3:00")
+        self.timer_label = TracedLabel("3:00", "paint scoreboard")
         self.timer_label.setFont(font)
         self.timer_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.timer_label.setStyleSheet("color: #ffffff;")
 
-        self.match_indicator = QLabel("1")
+        self.match_indicator = TracedLabel("1", "paint scoreboard")
         self.match_indicator.setFont(font)
         self.match_indicator.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.match_indicator.setStyleSheet("color: #ffffff;")
 
-        # Left flag area
-        left_flag_layout = QVBoxLayout()
-        left_flag_layout.addWidget(self.left_red_flag)
-        left_flag_layout.addWidget(self.left_yellow_flag)
-
-        # Right flag area
-        right_flag_layout = QVBoxLayout()
-        right_flag_layout.addWidget(self.right_red_flag)
-        right_flag_layout.addWidget(self.right_yellow_flag)
+        # Shown until the scoreboard session is up
+        self.status_label = QLabel("Connecting to scoreboard...")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.status_label.setStyleSheet("color: #ffffff;")
 
         # --- Left hit indicator ---
-        self.left_hit_indicator = QLabel()
-        self.left_hit_indicator.setFixedSize(30, 30)
-        self.left_hit_indicator.setStyleSheet(
-            "border-radius: 15px; background: transparent;"
+        self.left_hit_indicator = IndicatorLight(
+            round(15 * scale), light_size
         )
 
         # --- Right hit indicator ---
-        self.right_hit_indicator = QLabel()
-        self.right_hit_indicator.setFixedSize(30, 30)
-        self.right_hit_indicator.setStyleSheet(
-            "border-radius: 15px; background: transparent;"
+        self.right_hit_indicator = IndicatorLight(
+            round(15 * scale), light_size
         )
 
         # --- Left flag area (add hit indicator here) ---
@@ -118,14 +293,14 @@ class ScoreboardWidget(QWidget):
         left_flag_layout.addWidget(self.left_hit_indicator)
         left_flag_layout.addWidget(self.left_red_flag)
         left_flag_layout.addWidget(self.left_yellow_flag)
-        left_flag_layout.setSpacing(35)
+        left_flag_layout.setSpacing(round(35 * scale))
 
         # --- Right flag area (add hit indicator here) ---
         right_flag_layout = QVBoxLayout()
         right_flag_layout.addWidget(self.right_hit_indicator)
         right_flag_layout.addWidget(self.right_red_flag)
         right_flag_layout.addWidget(self.right_yellow_flag)
-        right_flag_layout.setSpacing(35)
+        right_flag_layout.setSpacing(round(35 * scale))
 
         # Score row layout
         score_row = QHBoxLayout()
@@ -143,119 +318,243 @@ class ScoreboardWidget(QWidget):
         main_layout.addWidget(
             self.match_indicator, alignment=Qt.AlignmentFlag.AlignCenter
         )
+        main_layout.addWidget(
+            self.status_label, alignment=Qt.AlignmentFlag.AlignCenter
+        )
 
         self.setLayout(main_layout)
 
+    def connect_to_manager(self, scoreboard_manager):
+        """
+        Show what the manager already has (e.g. for a window opened mid
+        bout), then follow its per-field delta signals.
+        """
+        # Subscribed first, so an update published while the current
+        # state is read still arrives, after it
+        scoreboard_manager.score_changed.connect(self.set_score)
+        scoreboard_manager.clock_changed.connect(self.set_clock)
+        scoreboard_manager.lamps_changed.connect(self.set_lamps)
+        scoreboard_manager.cards_changed.connect(self.set_cards)
+        scoreboard_manager.priority_changed.connect(self.set_priority)
+        scoreboard_manager.connection_changed.connect(self.set_connected)
+        self.set_connected(scoreboard_manager.connected)
+        state = scoreboard_manager.current_state
+        if state is not None:
+            self.set_state(state)
+
+    def set_connected(self, connected):
+        self.status_label.setVisible(not connected)
+
+    def set_state(self, state):
+        """Show a whole ScoreboardState."""
+        self.set_score(state.left_score, state.right_score)
+        self.set_clock(state.minutes, state.seconds)
+        self.set_lamps(state.lamps)
+        self.set_cards(state.penalty)
+        self.set_priority(state.match)
+
     def update_from_data(self, data):
+        """Apply a full scoreboard dict (legacy scoreboard_updated form)."""
         if not data:
             return
 
-        print(f"Updating scoreboard UI with data: {data}")
-
-        left_score = data.get("left_score", 0)
-        right_score = data.get("right_score", 0)
-        minutes = data.get("minutes", 0)
-        seconds = data.get("seconds", 0)
-        match_bits = data.get("match_bits", {})
-        num_matches = match_bits.get("num_matches", 1)
-        penalty = data.get("penalty", {})
+        self.set_score(data.get("left_score", 0), data.get("right_score", 0))
+        self.set_clock(
+            int(data.get("minutes", 0)), int(data.get("seconds", 0))
+        )
+        match_bits = {**FIRST_MATCH, **data.get("match_bits", {})}
+        penalty = {**NO_CARDS, **data.get("penalty", {})}
+        lamp_bits = {**NO_LAMPS, **data.get("lamp_bits", {})}
+        self.set_priority(MatchState(**match_bits))
+        self.set_cards(PenaltyState(**penalty))
+        self.set_lamps(LampState(**lamp_bits))
+
+    @staticmethod
+    def _set_text(label, text):
+        # setText relayouts the label, so skip it when nothing changed
+        if label.text() != text:
+            label.setText(text)
+
+    @traced("render scoreboard")
+    def set_score(self, left_score, right_score):
+        self._set_text(self.left_score_label, str(left_score))
+        self._set_text(self.right_score_label, str(right_score))
+
+    @traced("render scoreboard")
+    def set_clock(self, minutes, seconds):
+        # Always trust parsed seconds, only override minutes if bad
+        if minutes > 10:
+            logger.warning(
+                f"Minutes too high ({minutes}) keeping {self.minutes}"
+            )
+            minutes = self.minutes
+        self.minutes = minutes
+        self._set_text(self.timer_label, f"{minutes}:{seconds:02}")
+
+    @traced("render scoreboard")
+    def set_priority(self, match):
+        self._set_text(self.match_indicator, str(match.num_matches))
+
+    @traced("render scoreboard")
+    def set_cards(self, penalty):
+        red = LIGHT_COLORS["red"]
+        yellow = LIGHT_COLORS["yellow"]
+        self.left_red_flag.set_color(
+            red if penalty.penalty_left_red else None
+        )
+        self.left_yellow_flag.set_color(
+            yellow if penalty.penalty_left_yellow else None
+        )
+        self.right_red_flag.set_color(
+            red if penalty.penalty_right_red else None
+        )
+        self.right_yellow_flag.set_color(
+            yellow if penalty.penalty_right_yellow else None
+        )
 
-        self.left_score_label.setText(str(left_score))
-        self.right_score_label.setText(str(right_score))
-        self.match_indicator.setText(str(num_matches))
+    @traced("render scoreboard")
+    def set_lamps(self, lamps):
+        # Determine hit color priority: green > red > white > none
+        # (only the left side has a red lamp, only the right a green one)
+        if lamps.left_red:
+            left_hit = LIGHT_COLORS["red"]
+        elif lamps.left_white:
+            left_hit = LIGHT_COLORS["white"]
+        else:
+            left_hit = None
 
-        try:
-            current_displayed_time = self.timer_label.text()
-            current_minutes, current_seconds = map(
-                int, current_displayed_time.split(":")
-            )
-        except ValueError:
-            current_minutes, current_seconds = 3, 0
-
-        # Always trust parsed seconds
-        parsed_minutes = int(minutes)
-        parsed_seconds = int(seconds)
-
-        # Only override minutes if bad
-        if parsed_minutes > 10:
-            print(
-                f"[WARNING] Minutes too high ({parsed_minutes})"
-                f"keeping {current_minutes}"
-            )
-            minutes = current_minutes
-            seconds = current_seconds
+        if lamps.right_green:
+            right_hit = LIGHT_COLORS["green"]
+        elif lamps.right_white:
+            right_hit = LIGHT_COLORS["white"]
         else:
-            minutes = parsed_minutes
-            seconds = parsed_seconds
+            right_hit = None
 
-        # seconds = parsed_seconds no matter what
-        self.timer_label.setText(f"{minutes}:{parsed_seconds:02}")
+        self.left_hit_indicator.set_color(left_hit)
+        self.right_hit_indicator.set_color(right_hit)
 
-        # Update cards
-        self.left_red_flag.setStyleSheet(
-            "background: red; border-radius: 8px;"
-            if penalty.get("penalty_left_red")
-            else "background: transparent; border-radius: 8px;"
-        )
-        self.left_yellow_flag.setStyleSheet(
-            "background: yellow; border-radius: 8px;"
-            if penalty.get("penalty_left_yellow")
-            else "background: transparent; border-radius: 8px;"
-        )
-        self.right_red_flag.setStyleSheet(
-            "background: red; border-radius: 8px;"
-            if penalty.get("penalty_right_red")
-            else "background: transparent; border-radius: 8px;"
-        )
-        self.right_yellow_flag.setStyleSheet(
-            "background: yellow; border-radius: 8px;"
-            if penalty.get("penalty_right_yellow")
-            else "background: transparent; border-radius: 8px;"
+
+class AudienceView(QWidget):
+    """
+    The audience window's video: paints the recorder's QImage of the
+    frame, shared with the operator's view, scaled to fit. A frame costs
+    this view a paint, not a conversion.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.image = None
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent, True)
+        self.setSizePolicy(
+            QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
         )
 
-        lamp_bits = data.get("lamp_bits", {})
+    def show_image(self, image):
+        self.image = image
+        self.update()
+
+    @traced("paint audience")
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.GlobalColor.black)
+        if self.image is not None:
+            size = self.image.size().scaled(
+                self.size(), Qt.AspectRatioMode.KeepAspectRatio
+            )
+            target = QRect(QPoint(0, 0), size)
+            target.moveCenter(self.rect().center())
+            painter.drawImage(target, self.image)
+        painter.end()
 
-        # Determine hit color priority: green > red > white > none
-        def determine_hit_color(side):
-            if lamp_bits.get(f"{side}_green"):
-                return "green"
-            elif lamp_bits.get(f"{side}_red"):
-                return "red"
-            elif lamp_bits.get(f"{side}_white"):
-                return "white"
-            else:
-                return None
 
-        left_hit = determine_hit_color("left")
-        right_hit = determine_hit_color("right")
+class AudienceWindow(QWidget):
+    """
+    A second, audience facing display: the operator's view over a large
+    scoreboard fed by the same scoreboard manager. In replay-only mode
+    live frames are left out and the scoreboard fills the screen between
+    replays.
+    """
 
-        self.left_hit_indicator.setStyleSheet(self.get_hit_style(left_hit))
-        self.right_hit_indicator.setStyleSheet(self.get_hit_style(right_hit))
+    closed = pyqtSignal()
 
-        self.repaint()
+    def __init__(self, scoreboard_manager, replay_only: bool = False):
+        super().__init__()
+        self.setWindowTitle("RePoste Audience")
+        self.setStyleSheet("background-color: black;")
+        layout = QVBoxLayout(self)
+        self.video_view = AudienceView()
+        layout.addWidget(self.video_view, stretch=3)
+        self.scoreboard = ScoreboardWidget(
+            scoreboard_manager, scale=AUDIENCE_SCOREBOARD_SCALE
+        )
+        layout.addWidget(self.scoreboard, stretch=1)
+        self.replay_only = False
+        self.set_replay_only(replay_only)
+
+    def set_replay_only(self, replay_only: bool):
+        self.replay_only = replay_only
+        self.video_view.setVisible(not replay_only)
+
+    def show_image(self, image, replayed: bool = False):
+        """An image listener of the recorder."""
+        if self.replay_only:
+            if self.video_view.isVisible() != replayed:
+                self.video_view.setVisible(replayed)
+            if not replayed:
+                return
+        self.video_view.show_image(image)
+
+    def show_on_screen(self):
+        """Full screen on a screen of its own if there is one."""
+        primary = QGuiApplication.primaryScreen()
+        others = [s for s in QGuiApplication.screens() if s != primary]
+        if not others:
+            logger.info("No second screen, showing the audience windowed.")
+            self.resize(960, 720)
+            self.show()
+            return
+        self.setScreen(others[0])
+        self.setGeometry(others[0].geometry())
+        self.showFullScreen()
+
+    def closeEvent(self, event):
+        self.closed.emit()
+        super().closeEvent(event)
 
 
 class MainWindow(QMainWindow):
-    def update_scoreboard(self, data):
-        if data:
-            self.scoreboard.update_from_data(data)
-
-    def update_frame(self, pixmap):
-        if pixmap:
-            # fmt: off
-            self.video_feed.setPixmap(
-                pixmap.scaled(
+    # Emitted once the camera has opened (True) or failed to (False)
+    camera_ready = pyqtSignal(bool)
+
+    def update_frame(self, image):
+        """
+        Show the recorder's QImage of a frame (or a QPixmap), scaled to
+        the feed before it becomes a pixmap.
+        """
+        if image is not None and not image.isNull():
+            with tracer.span("scale"):
+                # fmt: off
+                scaled = image.scaled(
                     self.video_feed.size(),
                     Qt.AspectRatioMode.KeepAspectRatio
                 )
                 # fmt: on
+            if isinstance(scaled, QImage):
+                with tracer.span("to pixmap"):
+                    scaled = QPixmap.fromImage(scaled)
+            recorder = self.recorder
+            captured_ns = (
+                0 if recorder.replaying else recorder.counters.last_capture_ns
             )
+            self.video_feed.show_frame(scaled, captured_ns)
 
     def open_settings_window(self):
-        settings_window = SettingsWindow(self.recorder)
+        settings_window = SettingsWindow(
+            self.recorder, memory_governor=self.memory_governor
+        )
         settings_window.exec()
 
-    def __init__(self, scoreboard_manager):
+    def __init__(self, scoreboard_manager, capture_process: bool = False):
         super().__init__()
         self.setWindowTitle("RePoste")
         self.showFullScreen()
@@ -264,12 +563,15 @@ class MainWindow(QMainWindow):
         self.main_layout = QVBoxLayout(central_widget)
         self.setCentralWidget(central_widget)
 
-        self.video_feed = QLabel()
+        self.video_feed = VideoFeed()
         self.video_feed.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.video_feed.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
         )
-        self.video_feed.setStyleSheet("background-color: black;")
+        self.video_feed.setStyleSheet(
+            "background-color: black; color: white;"
+        )
+        self.video_feed.setText("Connecting to camera...")
         self.main_layout.addWidget(self.video_feed)
 
         self.scoreboard = ScoreboardWidget(scoreboard_manager)
@@ -286,7 +588,7 @@ class MainWindow(QMainWindow):
         if os.path.exists(icon_path):
             self.settings_button.setIcon(QIcon(icon_path))
         else:
-            print(f"Warning: Icon not found at {icon_path}")
+            logger.warning(f"Icon not found at {icon_path}")
         self.settings_button.setIconSize(QSize(40, 40))
         self.settings_button.setFixedSize(50, 50)
         self.settings_button.clicked.connect(self.open_settings_window)
@@ -298,23 +600,267 @@ class MainWindow(QMainWindow):
         )
         # fmt: on
 
-        self.recorder = VideoRecorder()
-        self.recorder.start_recording(self.update_frame)
+        # The camera opens in the background so the window shows at once.
+        # The scoreboard manager is started by the caller, so BLE discovery
+        # is already under way. With capture_process the camera is read
+        # and buffered in a child process.
+        self.recorder = (
+            ProcessVideoRecorder() if capture_process else VideoRecorder()
+        )
+        # Keeps the replay buffer within RAM, checked while recording
+        self.memory_governor = MemoryGovernor(self.recorder)
+        if capture_process:
+            # The shared ring is sized for what fits before it is created
+            self.recorder.buffer_planner = self.memory_governor.preview
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self.memory_governor.check_pressure)
+        self.video_feed.counters = self.recorder.counters
+        if scoreboard_manager is not None:
+            # Saved replays carry the scoreboard of their frames
+            scoreboard_manager.state_updated.connect(
+                self.recorder.record_scoreboard
+            )
+        self.perf_hud = PerfHud(
+            HudSampler(
+                self.recorder, scoreboard_manager, self.memory_governor
+            ),
+            parent=self.video_feed,
+        )
+        self.recorder.start_recording(
+            self.update_frame,
+            background=True,
+            ready_callback=self.on_camera_ready,
+        )
 
         self.scoreboard_manager = scoreboard_manager
-        self.scoreboard_manager.scoreboard_updated.connect(
-            self.update_scoreboard
+        self.shutdown_report = None
+        # Commands of the remote control API run on the GUI thread
+        self.gui_calls = GuiCalls(self)
+        self.remote_control = None
+        self.audience_window = None
+
+    def save_replay(self, filename=None) -> int:
+        """
+        Save the buffer in the background, announcing the result to remote
+        control clients. Returns the number of frames saved.
+        """
+        frames = len(self.recorder.buffer)
+        future = self.recorder.save_replay(filename, background=True)
+        if future is not None and self.remote_control is not None:
+            future.add_done_callback(self._announce_save)
+        return frames
+
+    def _announce_save(self, future):
+        path = future.result()
+        self.remote_control.broadcast(
+            {"event": "saved" if path else "save_failed", "path": path}
         )
-        self.scoreboard_manager.start()
+
+    def _announce_scoreboard(self, state):
+        self.remote_control.broadcast(
+            {
+                "event": "scoreboard",
+                "state": state.to_dict() if state else None,
+            }
+        )
+
+    def replay_status(self) -> dict:
+        recorder = self.recorder
+        return {
+            "replaying": recorder.replaying,
+            "frame": recorder.replay_index,
+            "frames": len(recorder.replay_frames),
+            "speed": recorder.replay_speed,
+        }
+
+    def remote_commands(self) -> dict:
+        """Handlers of the remote control API, run on the GUI thread."""
+        recorder = self.recorder
+
+        def replay_frames():
+            if not recorder.replay_frames:
+                raise ValueError("no replay is open, start one first")
+            return len(recorder.replay_frames)
+
+        def status(params):
+            manager = self.scoreboard_manager
+            state = manager.current_state if manager is not None else None
+            return {
+                "recording": recorder.recording,
+                "paused": recorder.paused,
+                "replay": self.replay_status(),
+                "buffer": recorder.buffer_stats(),
+                "scoreboard": state.to_dict() if state else None,
+            }
+
+        def save(params):
+            # A bare name: the replay goes to the output folder
+            filename = os.path.basename(str(params.get("filename") or ""))
+            return {"frames": self.save_replay(filename or None)}
+
+        def start_replay(params):
+            recorder.start_in_app_replay(self.update_frame)
+            return self.replay_status()
+
+        def stop_replay(params):
+            recorder.stop_in_app_replay(resume_live=True)
+            return self.replay_status()
+
+        def speed(params):
+            value = float(params["speed"])
+            if not 0 < value <= MAX_REMOTE_REPLAY_SPEED:
+                raise ValueError(
+                    f"speed must be above 0 and at most "
+                    f"{MAX_REMOTE_REPLAY_SPEED:g}"
+                )
+            recorder.set_replay_speed(value)
+            return self.replay_status()
+
+        def step(params):
+            replay_frames()
+            recorder.seek_replay(
+                recorder.replay_index + int(params.get("frames", 1))
+            )
+            return self.replay_status()
+
+        def seek(params):
+            frames = replay_frames()
+            if "frame" in params:
+                index = int(params["frame"])
+            else:
+                index = round(float(params["position"]) * (frames - 1))
+            recorder.seek_replay(index)
+            return self.replay_status()
+
+        return {
+            "status": status,
+            "save": save,
+            "replay/start": start_replay,
+            "replay/stop": stop_replay,
+            "replay/speed": speed,
+            "replay/step": step,
+            "replay/seek": seek,
+        }
+
+    def start_remote_control(
+        self, host: str = DEFAULT_HOST, port: int = 0, token=None
+    ):
+        """
+        Serve the remote control API, and MJPEG streams of the view.
+        Returns the port, None if it fails.
+        """
+        stream = MjpegBroadcaster()
+        server = RemoteControlServer(
+            self.remote_commands(),
+            call=self.gui_calls.call,
+            host=host,
+            port=port,
+            token=token,
+            stream=stream,
+        )
+        try:
+            port = server.start()
+        except OSError as e:
+            logger.error(f"Could not start the remote control: {e}")
+            return None
+        self.remote_control = server
+        self.recorder.frame_listeners.append(stream.publish)
+        if self.scoreboard_manager is not None:
+            self.scoreboard_manager.state_updated.connect(
+                self._announce_scoreboard
+            )
+        return port
+
+    def open_audience_window(self, replay_only: bool = False):
+        """
+        Show the audience window, or switch its mode if it is open. It is
+        handed the QImage of each frame shown here, converted once for
+        both windows.
+        """
+        window = self.audience_window
+        if window is None:
+            window = AudienceWindow(self.scoreboard_manager, replay_only)
+            window.closed.connect(self._on_audience_closed)
+            self.recorder.image_listeners.append(window.show_image)
+            self.audience_window = window
+            window.show_on_screen()
+        else:
+            window.set_replay_only(replay_only)
+        return window
+
+    def close_audience_window(self):
+        if self.audience_window is not None:
+            self.audience_window.close()
+
+    def _on_audience_closed(self):
+        window, self.audience_window = self.audience_window, None
+        if window is not None:
+            self.recorder.image_listeners.remove(window.show_image)
+
+    def on_camera_ready(self, success):
+        if not success:
+            self.video_feed.setText("Camera unavailable")
+        else:
+            # The frame size is known now, size the buffer for it
+            self.memory_governor.apply(self.recorder.buffer_duration)
+            self.memory_timer.start(PRESSURE_CHECK_INTERVAL_MS)
+        self.camera_ready.emit(success)
+
+    def shutdown(self):
+        """
+        Stop the capture, flush replay saves and disconnect the scoreboard,
+        each within its budget. Runs once, the report is kept.
+        """
+        if self.shutdown_report is not None:
+            return self.shutdown_report
+        self.memory_timer.stop()
+        self.perf_hud.timer.stop()
+        self.close_audience_window()
+        recorder = self.recorder
+        coordinator = ShutdownCoordinator()
+        if self.remote_control is not None:
+            coordinator.add(
+                "remote control", self.remote_control.stop, REMOTE_STOP_BUDGET
+            )
+        coordinator.add(
+            "video capture", recorder.stop_recording, CAPTURE_STOP_BUDGET
+        )
+        coordinator.add(
+            "replay saves", recorder.wait_for_saves, REPLAY_FLUSH_BUDGET
+        )
+        if self.scoreboard_manager is not None:
+            coordinator.add(
+                "scoreboard",
+                self.scoreboard_manager.stop,
+                SCOREBOARD_STOP_BUDGET,
+            )
+        self.shutdown_report = coordinator.run()
+        return self.shutdown_report
+
+    def dump_trace(self):
+        """
+        Start tracing on the first press, save the trace (to the replay
+        output folder) on the next ones. Returns the path saved to.
+        """
+        if not tracer.enabled:
+            tracer.enable()
+            logger.info("Tracing started, press T again to save the trace.")
+            return None
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        return tracer.dump(
+            os.path.join(self.recorder.output_dir, f"trace_{timestamp}.json")
+        )
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
 
     def keyPressEvent(self, event):
         key = event.key()
         if key == Qt.Key.Key_Escape:
-            self.recorder.stop_recording()
-            self.scoreboard_manager.stop()
             self.close()
         elif key == Qt.Key.Key_Space:
-            self.recorder.save_replay()
+            self.save_replay()
         elif key == Qt.Key.Key_P:
             self.recorder.pause_recording()
         elif key == Qt.Key.Key_R:
@@ -333,6 +879,19 @@ class MainWindow(QMainWindow):
             self.recorder.show_previous_frame()
         elif key == Qt.Key.Key_Right:
             self.recorder.show_next_frame()
+        elif key == Qt.Key.Key_T:
+            self.dump_trace()
+        elif key == Qt.Key.Key_H:
+            self.perf_hud.toggle()
+        elif key == Qt.Key.Key_A:
+            if self.audience_window is None:
+                self.open_audience_window()
+            else:
+                self.close_audience_window()
+        elif key == Qt.Key.Key_M and self.audience_window is not None:
+            self.audience_window.set_replay_only(
+                not self.audience_window.replay_only
+            )
         elif key == Qt.Key.Key_F11:
             if self.isFullScreen():
                 self.showNormal()
@@ -0,0 +1,206 @@
+"""
+Application logging: records are queued by the threads that log them and
+written to the console and a rotating file by a listener thread, so a log
+call never waits on a terminal or disk. Repeats of a message within a
+window are collapsed into one "N identical messages suppressed" line.
+
+Modules only create their subsystem logger (e.g. reposte.video); the app
+calls setup_logging() once at start up.
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+LOG_FILE = os.path.join("logs", "reposte.log")
+LOG_FILE_BYTES = 1 << 20
+LOG_FILE_BACKUPS = 5
+ROOT_LOGGER = "reposte"
+# Subsystems logging below the app's level by default. Every scoreboard
+# payload is logged at DEBUG, set reposte.scoreboard.data to DEBUG to see
+# them.
+SUBSYSTEM_LEVELS = {
+    "reposte.scoreboard.data": logging.INFO,
+}
+# A message is written at most once this often (seconds), the repeats
+# in between are summarised when the window ends
+REPEAT_SUMMARY_INTERVAL = 10.0
+# Distinct messages tracked at once, the oldest window is closed early
+REPEAT_MAX_MESSAGES = 256
+
+
+class RepeatRun:
+    """Records of one (logger, level, message) in the current window."""
+
+    __slots__ = ("started", "suppressed", "record")
+
+    def __init__(self, started: float, record: logging.LogRecord):
+        self.started = started
+        self.suppressed = 0
+        self.record = record
+
+
+class RepeatSuppressor:
+    """
+    Drops records identical (same logger, level and message) to one
+    written less than interval seconds before, even with other messages
+    in between, e.g. from other threads. A message's suppressed records
+    are summarised when its window ends.
+    """
+
+    def __init__(
+        self,
+        interval: float = REPEAT_SUMMARY_INTERVAL,
+        clock=None,
+        max_runs: int = REPEAT_MAX_MESSAGES,
+    ):
+        self.interval = interval
+        self.clock = clock or time.monotonic
+        self.max_runs = max_runs
+        # Oldest window first
+        self.runs = OrderedDict()
+
+    def process(self, record: logging.LogRecord) -> list:
+        """The records to write in place of record (maybe none)."""
+        key = (record.name, record.levelno, record.getMessage())
+        now = self.clock()
+        records = self._expire(now, key)
+        run = self.runs.get(key)
+        if run is not None and now - run.started < self.interval:
+            run.suppressed += 1
+            run.record = record
+            return records
+        if run is not None and run.suppressed:
+            # Still repeating, summarise and start the next window
+            run.suppressed += 1
+            run.record = record
+            records.append(self._summary(run))
+        else:
+            records.append(record)
+            run = self.runs[key] = RepeatRun(now, record)
+        run.started = now
+        self.runs.move_to_end(key)
+        if len(self.runs) > self.max_runs:
+            records.extend(
+                self._summaries([self.runs.popitem(last=False)[1]])
+            )
+        return records
+
+    def flush(self) -> list:
+        """Summaries of every window with suppressed records."""
+        runs = list(self.runs.values())
+        self.runs.clear()
+        return self._summaries(runs)
+
+    def _expire(self, now: float, key: tuple) -> list:
+        # Close the windows that ended, except key's, handled by process()
+        ended = []
+        for run_key, run in self.runs.items():
+            if now - run.started < self.interval:
+                break
+            if run_key != key:
+                ended.append(run_key)
+        return self._summaries([self.runs.pop(k) for k in ended])
+
+    def _summaries(self, runs: list) -> list:
+        return [self._summary(run) for run in runs if run.suppressed]
+
+    @staticmethod
+    def _summary(run: RepeatRun) -> logging.LogRecord:
+        last = run.record
+        summary = logging.makeLogRecord(
+            {
+                "name": last.name,
+                "levelno": last.levelno,
+                "levelname": last.levelname,
+                "msg": (
+                    f"{run.suppressed} identical messages suppressed: "
+                    f"{last.getMessage()}"
+                ),
+            }
+        )
+        run.suppressed = 0
+        return summary
+
+
+class RateLimitedListener(logging.handlers.QueueListener):
+    """A QueueListener passing records through a RepeatSuppressor."""
+
+    def __init__(self, log_queue, *handlers, suppressor=None):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.suppressor = suppressor or RepeatSuppressor()
+
+    def handle(self, record):
+        for output in self.suppressor.process(record):
+            super().handle(output)
+
+    def stop(self):
+        super().stop()
+        for output in self.suppressor.flush():
+            super().handle(output)
+
+
+def setup_logging(
+    level: int = logging.INFO,
+    log_file: Optional[str] = LOG_FILE,
+    levels: Optional[Dict[str, int]] = None,
+    console: bool = True,
+) -> RateLimitedListener:
+    """
+    Route all logging through a queue to the console and log_file (None
+    for no file), with levels per subsystem on top of SUBSYSTEM_LEVELS.
+    Returns the started listener; stop() it at exit to flush the queue.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if console:
+        handlers.append(logging.StreamHandler())
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        handlers.append(
+            logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=LOG_FILE_BYTES,
+                backupCount=LOG_FILE_BACKUPS,
+                encoding="utf-8",
+            )
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    levels = {**SUBSYSTEM_LEVELS, **(levels or {})}
+    for name, subsystem_level in levels.items():
+        logging.getLogger(name).setLevel(subsystem_level)
+
+    listener = RateLimitedListener(log_queue, *handlers)
+    listener.start()
+    return listener
+
+
+def parse_level_overrides(specs: list) -> Dict[str, int]:
+    """
+    Levels from "subsystem=LEVEL" strings, e.g. "scoreboard.data=DEBUG"
+    for reposte.scoreboard.data. Raises ValueError on a bad entry.
+    """
+    levels = {}
+    for spec in specs:
+        name, _, level = spec.partition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if not name or not isinstance(value, int):
+            raise ValueError(f"expected subsystem=LEVEL, got {spec!r}")
+        name = name.strip()
+        if name != ROOT_LOGGER and not name.startswith(f"{ROOT_LOGGER}."):
+            name = f"{ROOT_LOGGER}.{name}"
+        levels[name] = value
+    return levels
@@ -1,20 +1,160 @@
-import sys
-from PyQt6.QtWidgets import QApplication
-from gui import MainWindow
-from scoreboard_manager import ScoreboardManager
+import time
 
-if __name__ == "__main__":
-    app = QApplication([])
+STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import logging  # noqa: E402
+import sys  # noqa: E402
+
+from logging_setup import (  # noqa: E402
+    LOG_FILE,
+    parse_level_overrides,
+    setup_logging,
+)
+from startup import StartupProfiler  # noqa: E402
+
+# Print the start-up profile after this long even if a milestone (e.g.
+# the scoreboard) never arrives
+PROFILE_DEADLINE_MS = 10000
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="RePoste replay station")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print a per-phase timing breakdown of the start up",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="record hot-path trace spans from the start, T saves them",
+    )
+    parser.add_argument(
+        "--capture-process",
+        action="store_true",
+        help="capture and buffer the camera in a separate process, sharing "
+        "frames with the window through shared memory",
+    )
+    parser.add_argument(
+        "--audience",
+        nargs="?",
+        const="live",
+        choices=["live", "replays"],
+        help="open the audience window on a second screen, showing what "
+        "the operator sees (live) or only replays",
+    )
+    parser.add_argument(
+        "--remote-port",
+        type=int,
+        help="serve the HTTP/WebSocket remote control on PORT (0 picks one)",
+    )
+    parser.add_argument(
+        "--remote-host",
+        default="127.0.0.1",
+        help="address for the remote control, 0.0.0.0 for the LAN "
+        "(default 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--remote-token",
+        help="token remote control clients must send (Bearer or ?token=)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="level of the app's log (default INFO)",
+    )
+    parser.add_argument(
+        "--log",
+        action="append",
+        default=[],
+        metavar="SUBSYSTEM=LEVEL",
+        help="level of one subsystem, e.g. scoreboard.data=DEBUG to log "
+        "every scoreboard payload (repeatable)",
+    )
+    parser.add_argument(
+        "--log-file",
+        default=LOG_FILE,
+        help=f"rotating log file (default {LOG_FILE}), '' for none",
+    )
+    args = parser.parse_args(argv)
+    try:
+        args.log = parse_level_overrides(args.log)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log_listener = setup_logging(
+        logging.getLevelName(args.log_level), args.log_file, args.log
+    )
+    profiler = StartupProfiler(
+        enabled=args.profile_startup,
+        started=STARTED,
+        expected=("window shown", "camera ready", "scoreboard connected"),
+    )
 
-    # Create one instance of ScoreboardManager
-    scoreboard_mgr = ScoreboardManager()
+    if args.trace:
+        from tracing import tracer
 
-    # Pass the instance to MainWindow (modify MainWindow to accept it)
-    window = MainWindow(scoreboard_manager=scoreboard_mgr)
-    window.show()
+        tracer.enable()
+
+    # Heavy modules are imported here, in the order they are needed, and
+    # the scoreboard starts discovering its device on its own thread
+    # while the window is built
+    with profiler.phase("import scoreboard"):
+        from scoreboard_manager import ScoreboardManager
+
+    with profiler.phase("start scoreboard"):
+        # Create one instance of ScoreboardManager
+        scoreboard_mgr = ScoreboardManager()
+        scoreboard_mgr.connection_changed.connect(
+            lambda connected: connected
+            and profiler.mark("scoreboard connected")
+        )
+        scoreboard_mgr.start()
+
+    with profiler.phase("import Qt"):
+        from PyQt6.QtCore import QTimer
+        from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+
+    with profiler.phase("import gui"):
+        from gui import MainWindow
+
+    with profiler.phase("build window"):
+        # Pass the instance to MainWindow
+        window = MainWindow(
+            scoreboard_manager=scoreboard_mgr,
+            capture_process=args.capture_process,
+        )
+        window.camera_ready.connect(
+            lambda success: profiler.mark("camera ready")
+        )
+        window.show()
+        if args.audience:
+            window.open_audience_window(
+                replay_only=args.audience == "replays"
+            )
+        if args.remote_port is not None:
+            window.start_remote_control(
+                args.remote_host, args.remote_port, args.remote_token
+            )
+    QTimer.singleShot(0, lambda: profiler.mark("window shown"))
+    QTimer.singleShot(PROFILE_DEADLINE_MS, profiler.report)
 
     try:
         exit_code = app.exec()
     finally:
+        profiler.report()
         scoreboard_mgr.stop()
-        sys.exit(exit_code)
+        log_listener.stop()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import logging
+from typing import NamedTuple, Optional, Tuple
+
+logger = logging.getLogger("reposte.memory")
+
+MEMINFO_PATH = "/proc/meminfo"
+# Share of the memory available to the buffer (free memory plus what the
+# buffer already holds) it may take; the rest is left to the OS and the
+# replay encoder
+BUFFER_MEMORY_FRACTION = 0.5
+# Below this much available memory the buffer is shrunk at runtime
+MIN_FREE_MEMORY = 512 * 1024 * 1024
+# Frame downscale factors tried, in order, before the duration is capped
+FRAME_SCALES = (1, 2, 4)
+MIN_BUFFER_DURATION = 1
+PRESSURE_CHECK_INTERVAL_MS = 2000
+
+
+def format_bytes(size):
+    """Human readable size, e.g. 1.4 GB."""
+    if size < 1024:
+        return f"{size:.0f} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+
+
+def read_meminfo(path: str = MEMINFO_PATH) -> dict:
+    """/proc/meminfo as a dict of bytes, empty where it does not exist."""
+    info = {}
+    try:
+        with open(path, "r") as file:
+            for line in file:
+                name, _, value = line.partition(":")
+                fields = value.split()
+                if fields:
+                    unit = 1024 if fields[1:] == ["kB"] else 1
+                    info[name] = int(fields[0]) * unit
+    except (OSError, ValueError):
+        return {}
+    return info
+
+
+def available_memory(path: str = MEMINFO_PATH) -> Optional[int]:
+    """Memory the kernel can hand out without swapping, None if unknown."""
+    info = read_meminfo(path)
+    if "MemAvailable" in info:
+        return info["MemAvailable"]
+    if "MemFree" in info:
+        # Kernels before 3.14
+        return (
+            info["MemFree"] + info.get("Buffers", 0) + info.get("Cached", 0)
+        )
+    return None
+
+
+def scaled_frame_bytes(size: Tuple[int, int], scale: int = 1) -> int:
+    """Bytes of an RGB frame of size (width, height) kept at 1/scale."""
+    width, height = size
+    return -(-width // scale) * -(-height // scale) * 3
+
+
+class BufferPlan(NamedTuple):
+    requested: int  # seconds the operator asked for
+    duration: int  # seconds granted
+    scale: int  # frames are kept at 1/scale of the capture resolution
+    frame_bytes: int
+    total_bytes: int
+    budget: Optional[int]  # None when memory or frame size is unknown
+
+    @property
+    def downgraded(self) -> bool:
+        return self.duration < self.requested or self.scale > 1
+
+    def describe(self) -> str:
+        resolution = (
+            "full resolution" if self.scale == 1 else f"1/{self.scale} size"
+        )
+        text = (
+            f"{self.duration} s at {resolution}, "
+            f"{format_bytes(self.total_bytes)}"
+        )
+        if self.budget is None:
+            return f"{text} (not limited, memory use unknown)"
+        text += f" of {format_bytes(self.budget)} allowed"
+        if self.downgraded:
+            text += f" (reduced from {self.requested} s at full resolution)"
+        return text
+
+
+def plan_buffer(
+    requested: int,
+    fps: int,
+    size: Optional[Tuple[int, int]],
+    budget: Optional[int],
+    scales: Tuple[int, ...] = FRAME_SCALES,
+) -> BufferPlan:
+    """
+    Fit a buffer of requested seconds into budget bytes. The resolution is
+    lowered first (through scales), so the whole touch stays in the
+    replay; only if the smallest frames still do not fit is the duration
+    capped.
+    """
+    if size is None or budget is None:
+        frame_bytes = scaled_frame_bytes(size) if size else 0
+        return BufferPlan(
+            requested,
+            requested,
+            1,
+            frame_bytes,
+            fps * requested * frame_bytes,
+            None,
+        )
+    for scale in scales:
+        frame_bytes = scaled_frame_bytes(size, scale)
+        if fps * requested * frame_bytes <= budget:
+            return BufferPlan(
+                requested,
+                requested,
+                scale,
+                frame_bytes,
+                fps * requested * frame_bytes,
+                budget,
+            )
+    duration = max(MIN_BUFFER_DURATION, budget // (fps * frame_bytes))
+    return BufferPlan(
+        requested,
+        duration,
+        scale,
+        frame_bytes,
+        fps * duration * frame_bytes,
+        budget,
+    )
+
+
+class MemoryGovernor:
+    """
+    Keeps the replay buffer of a VideoRecorder within the machine's RAM.
+    apply() sizes the buffer for a requested duration, check_pressure()
+    shrinks it when available memory runs low while recording.
+    """
+
+    def __init__(
+        self,
+        recorder,
+        meminfo_path: str = MEMINFO_PATH,
+        fraction: float = BUFFER_MEMORY_FRACTION,
+        min_free: int = MIN_FREE_MEMORY,
+    ):
+        self.recorder = recorder
+        self.meminfo_path = meminfo_path
+        self.fraction = fraction
+        self.min_free = min_free
+        self.plan = None
+        # Available memory at the last check, shown by the HUD
+        self.last_available = None
+
+    def budget(self) -> Optional[int]:
+        available = available_memory(self.meminfo_path)
+        self.last_available = available
+        if available is None:
+            return None
+        held = self.recorder.buffer_stats()["fill_bytes"]
+        return int((available + held) * self.fraction)
+
+    def preview(self, duration: int) -> BufferPlan:
+        """The plan apply(duration) would make, without applying it."""
+        recorder = self.recorder
+        return plan_buffer(
+            duration,
+            recorder.fps,
+            recorder.frame_size(),
+            self.budget(),
+            recorder.frame_scales,
+        )
+
+    def apply(self, duration: int) -> BufferPlan:
+        plan = self.preview(duration)
+        self._apply_plan(plan)
+        if plan.downgraded:
+            logger.warning(f"Replay buffer reduced: {plan.describe()}")
+        return plan
+
+    def check_pressure(self) -> Optional[BufferPlan]:
+        """
+        Shrink the buffer if available memory is below min_free, freeing
+        enough to get back to twice that. Returns the new plan, or None if
+        nothing had to change.
+
+        The buffer held now is costed the way plan_buffer() costs the
+        candidates, from the capture size at the current scale, and only
+        the current or smaller scales are tried.
+        """
+        available = available_memory(self.meminfo_path)
+        self.last_available = available
+        if available is None or available >= self.min_free:
+            return None
+        recorder = self.recorder
+        size = recorder.frame_size()
+        if size is None:
+            return None
+        held = (
+            recorder.fps
+            * recorder.buffer_duration
+            * scaled_frame_bytes(size, recorder.frame_scale)
+        )
+        release = 2 * self.min_free - available
+        budget = max(0, held - release)
+        scales = tuple(
+            scale
+            for scale in recorder.frame_scales
+            if scale >= recorder.frame_scale
+        )
+        plan = plan_buffer(
+            recorder.buffer_duration,
+            recorder.fps,
+            size,
+            budget,
+            scales or (recorder.frame_scale,),
+        )
+        if (plan.duration, plan.scale) == (
+            recorder.buffer_duration,
+            recorder.frame_scale,
+        ):
+            return None
+        logger.warning(
+            f"Low memory ({format_bytes(available)} available), "
+            f"replay buffer shrunk to {plan.describe()}"
+        )
+        self._apply_plan(plan)
+        return plan
+
+    def _apply_plan(self, plan: BufferPlan):
+        # Drop the oldest frames first so fewer have to be rescaled
+        if plan.duration < self.recorder.buffer_duration:
+            self.recorder.set_buffer_duration(plan.duration)
+            self.recorder.set_frame_scale(plan.scale)
+        else:
+            self.recorder.set_frame_scale(plan.scale)
+            self.recorder.set_buffer_duration(plan.duration)
+        self.plan = plan
@@ -0,0 +1,221 @@
+"""
+MJPEG streams of the operator's view, live or replay, for referee and
+audience screens: <img src="http://station:8080/stream/small.mjpeg">. The
+remote control server serves them (see remote_control.py).
+
+Frames are encoded on one encoder thread, once per rendition that has
+viewers, and the JPEG is fanned out to each viewer's queue. A viewer that
+can't keep up loses its oldest queued frames instead of queueing more, and
+a frame shown while the encoder is busy replaces the one waiting for it.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import suppress
+from typing import NamedTuple, Optional
+
+import numpy as np
+from PyQt6.QtCore import QBuffer, QIODevice, Qt
+from PyQt6.QtGui import QImage
+
+logger = logging.getLogger("reposte.stream")
+
+BOUNDARY = "reposte-frame"
+# JPEGs queued per viewer
+VIEWER_QUEUE = 2
+STOP_TIMEOUT = 0.1
+
+
+class Rendition(NamedTuple):
+    width: Optional[int]  # None for the frame's own width
+    quality: int
+
+
+RENDITIONS = {
+    "full": Rendition(None, 85),
+    "medium": Rendition(1280, 80),
+    "small": Rendition(640, 70),
+}
+
+
+def encode_jpeg(frame, width: Optional[int], quality: int) -> bytes:
+    """
+    JPEG of an RGB frame, mirrored like the operator's view and scaled
+    down to width. A contiguous frame is read in place.
+    """
+    frame = np.ascontiguousarray(frame)
+    height, frame_width = frame.shape[:2]
+    image = QImage(
+        frame.data,
+        frame_width,
+        height,
+        frame.strides[0],
+        QImage.Format.Format_RGB888,
+    )
+    if width and width < frame_width:
+        image = image.scaledToWidth(
+            width, Qt.TransformationMode.SmoothTransformation
+        )
+    image = image.mirrored(True, False)
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "JPG", quality)
+    return bytes(buffer.data())
+
+
+class Viewer:
+    """A connected client's queue of JPEGs to send."""
+
+    def __init__(self, size: int = VIEWER_QUEUE):
+        self.frames = asyncio.Queue(size)
+        self.sent = 0
+        self.dropped = 0
+
+    def offer(self, jpeg: bytes):
+        if self.frames.full():
+            self.frames.get_nowait()
+            self.dropped += 1
+        self.frames.put_nowait(jpeg)
+
+
+class MjpegBroadcaster:
+    """
+    Encodes the frames publish()ed to it for the renditions being watched
+    and streams them to the viewers of each.
+    """
+
+    def __init__(self, renditions: dict = RENDITIONS, encode=encode_jpeg):
+        self.renditions = dict(renditions)
+        self.encode = encode
+        self.viewers = {name: set() for name in self.renditions}
+        # The event loop the viewers are served on
+        self.loop = None
+        self.published = 0
+        # Frames replaced before the encoder got to them
+        self.skipped = 0
+        self.encoded = dict.fromkeys(self.renditions, 0)
+        self.encode_seconds = dict.fromkeys(self.renditions, 0.0)
+        self.running = False
+        self.thread = None
+        self._pending = None
+        self._wake = threading.Condition()
+
+    @property
+    def watched(self) -> bool:
+        return any(self.viewers.values())
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(
+            target=self._encode_loop, name="mjpeg-encode", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> bool:
+        with self._wake:
+            self.running = False
+            self._wake.notify()
+        if self.thread is None:
+            return True
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+    def publish(self, frame):
+        """
+        Offer the frame on screen, from the GUI thread; nothing is done
+        without viewers. The encoder gets a copy: a frame of the capture
+        process's ring can be overwritten, or unmapped by a resize, before
+        the encoder gets to it.
+        """
+        if not self.watched:
+            return
+        frame = np.copy(frame)
+        with self._wake:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = frame
+            self._wake.notify()
+        self.published += 1
+
+    def _encode_loop(self):
+        while True:
+            with self._wake:
+                while self.running and self._pending is None:
+                    self._wake.wait()
+                if not self.running:
+                    return
+                frame, self._pending = self._pending, None
+            for name, viewers in self.viewers.items():
+                if not viewers:
+                    continue
+                started = time.perf_counter()
+                try:
+                    jpeg = self.encode(frame, *self.renditions[name])
+                except Exception as e:
+                    logger.error(f"Could not encode the {name} stream: {e}")
+                    continue
+                self.encode_seconds[name] += time.perf_counter() - started
+                self.encoded[name] += 1
+                with suppress(RuntimeError):  # The loop closed
+                    self.loop.call_soon_threadsafe(self._deliver, name, jpeg)
+
+    def _deliver(self, name: str, jpeg: bytes):
+        for viewer in self.viewers[name]:
+            viewer.offer(jpeg)
+
+    async def serve(self, name: str, writer):
+        """Stream rendition name to writer until the viewer goes away."""
+        self.loop = asyncio.get_running_loop()
+        viewer = Viewer()
+        writer.write(
+            (
+                "HTTP/1.1 200 OK\r\n"
+                "Content-Type: multipart/x-mixed-replace; "
+                f"boundary={BOUNDARY}\r\n"
+                "Cache-Control: no-cache\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+        )
+        await writer.drain()
+        self.viewers[name].add(viewer)
+        logger.info(f"Viewer joined the {name} stream.")
+        try:
+            while True:
+                jpeg = await viewer.frames.get()
+                writer.write(
+                    (
+                        f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n\r\n"
+                    ).encode()
+                    + jpeg
+                    + b"\r\n"
+                )
+                await writer.drain()
+                viewer.sent += 1
+        finally:
+            self.viewers[name].discard(viewer)
+            logger.info(
+                f"Viewer left the {name} stream ({viewer.sent} frames sent, "
+                f"{viewer.dropped} dropped)."
+            )
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "skipped": self.skipped,
+            "renditions": {
+                name: {
+                    "viewers": len(viewers),
+                    "encoded": self.encoded[name],
+                    "encode_ms": (
+                        self.encode_seconds[name] / self.encoded[name] * 1000
+                        if self.encoded[name]
+                        else None
+                    ),
+                    "dropped": sum(viewer.dropped for viewer in viewers),
+                }
+                for name, viewers in self.viewers.items()
+            },
+        }
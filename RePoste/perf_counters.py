@@ -0,0 +1,193 @@
+"""
+Counters the hot paths bump, sampled by the performance HUD.
+
+Each counter is a plain int written by one thread only (capture on the
+GUI thread or the headless capture thread, display on the GUI thread,
+encode progress on the replay save worker), so
+bumping one is a single attribute store and reading it from another thread
+is safe. Rates and averages are worked out when the HUD samples, once per
+refresh, not on the hot path.
+"""
+
+import time
+from typing import Optional
+
+from memory_governor import format_bytes
+
+# How often the HUD refreshes
+HUD_INTERVAL_MS = 500
+# Capture below this fraction of the target fps is flagged
+CAPTURE_FPS_ALERT = 0.9
+# A scoreboard silent for this long (seconds) is flagged
+SCOREBOARD_STALE_SECONDS = 5.0
+
+
+class FrameCounters:
+    """Frame counts of the capture loop, the video view and the encoder."""
+
+    __slots__ = (
+        "captured",
+        "dropped",
+        "displayed",
+        "skipped",
+        "latency_ns",
+        "latency_samples",
+        "last_capture_ns",
+        "encode_done",
+        "encode_total",
+    )
+
+    def __init__(self):
+        self.captured = 0
+        # Frame periods the capture loop fell behind by
+        self.dropped = 0
+        self.displayed = 0
+        # Frames replaced in the view before they were painted
+        self.skipped = 0
+        # Capture-to-paint time summed over latency_samples frames
+        self.latency_ns = 0
+        self.latency_samples = 0
+        self.last_capture_ns = 0
+        # Frames written of the replay being encoded
+        self.encode_done = 0
+        self.encode_total = 0
+
+    def frame_captured(self, now_ns: int, fps: int):
+        if self.last_capture_ns:
+            periods = (now_ns - self.last_capture_ns) * fps / 1e9
+            if periods >= 1.5:
+                self.dropped += round(periods) - 1
+        self.last_capture_ns = now_ns
+        self.captured += 1
+
+    def frame_displayed(self, captured_ns: int, now_ns: int):
+        self.displayed += 1
+        if captured_ns:
+            self.latency_ns += now_ns - captured_ns
+            self.latency_samples += 1
+
+
+class RateMeter:
+    """Per-second rate of a growing count, between two samples."""
+
+    def __init__(self):
+        self.count = None
+        self.time = None
+
+    def sample(self, count: int, now: float) -> Optional[float]:
+        previous, started = self.count, self.time
+        self.count, self.time = count, now
+        if previous is None or now <= started:
+            return None
+        return (count - previous) / (now - started)
+
+
+class HudSampler:
+    """Reads the counters of the running components into HUD figures."""
+
+    def __init__(self, recorder, scoreboard_manager=None, governor=None):
+        self.recorder = recorder
+        self.scoreboard_manager = scoreboard_manager
+        self.governor = governor
+        self.capture_rate = RateMeter()
+        self.display_rate = RateMeter()
+        self.scoreboard_rate = RateMeter()
+        self._latency = (0, 0)
+
+    def sample(self, now: Optional[float] = None) -> dict:
+        now = time.monotonic() if now is None else now
+        recorder = self.recorder
+        counters = recorder.counters
+        latency_ns, samples = counters.latency_ns, counters.latency_samples
+        last_ns, last_samples = self._latency
+        self._latency = (latency_ns, samples)
+        buffer = recorder.buffer_stats()
+        stats = {
+            "target_fps": recorder.fps,
+            "capture_fps": self.capture_rate.sample(counters.captured, now),
+            # None without a view (the headless recorder)
+            "display_fps": (
+                self.display_rate.sample(counters.displayed, now)
+                if counters.displayed
+                else None
+            ),
+            "dropped": counters.dropped,
+            "skipped": counters.skipped,
+            "latency_ms": (
+                (latency_ns - last_ns) / (samples - last_samples) / 1e6
+                if samples > last_samples
+                else None
+            ),
+            "buffer_fill_seconds": buffer["fill_seconds"],
+            "buffer_capacity_seconds": buffer["capacity_seconds"],
+            "buffer_bytes": buffer["fill_bytes"],
+            "available_bytes": (
+                self.governor.last_available if self.governor else None
+            ),
+            "encode_queue": len(recorder.pending_saves),
+            "encode_progress": (
+                counters.encode_done / counters.encode_total
+                if recorder.pending_saves and counters.encode_total
+                else None
+            ),
+            "scoreboard_rate": None,
+            "scoreboard_age": None,
+        }
+        manager = self.scoreboard_manager
+        if manager is not None:
+            stats["scoreboard_rate"] = self.scoreboard_rate.sample(
+                manager.backend.frames_received, now
+            )
+            if manager.last_received_at is not None:
+                stats["scoreboard_age"] = now - manager.last_received_at
+        return stats
+
+
+def hud_alerts(stats: dict) -> list:
+    """What an operator should look at, e.g. a camera falling behind."""
+    alerts = []
+    capture_fps = stats["capture_fps"]
+    if (
+        capture_fps is not None
+        and capture_fps < stats["target_fps"] * CAPTURE_FPS_ALERT
+    ):
+        alerts.append("camera below target fps")
+    age = stats["scoreboard_age"]
+    if age is not None and age > SCOREBOARD_STALE_SECONDS:
+        alerts.append("no scoreboard data")
+    return alerts
+
+
+def _figure(value: Optional[float], spec: str, unit: str = "") -> str:
+    return "-" if value is None else f"{value:{spec}}{unit}"
+
+
+def format_hud(stats: dict) -> str:
+    """The HUD text, one line per component."""
+    capture = _figure(stats["capture_fps"], ".1f")
+    display = _figure(stats["display_fps"], ".1f")
+    latency = _figure(stats["latency_ms"], ".1f", " ms")
+    lines = [
+        f"Capture {capture} / {stats['target_fps']} fps   "
+        f"Display {display} fps",
+        f"Dropped {stats['dropped']}   Skipped {stats['skipped']}   "
+        f"Latency {latency}",
+        f"Buffer {stats['buffer_fill_seconds']:.1f} / "
+        f"{stats['buffer_capacity_seconds']:.1f} s "
+        f"({format_bytes(stats['buffer_bytes'])})",
+    ]
+    if stats["available_bytes"] is not None:
+        lines[-1] += f"   RAM free {format_bytes(stats['available_bytes'])}"
+    encode = f"Encode {stats['encode_queue']} queued"
+    if stats["encode_progress"] is not None:
+        encode += f", {stats['encode_progress']:.0%}"
+    lines.append(encode)
+    if stats["scoreboard_age"] is None:
+        lines.append("Scoreboard no data yet")
+    else:
+        rate = _figure(stats["scoreboard_rate"], ".1f", "/s")
+        lines.append(
+            f"Scoreboard {rate}, last {stats['scoreboard_age']:.1f} s ago"
+        )
+    lines.extend(f"! {alert}" for alert in hud_alerts(stats))
+    return "\n".join(lines)
@@ -0,0 +1,293 @@
+"""
+Headless recorder: fills the replay buffer without a window and saves
+replays on command, e.g. on an unattended box per piste.
+
+    python -m RePoste.record --source synthetic:1080p --port 8765
+
+Commands, one per line, are read from stdin and from clients of the local
+control port (--port); on POSIX, SIGUSR1 saves a replay.
+    save [filename]   save the buffered replay (in the background)
+    stats             print capture, buffer, encode and scoreboard figures
+    quit              stop recording, finish the saves and exit
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse  # noqa: E402
+import logging  # noqa: E402
+import signal  # noqa: E402
+import socketserver  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+
+from logging_setup import (  # noqa: E402
+    LOG_FILE,
+    parse_level_overrides,
+    setup_logging,
+)
+from memory_governor import (  # noqa: E402
+    MemoryGovernor,
+    PRESSURE_CHECK_INTERVAL_MS,
+)
+from perf_counters import HudSampler, format_hud  # noqa: E402
+from recorder_core import CaptureWorker, RecorderCore  # noqa: E402
+
+logger = logging.getLogger("reposte.record")
+
+CONTROL_HOST = "127.0.0.1"
+# How long the last saves may take to finish at exit (seconds)
+SAVE_FLUSH_TIMEOUT = 30.0
+CAPTURE_STOP_TIMEOUT = 1.0
+COMMANDS = "save [filename], stats or quit"
+
+
+class Controller:
+    """Runs the commands of stdin, the control port and signals."""
+
+    def __init__(self, core: RecorderCore, sampler: HudSampler):
+        self.core = core
+        self.sampler = sampler
+        self.stopped = threading.Event()
+        # Set by SIGUSR1, the save runs on the main loop: a signal handler
+        # must not wait for the lock the interrupted code may hold
+        self.save_requested = threading.Event()
+        self._lock = threading.Lock()
+
+    def handle(self, line: str) -> str:
+        command, _, argument = line.strip().partition(" ")
+        command = command.lower()
+        if not command:
+            return ""
+        with self._lock:
+            if command == "save":
+                frames = len(self.core.buffer)
+                self.core.save_replay(argument.strip() or None, True)
+                return f"Saving a replay of {frames} frames"
+            if command == "stats":
+                return format_hud(self.sampler.sample())
+            if command in ("quit", "exit"):
+                self.stopped.set()
+                return "Stopping"
+        return f"Unknown command {command!r}, expected {COMMANDS}"
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            reply = self.server.controller.handle(
+                line.decode(errors="replace")
+            )
+            self.wfile.write(f"{reply}\n".encode())
+
+
+class ControlServer(socketserver.ThreadingTCPServer):
+    """Line based control port, bound to localhost only."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, controller: Controller, port: int):
+        super().__init__((CONTROL_HOST, port), _ControlHandler)
+        self.controller = controller
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+def read_commands(controller: Controller, stream):
+    """Run each line of stream as a command, printing the reply."""
+    for line in stream:
+        reply = controller.handle(line)
+        if reply:
+            print(reply, flush=True)
+
+
+def reader_factory(source: str, fps: int):
+    """
+    Opener of the --source: None for the configured camera,
+    synthetic[:resolution] for a generated pattern, or a video file.
+    """
+    if not source:
+        return None
+    from synthetic_camera import RESOLUTIONS, SyntheticReader
+
+    kind, _, resolution = source.partition(":")
+    if kind == "synthetic":
+        if (resolution or "1080p") not in RESOLUTIONS:
+            raise ValueError(
+                f"unknown resolution {resolution!r}, expected one of "
+                f"{', '.join(RESOLUTIONS)}"
+            )
+        size = RESOLUTIONS[resolution or "1080p"]
+        return lambda: SyntheticReader(size, fps=fps)
+    if not os.path.exists(source):
+        raise ValueError(f"no such video file {source!r}")
+    return lambda: SyntheticReader(fps=fps, source=source)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="RePoste headless recorder")
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument(
+        "--buffer", type=int, default=5, help="replay length (seconds)"
+    )
+    parser.add_argument("--output", default="output", help="replay folder")
+    parser.add_argument(
+        "--source",
+        help="synthetic[:480p|720p|1080p|4K] or a video file instead of "
+        "the configured camera",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help=f"accept commands on {CONTROL_HOST}:PORT (0 picks a port)",
+    )
+    parser.add_argument(
+        "--scoreboard",
+        action="store_true",
+        help="connect to the scoreboard and save its states with replays",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=10.0,
+        help="print stats every this many seconds, 0 for never",
+    )
+    parser.add_argument(
+        "--duration", type=float, help="stop after this many seconds"
+    )
+    parser.add_argument(
+        "--no-stdin", action="store_true", help="ignore commands on stdin"
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+    )
+    parser.add_argument(
+        "--log", action="append", default=[], metavar="SUBSYSTEM=LEVEL"
+    )
+    parser.add_argument("--log-file", default=LOG_FILE)
+    args = parser.parse_args(argv)
+    try:
+        args.log = parse_level_overrides(args.log)
+        args.reader_factory = reader_factory(args.source, args.fps)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def install_signal_handlers(controller: Controller) -> dict:
+    """Stop on SIGINT/SIGTERM, save on SIGUSR1. Returns the old ones."""
+    handlers = {
+        signal.SIGINT: lambda *_: controller.stopped.set(),
+        signal.SIGTERM: lambda *_: controller.stopped.set(),
+    }
+    if hasattr(signal, "SIGUSR1"):
+        handlers[signal.SIGUSR1] = lambda *_: controller.save_requested.set()
+    return {
+        sig: signal.signal(sig, handler) for sig, handler in handlers.items()
+    }
+
+
+def run(args) -> int:
+    core = RecorderCore(
+        fps=args.fps,
+        buffer_duration=args.buffer,
+        output_dir=args.output,
+        reader_factory=args.reader_factory,
+    )
+    governor = MemoryGovernor(core)
+    scoreboard = None
+    if args.scoreboard:
+        from PyQt6.QtCore import Qt
+        from scoreboard_manager import ScoreboardManager
+
+        scoreboard = ScoreboardManager()
+        # There is no event loop to queue to, record on the BLE thread
+        scoreboard.state_updated.connect(
+            core.record_scoreboard, Qt.ConnectionType.DirectConnection
+        )
+        scoreboard.start()
+    controller = Controller(core, HudSampler(core, scoreboard, governor))
+    worker = CaptureWorker(core)
+    try:
+        worker.start()
+    except Exception as e:
+        logger.error(f"Could not open the camera: {e}")
+        if scoreboard is not None:
+            scoreboard.stop()
+        return 1
+    governor.apply(args.buffer)
+    logger.info("Recording started.")
+
+    server = None
+    if args.port is not None:
+        server = ControlServer(controller, args.port)
+        threading.Thread(
+            target=server.serve_forever, name="control", daemon=True
+        ).start()
+        print(f"Control port {CONTROL_HOST}:{server.port}", flush=True)
+    if not args.no_stdin:
+        threading.Thread(
+            target=read_commands,
+            args=(controller, sys.stdin),
+            name="stdin",
+            daemon=True,
+        ).start()
+    old_handlers = install_signal_handlers(controller)
+
+    started = time.monotonic()
+    pressure_interval = PRESSURE_CHECK_INTERVAL_MS / 1000
+    next_pressure_check = started + pressure_interval
+    next_stats = started + (args.stats_interval or float("inf"))
+    exit_code = 0
+    try:
+        while not controller.stopped.wait(0.1):
+            now = time.monotonic()
+            if not worker.running:
+                exit_code = 1
+                break
+            if args.duration and now - started >= args.duration:
+                break
+            if controller.save_requested.is_set():
+                controller.save_requested.clear()
+                logger.info(controller.handle("save"))
+            if now >= next_pressure_check:
+                governor.check_pressure()
+                next_pressure_check = now + pressure_interval
+            if now >= next_stats:
+                print(controller.handle("stats"), flush=True)
+                next_stats = now + args.stats_interval
+    finally:
+        for sig, handler in old_handlers.items():
+            signal.signal(sig, handler)
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        worker.stop(CAPTURE_STOP_TIMEOUT)
+        if scoreboard is not None:
+            scoreboard.stop()
+        core.wait_for_saves(SAVE_FLUSH_TIMEOUT)
+        print(controller.handle("stats"), flush=True)
+        logger.info("Recording stopped.")
+    return exit_code
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    log_listener = setup_logging(
+        logging.getLevelName(args.log_level), args.log_file or None, args.log
+    )
+    try:
+        return run(args)
+    finally:
+        log_listener.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,537 @@
+"""
+The recording engine without the GUI: opens the camera, keeps the replay
+buffer, records the scoreboard alongside it and saves replays. It runs
+headless with a CaptureWorker thread (see record.py); the Qt app drives it
+from its event loop through video_manager.VideoRecorder.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+import logging
+from typing import Callable, Optional
+
+import numpy as np
+
+from memory_governor import FRAME_SCALES, scaled_frame_bytes
+from perf_counters import FrameCounters
+from tracing import traced, tracer
+
+logger = logging.getLogger("reposte.video")
+
+# imageio (and numpy with it) is imported where it is first used, on the
+# camera thread when the camera is opened in the background, so importing
+# this module does not hold up the window.
+
+# Written by the Config_Generator: the camera and the mode to record with
+CAMERA_CONFIG_FILE = os.path.join(
+    os.path.dirname(__file__), "config", "camera_config.json"
+)
+DEFAULT_CAMERA = "<video0>"
+COMPRESSED_FORMATS = {"mjpeg", "h264"}
+# Delivered frame rate may differ this much from the configured one
+FPS_TOLERANCE = 0.5
+# Scoreboard changes kept for the replay buffer's span
+TIMELINE_ENTRIES = 4096
+
+
+def load_camera_config(path: str = CAMERA_CONFIG_FILE) -> dict:
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def camera_uri(config: dict, platform: Optional[str] = None) -> Optional[str]:
+    """
+    The imageio camera URI of the configured camera, or None if the config
+    does not name a camera usable on this platform (e.g. it was generated
+    on another machine).
+    """
+    platform = platform or sys.platform
+    if platform.startswith("linux"):
+        match = re.fullmatch(
+            r"/dev/video(\d+)", config.get("camera_path", "")
+        )
+        return f"<video{match.group(1)}>" if match else None
+    # dshow and avfoundation cameras are opened by their listed index
+    if "index" in config:
+        return f"<video{int(config['index'])}>"
+    return None
+
+
+def mode_input_params(mode: dict, platform: Optional[str] = None) -> list:
+    """
+    ffmpeg input options forcing a capture mode. Without them many webcams
+    fall back to 30 fps, or to a raw mode at 5 fps.
+    """
+    platform = platform or sys.platform
+    pixel_format = mode["pixel_format"]
+    if platform.startswith("linux"):
+        params = ["-input_format", pixel_format]
+    elif pixel_format in COMPRESSED_FORMATS:
+        params = ["-vcodec", pixel_format]
+    else:
+        params = ["-pixel_format", pixel_format]
+    params += ["-video_size", f"{mode['width']}x{mode['height']}"]
+    if mode.get("fps"):
+        params += ["-framerate", f"{mode['fps']:g}"]
+    return params
+
+
+def check_capture_mode(mode: dict, meta: dict) -> list:
+    """Describe how the mode the camera delivers differs from mode."""
+    mismatches = []
+    size = tuple(meta.get("size") or ())
+    if size != (mode["width"], mode["height"]):
+        mismatches.append(
+            f"size {'x'.join(map(str, size)) or 'unknown'} "
+            f"instead of {mode['width']}x{mode['height']}"
+        )
+    fps = meta.get("fps") or 0
+    if mode.get("fps") and abs(fps - mode["fps"]) > FPS_TOLERANCE:
+        mismatches.append(f"{fps:g} fps instead of {mode['fps']:g}")
+    codec = meta.get("codec")
+    if mode["pixel_format"] in COMPRESSED_FORMATS and codec:
+        if codec != mode["pixel_format"]:
+            mismatches.append(f"{codec} instead of {mode['pixel_format']}")
+    return mismatches
+
+
+def downscale_frame(frame, factor: int):
+    """
+    Average factor x factor blocks of pixels, so replays of downscaled
+    frames are not aliased. A frame not divisible by factor gets its edge
+    pixels repeated, keeping the size scaled_frame_bytes() costs.
+    """
+    if factor == 1:
+        return frame
+    height, width = frame.shape[:2]
+    pad_height, pad_width = -height % factor, -width % factor
+    if pad_height or pad_width:
+        frame = np.pad(
+            frame,
+            ((0, pad_height), (0, pad_width)) + ((0, 0),) * (frame.ndim - 2),
+            mode="edge",
+        )
+        height, width = frame.shape[:2]
+    channels = frame[0, 0].size
+    # Sum the rows of each block, then its columns, which are neighbours
+    # in memory; uint16 holds the sum of 4 x 4 uint8 pixels
+    rows = frame.reshape(height // factor, factor, width * channels)
+    total = np.add(rows[:, 0], rows[:, 1], dtype=np.uint16)
+    for row in range(2, factor):
+        total += rows[:, row]
+    columns = total.reshape(height // factor, width // factor, factor, -1)
+    blocks = columns[:, :, 0] + columns[:, :, 1]
+    for column in range(2, factor):
+        blocks += columns[:, :, column]
+    count = factor * factor
+    blocks += count // 2
+    if count & (count - 1):
+        blocks //= count
+    else:
+        # A shift is much faster, and the FRAME_SCALES are powers of two
+        blocks >>= count.bit_length() - 1
+    return blocks.astype(np.uint8).reshape(
+        (height // factor, width // factor) + frame.shape[2:]
+    )
+
+
+def upscale_frame(frame, factor: int, height: int, width: int):
+    """Repeat each pixel factor times, cropped to height x width."""
+    return frame.repeat(factor, axis=0).repeat(factor, axis=1)[
+        :height, :width
+    ]
+
+
+class ScoreboardTimeline:
+    """
+    Scoreboard states by the frame they were first shown with, so a saved
+    replay can carry the scoreboard of each of its frames.
+    """
+
+    def __init__(self, maxlen: int = TIMELINE_ENTRIES):
+        self.entries = deque(maxlen=maxlen)
+
+    def record(self, frame: int, state: Optional[dict]):
+        self.entries.append((frame, state))
+
+    def clear(self):
+        self.entries.clear()
+
+    def span(self, first: int, stop: int) -> list:
+        """
+        The states of frames first to stop, as (offset from first, state),
+        starting with the state that was showing at first.
+        """
+        states = []
+        for frame, state in list(self.entries):
+            if frame >= stop:
+                break
+            if frame <= first:
+                states = [(0, state)]
+            else:
+                states.append((frame - first, state))
+        return states
+
+
+class RecorderCore:
+    """
+    Camera, replay buffer and replay saves. Frames go in through
+    ingest_frame(), from a CaptureWorker or the Qt capture loop. The
+    buffer is only changed under buffer_lock, so saves, resizes and the
+    capture thread can run side by side.
+    """
+
+    # Frame downscales the memory governor may choose from
+    frame_scales = FRAME_SCALES
+
+    def __init__(
+        self,
+        fps: int = 60,
+        buffer_duration: int = 5,
+        output_dir: str = "output",
+        camera_config: Optional[dict] = None,
+        reader_factory: Optional[Callable[[], object]] = None,
+    ):
+        self.fps = fps
+        self.buffer_duration = buffer_duration
+        self.buffer = deque(
+            maxlen=fps * buffer_duration,
+        )
+        self.buffer_lock = threading.Lock()
+        # Frames ever buffered, numbering them for the scoreboard timeline
+        self.frames_buffered = 0
+        # Buffered frames are kept at 1/frame_scale of the capture size,
+        # set by the memory governor when full frames do not fit in RAM
+        self.frame_scale = 1
+        self.output_dir = output_dir
+        self.reader = None
+        self.camera_config = (
+            load_camera_config() if camera_config is None else camera_config
+        )
+        # Opens something with the imageio reader interface in place of
+        # the camera (e.g. a SyntheticReader)
+        self.reader_factory = reader_factory
+        # What the camera actually delivers, and how it differs from the
+        # configured mode
+        self.capture_mode = {}
+        self.capture_mismatches = []
+        # Background replay encodes, one at a time in save order
+        self.save_executor = None
+        self.pending_saves = set()
+        # Saves finish (and drop out of pending_saves) on the worker thread
+        self.saves_lock = threading.Lock()
+        # Read by the performance HUD
+        self.counters = FrameCounters()
+        self.timeline = ScoreboardTimeline()
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _open_reader(self):
+        if self.reader_factory is not None:
+            reader, mode = self.reader_factory(), None
+        else:
+            reader, mode = self._open_camera()
+
+        meta = reader.get_meta_data()
+        self.capture_mode = {
+            key: meta.get(key) for key in ("size", "fps", "codec", "pix_fmt")
+        }
+        self.capture_mismatches = (
+            check_capture_mode(mode, meta) if mode else []
+        )
+        if self.capture_mismatches:
+            logger.warning(
+                f"Camera did not accept the configured mode: "
+                f"{', '.join(self.capture_mismatches)}"
+            )
+        return reader
+
+    def _open_camera(self):
+        import imageio
+
+        uri = camera_uri(self.camera_config)
+        mode = self.camera_config.get("mode") if uri else None
+        if uri is None:
+            if self.camera_config.get("camera_path"):
+                logger.warning(
+                    f"Configured camera {self.camera_config.get('name')} "
+                    f"is not available on this platform, using "
+                    f"{DEFAULT_CAMERA}."
+                )
+            uri = DEFAULT_CAMERA
+        if not mode:
+            return imageio.get_reader(uri, "ffmpeg"), None
+        reader = imageio.get_reader(
+            uri, "ffmpeg", input_params=mode_input_params(mode)
+        )
+        return reader, mode
+
+    def ingest_frame(self, frame):
+        """Buffer a captured frame, at the buffer's scale."""
+        if self.frame_scale > 1:
+            with tracer.span("downscale"):
+                frame = downscale_frame(frame, self.frame_scale)
+        with self.buffer_lock:
+            self.buffer.append(frame)
+            self.frames_buffered += 1
+
+    def record_scoreboard(self, state):
+        """Note a scoreboard state (None when blank) from the next frame."""
+        self.timeline.record(
+            self.frames_buffered, state.to_dict() if state else None
+        )
+
+    def snapshot(self):
+        """The buffered frames, and the frame number of the first one."""
+        with self.buffer_lock:
+            frames = list(self.buffer)
+            first = self.frames_buffered - len(frames)
+        return frames, first
+
+    def save_replay(
+        self, filename: Optional[str] = None, background: bool = False
+    ):
+        """
+        Write the buffered frames to an mp4 in output_dir, with the
+        scoreboard of the replay next to it (see write_timeline). With
+        background=True the frames are snapshotted and encoded on a worker
+        thread, and the Future of the encode is returned; its result is
+        the path saved to, None if the save failed. Only the base name of
+        filename is used, so it cannot point outside output_dir.
+        """
+        # Names come from remote clients (record.py, the remote control)
+        filename = os.path.basename(filename or "")
+        if not filename:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            filename = f"replay_{timestamp}.mp4"
+
+        output_path = os.path.join(self.output_dir, filename)
+        frames, first = self.snapshot()
+        self.write_timeline(output_path, first, first + len(frames))
+        if not background:
+            self._write_replay(output_path, frames)
+            return None
+
+        if self.save_executor is None:
+            self.save_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="replay-save"
+            )
+        future = self.save_executor.submit(
+            self._write_replay, output_path, frames
+        )
+        with self.saves_lock:
+            self.pending_saves.add(future)
+        future.add_done_callback(self._save_finished)
+        return future
+
+    def _save_finished(self, future):
+        with self.saves_lock:
+            self.pending_saves.discard(future)
+
+    @traced("encode replay")
+    def _write_replay(self, output_path, frames) -> Optional[str]:
+        import imageio
+
+        counters = self.counters
+        counters.encode_done = 0
+        counters.encode_total = len(frames)
+        try:
+            with imageio.get_writer(output_path, fps=self.fps) as writer:
+                for frame in frames:
+                    writer.append_data(frame)
+                    counters.encode_done += 1
+            logger.info(f"Replay saved to {output_path}")
+            return output_path
+        except Exception as e:
+            logger.error(f"Failed to save replay: {e}")
+            return None
+
+    def write_timeline(self, output_path: str, first: int, stop: int):
+        """
+        Save the scoreboard states of frames first to stop as JSON next to
+        the replay (replay.mp4 -> replay.scoreboard.json), if there are any.
+        """
+        states = self.timeline.span(first, stop)
+        if not states:
+            return None
+        path = f"{os.path.splitext(output_path)[0]}.scoreboard.json"
+        timeline = {
+            "fps": self.fps,
+            "frames": stop - first,
+            "states": [
+                {"frame": offset, "state": state} for offset, state in states
+            ],
+        }
+        try:
+            with open(path, "w") as file:
+                json.dump(timeline, file)
+        except OSError as e:
+            logger.error(f"Failed to save the scoreboard timeline: {e}")
+            return None
+        return path
+
+    def wait_for_saves(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait up to timeout seconds for background replay encodes. Returns
+        False if some are still running; the worker thread is joined at
+        interpreter exit, so they still finish.
+        """
+        started = time.monotonic()
+        with self.saves_lock:
+            pending = list(self.pending_saves)
+        done, not_done = wait(pending, timeout)
+        if not_done:
+            logger.warning(
+                f"{len(not_done)} replay save(s) still encoding after "
+                f"{time.monotonic() - started:.2f} s"
+            )
+            return False
+        return True
+
+    def set_buffer_duration(self, duration: int):
+        """
+        Resize the replay buffer, keeping the most recent frames that fit.
+        The new deque only copies frame references, so capture carries on
+        with the next frame.
+        """
+        with self.buffer_lock:
+            self.buffer = deque(self.buffer, maxlen=self.fps * duration)
+            self.buffer_duration = duration
+            kept = len(self.buffer)
+        logger.info(
+            f"Buffer duration set to {duration} seconds "
+            f"({kept} frames kept)."
+        )
+
+    def set_frame_scale(self, scale: int):
+        """
+        Keep buffered frames at 1/scale of the capture size, rescaling the
+        ones already buffered so a replay has a single frame size.
+        """
+        if scale == self.frame_scale:
+            return
+        with self.buffer_lock:
+            self._rescale_buffer(scale)
+        logger.info(
+            "Replay frames kept at "
+            f"{'full size' if scale == 1 else f'1/{scale} size'}."
+        )
+
+    def _rescale_buffer(self, scale: int):
+        old_scale, self.frame_scale = self.frame_scale, scale
+        size = self.frame_size()
+        frames = self.buffer
+        self.buffer = deque(maxlen=frames.maxlen)
+        # Pop while converting so the old frames are freed one by one
+        while frames:
+            frame = frames.popleft()
+            if scale > old_scale:
+                frame = downscale_frame(frame, scale // old_scale)
+            elif size:
+                frame = upscale_frame(
+                    frame,
+                    old_scale // scale,
+                    -(-size[1] // scale),
+                    -(-size[0] // scale),
+                )
+            else:
+                continue
+            self.buffer.append(frame)
+
+    def frame_size(self) -> Optional[tuple]:
+        """(width, height) the camera captures at, if known."""
+        size = self.capture_mode.get("size")
+        if size:
+            return tuple(size)
+        mode = self.camera_config.get("mode")
+        return (mode["width"], mode["height"]) if mode else None
+
+    def frame_bytes(self) -> int:
+        """
+        Memory one buffered frame takes: measured from the newest frame,
+        or estimated from the capture mode before any frame arrived.
+        """
+        if self.buffer:
+            return self.buffer[-1].nbytes
+        size = self.frame_size()
+        return scaled_frame_bytes(size, self.frame_scale) if size else 0
+
+    def buffer_cost(self, duration: float) -> int:
+        """Bytes a buffer of duration seconds takes at the current mode."""
+        return int(self.fps * duration) * self.frame_bytes()
+
+    def buffer_stats(self) -> dict:
+        """Capacity and fill level of the buffer, in seconds and bytes."""
+        frame_bytes = self.frame_bytes()
+        capacity = self.buffer.maxlen or len(self.buffer)
+        return {
+            "capacity_seconds": capacity / self.fps,
+            "fill_seconds": len(self.buffer) / self.fps,
+            "capacity_bytes": capacity * frame_bytes,
+            "fill_bytes": len(self.buffer) * frame_bytes,
+            "frame_bytes": frame_bytes,
+        }
+
+
+class CaptureWorker:
+    """
+    Reads the camera on its own thread, as fast as it delivers frames,
+    into a RecorderCore. The headless recorder's capture loop.
+    """
+
+    def __init__(self, core: RecorderCore, on_frame=None):
+        self.core = core
+        # Called with each frame on the capture thread, before buffering
+        self.on_frame = on_frame
+        self.running = False
+        self.thread = None
+        self.error = None
+
+    def start(self):
+        """Open the camera and start capturing. Raises if it won't open."""
+        core = self.core
+        core.reader = core._open_reader()
+        core.counters.last_capture_ns = 0
+        self.running = True
+        self.thread = threading.Thread(
+            target=self._run, name="capture", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self):
+        core = self.core
+        try:
+            while self.running:
+                with tracer.span("camera read"):
+                    frame = core.reader.get_next_data()
+                core.counters.frame_captured(time.perf_counter_ns(), core.fps)
+                if self.on_frame is not None:
+                    self.on_frame(frame)
+                core.ingest_frame(frame)
+        except Exception as e:
+            if self.running:
+                self.error = e
+                logger.error(f"Error capturing frame: {e}")
+        finally:
+            self.running = False
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Stop capturing and close the camera. False if still reading."""
+        self.running = False
+        stopped = True
+        if self.thread is not None:
+            self.thread.join(timeout)
+            stopped = not self.thread.is_alive()
+        if stopped and self.core.reader is not None:
+            self.core.reader.close()
+        return stopped
@@ -0,0 +1,517 @@
+"""
+Remote control of the station over HTTP and WebSocket, e.g. from a table
+official's tablet. Standard library only: an asyncio server on its own
+thread, bound to localhost unless given the LAN address.
+
+    GET  /status
+    POST /save                  {"filename": "touch.mp4"} (optional)
+    POST /replay/start
+    POST /replay/stop
+    POST /replay/speed          {"speed": 0.5}
+    POST /replay/step           {"frames": -1}
+    POST /replay/seek           {"frame": 120} or {"position": 0.25}
+    GET  /ws                    WebSocket, see below
+    GET  /stream/<rendition>.mjpeg  the operator's view, see mjpeg_stream
+
+A WebSocket client sends commands as {"id": 1, "command": "replay/step",
+"frames": 1} and gets replies carrying its id. Events, e.g. {"event":
+"saved", "path": ...} or {"event": "scoreboard", "state": ...}, are
+pushed as they happen. Every reply has latency_ms, the time from the
+request being read to the command done, and queue_ms, the part of it
+spent waiting for the thread the command runs on (the GUI thread in the
+app). With a token, requests need "Authorization: Bearer <token>" or a
+?token= query parameter.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import suppress
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from worker_utils import LatencyStats, join_thread
+
+logger = logging.getLogger("reposte.remote")
+
+DEFAULT_HOST = "127.0.0.1"
+STREAM_PATH = "/stream/"
+STOP_TIMEOUT = 0.2
+# Request line plus headers, and request body / WebSocket message bytes
+MAX_HEADER_BYTES = 16 << 10
+MAX_BODY_BYTES = 1 << 20
+# Events queued per WebSocket client; the oldest go first when it lags
+EVENT_QUEUE = 64
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_CONTINUATION, OP_TEXT, OP_BINARY = 0x0, 0x1, 0x2
+OP_CLOSE, OP_PING, OP_PONG = 0x8, 0x9, 0xA
+
+STATUS_TEXT = {
+    101: "Switching Protocols",
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class Request:
+    def __init__(self, method: str, target: str, headers: dict, body: bytes):
+        self.method = method
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query = {
+            key: values[-1] for key, values in parse_qs(parts.query).items()
+        }
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+    def json(self) -> dict:
+        if not self.body:
+            return {}
+        try:
+            params = json.loads(self.body)
+        except ValueError as e:
+            raise BadRequest(f"invalid JSON: {e}")
+        if not isinstance(params, dict):
+            raise BadRequest("expected a JSON object")
+        return params
+
+
+async def read_request(reader) -> Optional[Request]:
+    """The next request on a connection, None once the client closed it."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise BadRequest("incomplete request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise BadRequest("request headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise BadRequest(f"bad request line {lines[0]!r}")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name:
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise BadRequest("bad Content-Length")
+    if not 0 <= length <= MAX_BODY_BYTES:
+        raise BadRequest("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, headers, body)
+
+
+def http_response(
+    status: int,
+    body: bytes,
+    content_type: str = "application/json",
+    keep_alive: bool = True,
+) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+def websocket_accept(key: str) -> str:
+    digest = hashlib.sha1((key + WS_GUID).encode()).digest()
+    return base64.b64encode(digest).decode()
+
+
+def _mask(data: bytes, mask: bytes) -> bytes:
+    size = len(data)
+    key = (mask * (size // 4 + 1))[:size]
+    masked = int.from_bytes(data, "big") ^ int.from_bytes(key, "big")
+    return masked.to_bytes(size, "big")
+
+
+def encode_frame(
+    payload: bytes, opcode: int = OP_TEXT, mask: Optional[bytes] = None
+) -> bytes:
+    """A whole WebSocket frame; clients must mask theirs (4 byte mask)."""
+    size = len(payload)
+    mask_bit = 0x80 if mask else 0
+    head = bytearray([0x80 | opcode])
+    if size < 126:
+        head.append(mask_bit | size)
+    elif size < 1 << 16:
+        head.append(mask_bit | 126)
+        head += size.to_bytes(2, "big")
+    else:
+        head.append(mask_bit | 127)
+        head += size.to_bytes(8, "big")
+    if mask:
+        head += mask
+        payload = _mask(payload, mask)
+    return bytes(head) + payload
+
+
+async def read_frame(reader) -> tuple:
+    """(fin, opcode, payload) of the next WebSocket frame, unmasked."""
+    first, second = await reader.readexactly(2)
+    size = second & 0x7F
+    if size == 126:
+        size = int.from_bytes(await reader.readexactly(2), "big")
+    elif size == 127:
+        size = int.from_bytes(await reader.readexactly(8), "big")
+    if size > MAX_BODY_BYTES:
+        raise BadRequest("WebSocket frame too large")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(size)
+    if mask:
+        payload = _mask(payload, mask)
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+def call_inline(function) -> Future:
+    """Run function now, on the calling thread."""
+    future = Future()
+    try:
+        future.set_result(function())
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class _Client:
+    """A WebSocket connection and its queue of events to push."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.events = asyncio.Queue(EVENT_QUEUE)
+        self.dropped = 0
+        self._lock = asyncio.Lock()
+
+    async def write(self, frame: bytes):
+        async with self._lock:
+            self.writer.write(frame)
+            await self.writer.drain()
+
+    async def send(self, message: dict):
+        await self.write(encode_frame(json.dumps(message).encode()))
+
+    def push(self, event: dict):
+        if self.events.full():
+            self.events.get_nowait()
+            self.dropped += 1
+        self.events.put_nowait(event)
+
+    async def pump_events(self):
+        while True:
+            await self.send(await self.events.get())
+
+
+class RemoteControlServer:
+    """
+    Serves commands, a dict of name -> handler(params) returning a JSON
+    serialisable result, and pushes broadcast() events to WebSocket
+    clients. call(function) runs a handler where it has to run and
+    returns a concurrent Future of its result; by default it runs on the
+    server's thread. A handler raises ValueError on bad parameters.
+    stream, an MjpegBroadcaster, is served under /stream/ and started
+    and stopped with the server.
+    """
+
+    def __init__(
+        self,
+        commands: Dict[str, Callable[[dict], object]],
+        call: Callable[[Callable[[], object]], Future] = call_inline,
+        host: str = DEFAULT_HOST,
+        port: int = 0,
+        token: Optional[str] = None,
+        stream=None,
+    ):
+        self.commands = commands
+        self.call = call
+        self.host = host
+        self.port = port
+        self.token = token
+        self.stream = stream
+        self.latency = {}
+        self.clients = set()
+        self.loop = None
+        self.thread = None
+        self._server = None
+        self._connections = set()
+
+    def start(self) -> int:
+        """Start serving, returns the port. Raises OSError if it can't."""
+        started = threading.Event()
+        errors = []
+        self.thread = threading.Thread(
+            target=self._run_loop,
+            args=(started, errors),
+            name="remote-control",
+            daemon=True,
+        )
+        self.thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        if self.stream is not None:
+            self.stream.start()
+        logger.info(f"Remote control on http://{self.host}:{self.port}/")
+        return self.port
+
+    def _run_loop(self, started: threading.Event, errors: list):
+        loop = self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(
+                    self._serve, self.host, self.port, limit=MAX_HEADER_BYTES
+                )
+            )
+        except OSError as e:
+            errors.append(e)
+            loop.close()
+            started.set()
+            return
+        self.port = self._server.sockets[0].getsockname()[1]
+        started.set()
+        try:
+            loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True)
+            )
+            loop.close()
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> bool:
+        """Close the server and its connections, wait for the thread."""
+        if self.stream is not None:
+            self.stream.stop()
+        if self.loop is not None:
+            with suppress(RuntimeError):  # The loop closed already
+                self.loop.call_soon_threadsafe(self._shutdown)
+        return join_thread(self.thread, timeout, "Remote control")
+
+    def _shutdown(self):
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        self.loop.stop()
+
+    def broadcast(self, event: dict):
+        """Push event to every WebSocket client, from any thread."""
+        if self.loop is None or not self.clients:
+            return
+        with suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(self._push, event)
+
+    def _push(self, event: dict):
+        for client in self.clients:
+            client.push(event)
+
+    def latency_report(self) -> dict:
+        """Command to action latency of each command run so far."""
+        return {
+            name: {
+                "avg_ms": stats.mean() * 1000,
+                "p99_ms": stats.p99() * 1000,
+                "samples": len(stats.samples),
+            }
+            for name, stats in self.latency.items()
+        }
+
+    async def run_command(self, name: str, params: dict) -> tuple:
+        """(HTTP status, reply) of command name run with params."""
+        received = time.perf_counter()
+        handler = self.commands.get(name)
+        if handler is None:
+            return 404, {"ok": False, "error": f"unknown command {name!r}"}
+        timing = {}
+
+        def run():
+            timing["started"] = time.perf_counter()
+            try:
+                return handler(params)
+            finally:
+                timing["done"] = time.perf_counter()
+
+        try:
+            result = await asyncio.wrap_future(self.call(run))
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"ok": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Remote command {name} failed: {e}")
+            return 500, {"ok": False, "error": str(e)}
+        latency = timing["done"] - received
+        self.latency.setdefault(name, LatencyStats()).add(latency)
+        if name == "status" and isinstance(result, dict):
+            result = dict(result, latency=self.latency_report())
+            if self.stream is not None:
+                result["stream"] = self.stream.stats()
+        return 200, {
+            "ok": True,
+            "result": result,
+            "latency_ms": latency * 1000,
+            "queue_ms": (timing["started"] - received) * 1000,
+        }
+
+    def _authorized(self, request: Request) -> bool:
+        if self.token is None:
+            return True
+        scheme, _, offered = request.headers.get(
+            "authorization", ""
+        ).partition(" ")
+        if scheme.lower() != "bearer":
+            offered = request.query.get("token", "")
+        return hmac.compare_digest(offered.encode(), self.token.encode())
+
+    async def _serve(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except BadRequest as e:
+                    writer.write(
+                        http_response(400, _error(str(e)), keep_alive=False)
+                    )
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                if not self._authorized(request):
+                    status, reply = 401, _error("bad or missing token")
+                elif (
+                    request.path == "/ws"
+                    and request.headers.get("upgrade", "").lower()
+                    == "websocket"
+                ):
+                    await self._serve_websocket(request, reader, writer)
+                    break
+                elif request.path.startswith(STREAM_PATH):
+                    if await self._serve_stream(request, writer):
+                        break
+                    status, reply = 404, _error("no such stream")
+                else:
+                    status, reply = await self._http_command(request)
+                writer.write(http_response(status, reply, keep_alive=True))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # The server is shutting down
+        except Exception as e:
+            logger.error(f"Remote control connection failed: {e}")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _serve_stream(self, request: Request, writer) -> bool:
+        """Stream until the viewer leaves, False if there's no such stream."""
+        name = request.path.replace(STREAM_PATH, "", 1)
+        if name.endswith(".mjpeg"):
+            name = name.rsplit(".", 1)[0]
+        stream = self.stream
+        if stream is None or name not in stream.renditions:
+            return False
+        await stream.serve(name, writer)
+        return True
+
+    async def _http_command(self, request: Request) -> tuple:
+        name = request.path.strip("/")
+        expected = "GET" if name == "status" else "POST"
+        if name in self.commands and request.method != expected:
+            return 405, _error(f"{name} takes {expected}")
+        try:
+            params = request.json()
+        except BadRequest as e:
+            return 400, _error(str(e))
+        status, reply = await self.run_command(name, params)
+        return status, json.dumps(reply).encode()
+
+    async def _serve_websocket(self, request: Request, reader, writer):
+        key = request.headers.get("sec-websocket-key")
+        if not key:
+            writer.write(
+                http_response(400, _error("missing Sec-WebSocket-Key"))
+            )
+            return
+        writer.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n"
+            ).encode()
+        )
+        await writer.drain()
+        client = _Client(writer)
+        self.clients.add(client)
+        pump = asyncio.ensure_future(client.pump_events())
+        try:
+            await self._read_messages(client, reader)
+        except BadRequest as e:
+            logger.warning(f"Remote control client dropped: {e}")
+        finally:
+            self.clients.discard(client)
+            pump.cancel()
+
+    async def _read_messages(self, client: _Client, reader):
+        fragments = []
+        while True:
+            fin, opcode, payload = await read_frame(reader)
+            if opcode == OP_CLOSE:
+                with suppress(ConnectionError):
+                    await client.write(encode_frame(b"", OP_CLOSE))
+                return
+            if opcode == OP_PING:
+                await client.write(encode_frame(payload, OP_PONG))
+                continue
+            if opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                fragments.append(payload)
+            if not fin or not fragments:
+                continue
+            message, fragments = b"".join(fragments), []
+            await client.send(await self._ws_command(message))
+
+    async def _ws_command(self, message: bytes) -> dict:
+        try:
+            params = json.loads(message)
+            if not isinstance(params, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            return {"ok": False, "error": f"invalid message: {e}"}
+        request_id = params.pop("id", None)
+        name = str(params.pop("command", ""))
+        _, reply = await self.run_command(name, params)
+        reply["id"] = request_id
+        return reply
+
+
+def _error(message: str) -> bytes:
+    return json.dumps({"ok": False, "error": message}).encode()
@@ -1,17 +1,72 @@
 import asyncio
 import threading
+import json
 import logging
-from bleak import BleakClient, BleakScanner
+import os
+import random
+import time
+from collections import deque
+from typing import Optional
 from PyQt6.QtCore import QObject, pyqtSignal
-
-logger = logging.getLogger()
-
-# Official from SFS-Link Manual v1.2
-# SFS_Link[S/N]
-SFS_DEVICE_NAME = "SFS-Link [047]"
-SFS_ADDRESS = "54:32:04:78:64:4A"
-# SFS_UUID = "6f000009-b5a3-f393-e0a9-e50e24dcca9e"
-SFS_CHARACTERISTIC_UUID = "6f000009-b5a3-f393-e0a9-e50e24dcca9e"
+from scoreboard_state import (  # noqa: F401 (re-exported helpers)
+    decode_bcd,
+    decode_sfs_link_payload,
+    parse_lamp_bits,
+    parse_matches_and_priorities,
+    parse_penalty_bits,
+)
+from scoring_backends import ScoringBackend, SfsLinkBackend
+from tracing import tracer
+from worker_utils import (  # noqa: F401 (re-exported)
+    LatencyStats,
+    bounded,
+    cancel_task,
+    join_thread,
+)
+from scoreboard_transport import (  # noqa: F401 (re-exported)
+    DEVICE_CACHE_FILE,
+    SFS_ADDRESS,
+    SFS_CHARACTERISTIC_UUID,
+    SFS_DEVICE_NAME,
+    BleTransport,
+    ScoreboardTransport,
+    TransportError,
+    load_device_cache,
+    save_device_cache,
+)
+
+logger = logging.getLogger("reposte.scoreboard")
+# Every payload and parsed state, off unless set to DEBUG
+data_logger = logging.getLogger("reposte.scoreboard.data")
+
+# Reconnect backoff bounds (seconds), with jitter applied on top
+RECONNECT_DELAY_MIN = 0.5
+RECONNECT_DELAY_MAX = 30.0
+# Window (seconds) and sample cap for the reported update rate
+RATE_WINDOW = 5.0
+RATE_SAMPLES = 1024
+
+# Polling bounds (seconds) used when the characteristic cannot notify.
+# The interval backs off while the value is unchanged and snaps back to
+# the minimum as soon as it changes, so a lamp is never held back long.
+POLL_INTERVAL_MIN = 0.01
+POLL_INTERVAL_MAX = 0.1
+POLL_BACKOFF = 1.5
+# How often the notify loop checks whether it should keep listening
+NOTIFY_CHECK_INTERVAL = 0.25
+# Shutdown deadlines (seconds): the whole stop(), and the transport
+# disconnect within it, which can hang on a BLE link that already dropped
+STOP_TIMEOUT = 0.3
+DISCONNECT_TIMEOUT = 0.1
+
+
+def reconnect_delay(failures: int) -> float:
+    """
+    Jittered exponential backoff. The first retry after a dropped session
+    (no failures yet) waits about RECONNECT_DELAY_MIN.
+    """
+    delay = min(RECONNECT_DELAY_MAX, RECONNECT_DELAY_MIN * 2**failures)
+    return delay * random.uniform(0.5, 1.0)
 
 
 class ScoreboardManager(QObject):
@@ -19,18 +74,59 @@ class ScoreboardManager(QObject):
     Manages the BLE connection to the SFS-Link scoreboard.
     Runs the asyncio event loop in a background thread.
     Emits a PyQt signal whenever new scoreboard data arrives.
+
+    Another scoring machine is served by passing its transport and the
+    backend that parses its data (see scoring_backends).
     """
 
+    # Legacy dict form, only built while something is connected to it
     scoreboard_updated = pyqtSignal(dict)
-
-    def __init__(self, parent=None):
+    # ScoreboardState, or None when the scoreboard is blank
+    state_updated = pyqtSignal(object)
+    # True once a session is up, False when it ends
+    connection_changed = pyqtSignal(bool)
+    # Deltas between consecutive states, so consumers only redo what changed
+    score_changed = pyqtSignal(int, int)  # left, right
+    clock_changed = pyqtSignal(int, int)  # minutes, seconds
+    lamps_changed = pyqtSignal(object)  # LampState
+    cards_changed = pyqtSignal(object)  # PenaltyState
+    priority_changed = pyqtSignal(object)  # MatchState
+
+    def __init__(
+        self,
+        parent=None,
+        device_name: str = SFS_DEVICE_NAME,
+        address: str = SFS_ADDRESS,
+        cache_file: Optional[str] = None,
+        piste: Optional[str] = None,
+        transport: Optional[ScoreboardTransport] = None,
+        backend: Optional[ScoringBackend] = None,
+    ):
         super().__init__(parent)
+        self.transport = transport or BleTransport(
+            device_name, address, cache_file
+        )
+        self.backend = backend or SfsLinkBackend()
+        self.piste = piste
         self.loop = None
         self.thread = None
+        self._task = None
         self.client = None
         self.running = False
-        self.current_data = {}
-        self.data_lock = threading.Lock()
+        # Immutable, so it can be read from any thread without a lock
+        self.current_state = None
+        # Last non-blank state, the reference for delta signals
+        self._last_state = None
+        # "notify" or "poll" once the characteristic has been set up
+        self.update_mode = None
+        self.latency = LatencyStats()
+        # time.perf_counter() the data being handled is measured from: the
+        # notification's arrival, or the read before the poll that got it
+        self._latency_origin = None
+        self.emitted_count = 0
+        # time.monotonic() of the last data from the scoreboard
+        self.last_received_at = None
+        self._emit_times = deque(maxlen=RATE_SAMPLES)
 
     def start(self):
         """Launch the asyncio event loop in a background thread."""
@@ -42,26 +138,24 @@ class ScoreboardManager(QObject):
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
 
-    def stop(self):
-        """Stop the asyncio event loop and disconnect the BLE client."""
+    def stop(self, timeout: float = STOP_TIMEOUT) -> bool:
+        """
+        Cancel the session inside the event loop, which disconnects the
+        transport, and wait up to timeout seconds for the thread to exit.
+        Returns False if it was still running at the deadline.
+        """
         self.running = False
-        if self.loop:
-            self.loop.call_soon_threadsafe(self.loop.stop)
-        if self.thread:
-            self.thread.join()
-        if self.client:
-            self.loop.run_until_complete(self._stop_async())
-
-    async def _stop_async(self):
-        """Asynchronously disconnect the BLE client."""
-        if self.client and self.client.is_connected:
-            await self.client.disconnect()
+        cancel_task(self.loop, self._task)
+        return join_thread(self.thread, timeout, "ScoreboardManager")
 
     def _run_loop(self):
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self._task = self.loop.create_task(self._main_task())
         try:
-            self.loop.run_until_complete(self._main_task())
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
             logger.error(
                 f"Exception in scoreboard manager loop: {e}", exc_info=True
@@ -70,212 +164,299 @@ class ScoreboardManager(QObject):
             self.loop.close()
 
     async def _main_task(self):
-        logger.info("Scanning for BLE devices...")
-        target_device = await self._find_target_device()
-        if not target_device:
-            logger.error(
-                f"Device with name {SFS_DEVICE_NAME} "
-                f"or address {SFS_ADDRESS} not found."
-            )
+        """Keep a session with the SFS-Link alive until stopped."""
+        failures = 0
+        while self.running:
+            if await self._run_session():
+                failures = 0
+            else:
+                failures += 1
+            if not self.running:
+                break
+            delay = reconnect_delay(failures)
+            logger.info(f"Reconnecting to the SFS-Link in {delay:.1f} s")
+            await asyncio.sleep(delay)
+
+    async def _run_session(self) -> bool:
+        """
+        Connect, stream updates until the link drops, then disconnect.
+        Returns True if the session got as far as receiving updates.
+        """
+        transport = self.transport
+        try:
+            if not await transport.connect():
+                return False
+        except TransportError as e:
+            logger.error(str(e))
             self.running = False
-            return
+            return False
 
-        logger.info(
-            f"Connecting to device {target_device.name}"
-            f"at {target_device.address}"
-        )
-        async with BleakClient(target_device.address) as client:
-            self.client = client
-            if not client.is_connected:
-                logger.error("Failed to connect to the device.")
-                self.running = False
-                return
-
-            logger.info(f"Successfull connect to {target_device.address}")
-
-            # List available services and characteristics
-            logger.info("Listing available services and characteristics:")
-            for service in client.services:
-                logger.info(f"Service: {service.uuid}")
-                for char in service.characteristics:
-                    logger.info(
-                        f"  Characteristic: {char.uuid} "
-                        f"- Properties: {char.properties}"
-                    )
-
-            # Validate and read the characteristic
-            if SFS_CHARACTERISTIC_UUID in [
-                char.uuid
-                for service in client.services
-                for char in service.characteristics
-            ]:
-                await self._poll_characteristic(
-                    client, SFS_CHARACTERISTIC_UUID
-                )
+        self.client = transport
+        self.connection_changed.emit(True)
+        try:
+            self.backend.reset()
+            # Prefer notifications to polling
+            if transport.supports_notify:
+                await self._listen_for_notifications(transport)
             else:
-                logger.error(
-                    f"Characteristic {SFS_CHARACTERISTIC_UUID} "
-                    f"not found on the device."
-                )
-                self.running = False
+                await self._poll_characteristic(transport)
+            self._log_latency_report()
+            return True
+        finally:
+            self.client = None
+            self.connection_changed.emit(False)
+            await bounded(
+                transport.disconnect(),
+                transport.description,
+                DISCONNECT_TIMEOUT,
+            )
 
-        self.client = None
+    async def _listen_for_notifications(self, transport):
+        """Subscribe to the transport and wait while connected."""
+        self.update_mode = "notify"
+        self.latency.clear()
+        try:
+            await transport.start_notify(self._on_notification)
+        except Exception as notify_err:
+            logger.warning(
+                f"Could not subscribe to {transport.description} "
+                f"({notify_err}), falling back to polling."
+            )
+            await self._poll_characteristic(transport)
+            return
+
+        logger.info(f"Subscribed to notifications on {transport.description}")
+        try:
+            while self.running and transport.is_connected:
+                await asyncio.sleep(NOTIFY_CHECK_INTERVAL)
+        finally:
+            await bounded(
+                transport.stop_notify(),
+                transport.description,
+                DISCONNECT_TIMEOUT,
+            )
 
-    async def _find_target_device(self):
-        devices = await BleakScanner.discover(timeout=5.0)
-        for d in devices:
-            logger.info(f"Found device: {d.name} - {d.address}")
-            if d.name == SFS_DEVICE_NAME or d.address == SFS_ADDRESS:
-                return d
-        return None
-
-    async def _poll_characteristic(self, client, uuid):
-        """Poll the specified characteristic value in a loop."""
-        while self.running and client.is_connected:
+    def _on_notification(self, sender, data: bytearray):
+        self._latency_origin = time.perf_counter()
+        self._notification_handler(sender, data)
+
+    async def _poll_characteristic(self, transport):
+        """
+        Poll the characteristic value in a loop, backing off while the
+        value is unchanged.
+        """
+        self.update_mode = "poll"
+        self.latency.clear()
+        interval = POLL_INTERVAL_MIN
+        previous_read = time.perf_counter()
+        while self.running and transport.is_connected:
+            read_started = time.perf_counter()
             try:
-                value = await client.read_gatt_char(uuid)
-                self._notification_handler(0, value)
+                with tracer.span("scoreboard read"):
+                    value = await transport.read()
             except Exception as read_err:
                 logger.error(
-                    f"Error reading characteristic {uuid}: {read_err}",
+                    f"Error reading {transport.description}: {read_err}",
                     exc_info=True,
                 )
                 break
-            await asyncio.sleep(0.01)
 
-    def _notification_handler(self, sender: int, data: bytearray):
+            self._latency_origin = previous_read
+            if self._notification_handler(0, value):
+                interval = POLL_INTERVAL_MIN
+            else:
+                interval = min(interval * POLL_BACKOFF, POLL_INTERVAL_MAX)
+            previous_read = read_started
+            await asyncio.sleep(interval)
+
+    @property
+    def connected(self) -> bool:
+        """Whether a scoreboard session is up."""
+        return self.client is not None
+
+    def latency_report(self) -> dict:
+        """Return the average and p99 update latency of the current mode."""
+        return {
+            "mode": self.update_mode,
+            "samples": len(self.latency.samples),
+            "avg_ms": self.latency.mean() * 1000,
+            "p99_ms": self.latency.p99() * 1000,
+        }
+
+    def _log_latency_report(self):
+        report = self.latency_report()
+        logger.info(
+            f"Scoreboard update latency ({report['mode']}): "
+            f"avg {report['avg_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms "
+            f"over {report['samples']} updates"
+        )
+
+    def update_rate(self) -> float:
+        """Updates per second over the last RATE_WINDOW seconds."""
+        now = time.monotonic()
+        recent = [t for t in self._emit_times if now - t <= RATE_WINDOW]
+        return len(recent) / RATE_WINDOW
+
+    def update_counters(self) -> dict:
+        """Return how many frames were received, dropped and emitted."""
+        backend = self.backend
+        return {
+            "received": backend.frames_received,
+            "dropped_duplicate": backend.duplicates_dropped,
+            "resyncs": backend.resyncs,
+            "checksum_errors": backend.checksum_errors,
+            "emitted": self.emitted_count,
+        }
+
+    def _notification_handler(self, sender: int, data: bytearray) -> bool:
         """
-        Handle notifications from the BLE device.
-        The data is a 14-char string of hex from the SFS-Link.
-        e.g. b'06125602140A38' => decode to "06 12 56 02 14 0A 38"
+        Handle data from the transport. For the SFS-Link it is a 14-char
+        string of hex, e.g. b'06125602140A38' => "06 12 56 02 14 0A 38".
+        The backend drops frames identical to the previous one before
+        decoding them. Returns True if a new state was published.
         """
-        raw_str = data.decode("ascii", errors="ignore").strip()
-        logger.info(f"Raw characteristic value: {raw_str}")
-        if len(raw_str) != 14:
-            logger.warning(
-                f"Unexpected scoreboard data len={len(raw_str)}: {raw_str}"
+        log_data = data_logger.isEnabledFor(logging.DEBUG)
+        if log_data:
+            data_logger.debug(f"Raw characteristic value: {bytes(data)}")
+        received_at = self.last_received_at = time.monotonic()
+        with tracer.span("scoreboard parse"):
+            states = self.backend.feed(
+                data, received_at, self.transport.message_framed
             )
-            return
-
-        if raw_str == "00000000000000":
-            self.scoreboard_updated.emit({})
-            return
-
-        parsed_data = self._parse_sfs_link_hex(raw_str)
-        if parsed_data:
-            logger.info(f"Parsed data: {parsed_data}")
-            with self.data_lock:
-                self.current_data = parsed_data
-            self.scoreboard_updated.emit(parsed_data)
+        for state in states:
+            if log_data:
+                data_logger.debug(f"Parsed data: {state}")
+            self._publish(state)
+        return bool(states)
+
+    def _publish(self, state):
+        self.current_state = state
+        self.emitted_count += 1
+        self._emit_times.append(time.monotonic())
+        self.state_updated.emit(state)
+        if state is not None:
+            self._emit_deltas(self._last_state, state)
+            self._last_state = state
+        if self.receivers(self.scoreboard_updated):
+            self.scoreboard_updated.emit(state.to_dict() if state else {})
+        if self._latency_origin is not None:
+            self.latency.add(time.perf_counter() - self._latency_origin)
+
+    def _emit_deltas(self, previous, state):
+        """Emit a targeted signal for each part of the state that changed."""
+        if previous is None or previous[0:2] != state[0:2]:
+            self.score_changed.emit(state.left_score, state.right_score)
+        if previous is None or previous[2:4] != state[2:4]:
+            self.clock_changed.emit(state.minutes, state.seconds)
+        if previous is None or previous.lamps != state.lamps:
+            self.lamps_changed.emit(state.lamps)
+        if previous is None or previous.penalty != state.penalty:
+            self.cards_changed.emit(state.penalty)
+        if previous is None or previous.match != state.match:
+            self.priority_changed.emit(state.match)
 
     def _parse_sfs_link_hex(self, hex_str: str) -> dict:
-        # fmt: off
-        hex_pairs = [hex_str[i:i+2] for i in range(0, 14, 2)]
-        # fmt: on
-        if len(hex_pairs) != 7:
-            return {}
-
-        try:
-            b2 = int(hex_pairs[0], 16)  # Right score (BCD)
-            b3 = int(hex_pairs[1], 16)  # Left score (BCD)
-            b4 = int(hex_pairs[2], 16)  # Seconds (BCD)
-            b5 = int(hex_pairs[3], 16)  # Minutes (BCD)
-            b6 = int(hex_pairs[4], 16)  # Lamp bits
-            b7 = int(hex_pairs[5], 16)  # Match bits
-            b9 = int(hex_pairs[6], 16)  # Penalty bits
-        except ValueError as e:
-            logger.error(f"Invalid hex in scoreboard data: {hex_str}=> {e}")
+        """Decode a hex string into the legacy dict layout."""
+        state = decode_sfs_link_payload(hex_str.encode("ascii", "ignore"))
+        if state is None:
+            logger.error(f"Invalid hex in scoreboard data: {hex_str}")
             return {}
-
-        # Decode the BCD fields
-        right_score = decode_bcd(b2)
-        left_score = decode_bcd(b3)
-        seconds = decode_bcd(b4)
-        minutes = decode_bcd(b5)
-        lamp_bits = parse_lamp_bits(b6)
-        match_bits = parse_matches_and_priorities(b7)
-        penalty = parse_penalty_bits(b9)
-
-        formatted_seconds = f"{seconds:02}"
-        formatted_minutes = f"{minutes:02}"
-
-        parsed_data = {
-            "right_score": right_score,
-            "left_score": left_score,
-            "seconds": formatted_seconds,
-            "minutes": formatted_minutes,
-            "lamp_bits": lamp_bits,
-            "match_bits": match_bits,
-            "penalty": penalty,
-        }
-        return parsed_data
-        # print(parsed_data) #TEST PRINT GO BRR
-
-
-# Helper functions for parsing the SFS-Link data
-def decode_bcd(bcd: int) -> int:
-    """Decode a Binary-Coded Decimal (BCD) value."""
-    return (bcd >> 4) * 10 + (bcd & 0x0F)
+        return state.to_dict()
 
 
-def parse_lamp_bits(b6: int) -> dict:
+def load_piste_config(path: str) -> list:
     """
-    Parse 6th byte (b6) for lamp states.
-    Returns dictionary indicating which lamps are ON (True) or OFF (False).
+    Load the SFS-Link devices of a multi-piste station, a JSON list like
+    [{"piste": "1", "name": "SFS-Link [047]", "address": "54:32:..."}].
     """
-    return {
-        "left_white": bool(b6 & 0x01),  # D0
-        "right_white": bool(b6 & 0x02),  # D1
-        "left_red": bool(b6 & 0x04),  # D2
-        "right_green": bool(b6 & 0x08),  # D3
-        "right_yellow": bool(b6 & 0x10),  # D4
-        "left_yellow": bool(b6 & 0x20),  # D5
-        # D6 and D7 are not used
-    }
-
-
-def parse_matches_and_priorities(b7: int) -> dict:
-    """
-    Parse7th byte (b7) for num of matches and priority lamps.
+    with open(path, "r") as file:
+        return json.load(file)
 
-    b7 bits:
-      D0..D1 => number of matches (0..3)
-      D2 => right priority (1=ON)
-      D3 => left priority (1=ON)
-      D4..D7 => unused
-    """
-    # TODO: Possible duplicates, comment one and check
-    # bits D0..D1 (mask 0b0011)
-    num_matches = b7 & 0x03
-    num_matches = b7 & 0x03
-    # bit D2 (0b0100)
-    right_priority = bool(b7 & 0x04)
-    right_priority = bool(b7 & 0x04)
-    # bit D3 (0b1000)
-    left_priority = bool(b7 & 0x08)
-    left_priority = bool(b7 & 0x08)
-
-    return {
-        "num_matches": num_matches,
-        "right_priority": right_priority,
-        "left_priority": left_priority,
-    }
-
-
-def parse_penalty_bits(b9: int) -> dict:
+
+class MultiScoreboardManager(QObject):
     """
-    Parse 9th byte for red/yellow penalty card lights.
-
-    Bits D0..D3 are:
-      D0 => Right Red
-      D1 => Left Red
-      D2 => Right Yellow
-      D3 => Left Yellow
-    Bits D4..D7 are ignored/unused as per doc.
+    Serves several SFS-Link devices, one per piste, from a single
+    background thread and asyncio event loop. Each piste has its own
+    ScoreboardManager (see manager()) whose signals carry that piste's
+    state, but none of them starts a thread of its own.
     """
-    return {
-        "penalty_right_red": bool(b9 & 0x01),  # D0
-        "penalty_left_red": bool(b9 & 0x02),  # D1
-        "penalty_right_yellow": bool(b9 & 0x04),  # D2
-        "penalty_left_yellow": bool(b9 & 0x08),  # D3
-    }
+
+    def __init__(self, devices: list, parent=None):
+        super().__init__(parent)
+        self.loop = None
+        self.thread = None
+        self._task = None
+        self.running = False
+        self.managers = {}
+        for device in devices:
+            piste = str(device["piste"])
+            self.managers[piste] = ScoreboardManager(
+                self,
+                device_name=device.get("name", SFS_DEVICE_NAME),
+                address=device.get("address", SFS_ADDRESS),
+                cache_file=os.path.join(
+                    os.path.dirname(DEVICE_CACHE_FILE),
+                    f"sfs_link_cache_{piste}.json",
+                ),
+                piste=piste,
+            )
+
+    def manager(self, piste) -> ScoreboardManager:
+        """Return the manager whose signals carry this piste's state."""
+        return self.managers[str(piste)]
+
+    def start(self):
+        """Launch one asyncio event loop serving every piste."""
+        if self.thread and self.thread.is_alive():
+            logger.warning("MultiScoreboardManager is already running.")
+            return
+
+        self.running = True
+        for manager in self.managers.values():
+            manager.running = True
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> bool:
+        """Cancel every piste's session, see ScoreboardManager.stop()."""
+        self.running = False
+        for manager in self.managers.values():
+            manager.running = False
+        cancel_task(self.loop, self._task)
+        return join_thread(self.thread, timeout, "MultiScoreboardManager")
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._task = self.loop.create_task(self._main_task())
+        try:
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(
+                f"Exception in multi-piste scoreboard loop: {e}",
+                exc_info=True,
+            )
+        finally:
+            self.loop.close()
+
+    async def _main_task(self):
+        scan_lock = asyncio.Lock()
+        for manager in self.managers.values():
+            manager.loop = self.loop
+            manager.transport.scan_lock = scan_lock
+        await asyncio.gather(
+            *(manager._main_task() for manager in self.managers.values()),
+            return_exceptions=True,
+        )
+
+    def stats(self) -> dict:
+        """Per-piste update rate (Hz) and latency (ms)."""
+        stats = {}
+        for piste, manager in self.managers.items():
+            report = manager.latency_report()
+            report["rate_hz"] = manager.update_rate()
+            report["connected"] = manager.connected
+            stats[piste] = report
+        return stats
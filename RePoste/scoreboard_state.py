@@ -0,0 +1,180 @@
+from typing import NamedTuple, Optional
+
+# SFS-Link payload layout (bytes b2..b9 of the scoring machine frame,
+# b8 is not sent):
+#   b2 right score (BCD)   b3 left score (BCD)
+#   b4 seconds (BCD)       b5 minutes (BCD)
+#   b6 lamp bits           b7 matches and priority bits
+#   b9 penalty card bits
+SFS_PAYLOAD_BYTES = 7
+
+
+class LampState(NamedTuple):
+    left_white: bool
+    right_white: bool
+    left_red: bool
+    right_green: bool
+    right_yellow: bool
+    left_yellow: bool
+
+
+class MatchState(NamedTuple):
+    num_matches: int
+    right_priority: bool
+    left_priority: bool
+
+
+class PenaltyState(NamedTuple):
+    penalty_right_red: bool
+    penalty_left_red: bool
+    penalty_right_yellow: bool
+    penalty_left_yellow: bool
+
+
+class ScoreboardState(NamedTuple):
+    """
+    Immutable snapshot of the scoreboard.
+
+    Equality and hashing ignore the receive timestamp, so two states
+    compare equal when the scoreboard shows the same thing.
+    """
+
+    right_score: int
+    left_score: int
+    minutes: int
+    seconds: int
+    lamps: LampState
+    match: MatchState
+    penalty: PenaltyState
+    timestamp: float = 0.0
+
+    def __eq__(self, other):
+        if isinstance(other, ScoreboardState):
+            return self[:7] == other[:7]
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, ScoreboardState):
+            return self[:7] != other[:7]
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self[:7])
+
+    def to_dict(self) -> dict:
+        """Return the state in the dict layout of the original parser."""
+        return {
+            "right_score": self.right_score,
+            "left_score": self.left_score,
+            "seconds": f"{self.seconds:02}",
+            "minutes": f"{self.minutes:02}",
+            "lamp_bits": self.lamps._asdict(),
+            "match_bits": self.match._asdict(),
+            "penalty": self.penalty._asdict(),
+        }
+
+
+# Helper functions for parsing the SFS-Link data
+def decode_bcd(bcd: int) -> int:
+    """Decode a Binary-Coded Decimal (BCD) value."""
+    return (bcd >> 4) * 10 + (bcd & 0x0F)
+
+
+def encode_bcd(value: int) -> int:
+    """Encode 0-99 as Binary-Coded Decimal, the inverse of decode_bcd."""
+    return (value // 10) << 4 | value % 10
+
+
+def parse_lamp_bits(b6: int) -> dict:
+    """
+    Parse 6th byte (b6) for lamp states.
+    Returns dictionary indicating which lamps are ON (True) or OFF (False).
+    """
+    return {
+        "left_white": bool(b6 & 0x01),  # D0
+        "right_white": bool(b6 & 0x02),  # D1
+        "left_red": bool(b6 & 0x04),  # D2
+        "right_green": bool(b6 & 0x08),  # D3
+        "right_yellow": bool(b6 & 0x10),  # D4
+        "left_yellow": bool(b6 & 0x20),  # D5
+        # D6 and D7 are not used
+    }
+
+
+def parse_matches_and_priorities(b7: int) -> dict:
+    """
+    Parse 7th byte (b7) for num of matches and priority lamps.
+
+    b7 bits:
+      D0..D1 => number of matches (0..3)
+      D2 => right priority (1=ON)
+      D3 => left priority (1=ON)
+      D4..D7 => unused
+    """
+    return {
+        "num_matches": b7 & 0x03,  # D0..D1
+        "right_priority": bool(b7 & 0x04),  # D2
+        "left_priority": bool(b7 & 0x08),  # D3
+    }
+
+
+def parse_penalty_bits(b9: int) -> dict:
+    """
+    Parse 9th byte for red/yellow penalty card lights.
+
+    Bits D0..D3 are:
+      D0 => Right Red
+      D1 => Left Red
+      D2 => Right Yellow
+      D3 => Left Yellow
+    Bits D4..D7 are ignored/unused as per doc.
+    """
+    return {
+        "penalty_right_red": bool(b9 & 0x01),  # D0
+        "penalty_left_red": bool(b9 & 0x02),  # D1
+        "penalty_right_yellow": bool(b9 & 0x04),  # D2
+        "penalty_left_yellow": bool(b9 & 0x08),  # D3
+    }
+
+
+# Every possible byte value decoded once at import. The lamp, match and
+# penalty entries are shared instances, so equal bytes give identical
+# objects and comparing two states is a handful of identity checks.
+BCD_TABLE = tuple(decode_bcd(b) for b in range(256))
+LAMP_TABLE = tuple(LampState(**parse_lamp_bits(b)) for b in range(256))
+MATCH_TABLE = tuple(
+    MatchState(**parse_matches_and_priorities(b)) for b in range(256)
+)
+PENALTY_TABLE = tuple(
+    PenaltyState(**parse_penalty_bits(b)) for b in range(256)
+)
+
+
+def decode_sfs_link_bytes(raw, timestamp: float = 0.0) -> ScoreboardState:
+    """Decode the 7 raw SFS-Link bytes (any bytes-like object)."""
+    return ScoreboardState(
+        BCD_TABLE[raw[0]],
+        BCD_TABLE[raw[1]],
+        BCD_TABLE[raw[3]],
+        BCD_TABLE[raw[2]],
+        LAMP_TABLE[raw[4]],
+        MATCH_TABLE[raw[5]],
+        PENALTY_TABLE[raw[6]],
+        timestamp,
+    )
+
+
+def decode_sfs_link_payload(
+    payload: bytes, timestamp: float = 0.0
+) -> Optional[ScoreboardState]:
+    """
+    Decode a 14-character ASCII hex SFS-Link payload.
+    Returns None if the payload is malformed.
+    """
+    try:
+        raw = bytes.fromhex(payload.decode("ascii"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if len(raw) != SFS_PAYLOAD_BYTES:
+        return None
+    return decode_sfs_link_bytes(raw, timestamp)
@@ -0,0 +1,673 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from typing import Callable, Iterable, List, Optional, Tuple
+from scoreboard_state import encode_bcd
+from scoring_backends import FAVERO_BAUDRATE
+
+try:
+    import termios
+    import tty
+except ImportError:  # Windows, serial ports need pyserial there
+    termios = tty = None
+try:
+    import serial
+except ImportError:
+    serial = None
+
+logger = logging.getLogger("reposte.scoreboard.transport")
+
+# bleak is imported on the first connect, on the scoreboard thread, so it
+# does not hold up the start of the app
+BleakClient = BleakScanner = None
+
+
+def _import_bleak():
+    global BleakClient, BleakScanner
+    if BleakClient is None or BleakScanner is None:
+        import bleak
+
+        BleakClient = BleakClient or bleak.BleakClient
+        BleakScanner = BleakScanner or bleak.BleakScanner
+
+
+# Official from SFS-Link Manual v1.2
+# SFS_Link[S/N]
+SFS_DEVICE_NAME = "SFS-Link [047]"
+SFS_ADDRESS = "54:32:04:78:64:4A"
+# SFS_UUID = "6f000009-b5a3-f393-e0a9-e50e24dcca9e"
+SFS_CHARACTERISTIC_UUID = "6f000009-b5a3-f393-e0a9-e50e24dcca9e"
+
+# Last good device address and characteristic handle, so a restart can
+# connect directly instead of scanning
+DEVICE_CACHE_FILE = os.path.join(
+    os.path.dirname(__file__), "config", "sfs_link_cache.json"
+)
+SCAN_TIMEOUT = 5.0
+DIRECT_CONNECT_TIMEOUT = 2.0
+# Serial speeds a SerialTransport accepts, the standard ones up to the
+# fastest scoring machines
+SERIAL_BAUDRATES = (1200, 2400, 4800, 9600, 19200, 38400, 57600, 115200)
+
+# A trace is a list of (seconds since start, 14-character payload)
+Trace = List[Tuple[float, bytes]]
+
+
+class TransportError(Exception):
+    """The transport reached the device but cannot serve scoreboard data."""
+
+
+def load_device_cache(path: str) -> dict:
+    """Load the cached device details, or an empty dict."""
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_device_cache(path: str, cache: dict):
+    """Write the device details if they changed."""
+    if load_device_cache(path) == cache:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(cache, file, indent=4)
+    except OSError as e:
+        logger.warning(f"Could not cache SFS-Link device details: {e}")
+
+
+class ScoreboardTransport(ABC):
+    """
+    Source of raw scoring machine data for ScoreboardManager.
+
+    A transport either pushes data to a callback (supports_notify) or is
+    polled with read(). The callback takes (sender, data) like a bleak
+    notification callback. message_framed is True when every chunk is one
+    whole message (a BLE notification) rather than part of a byte stream.
+    """
+
+    description = "scoreboard"
+    supports_notify = False
+    message_framed = True
+
+    @property
+    @abstractmethod
+    def is_connected(self) -> bool:
+        """Whether the link to the device is up."""
+
+    @abstractmethod
+    async def connect(self) -> bool:
+        """Connect to the device, returns False if it is unavailable."""
+
+    @abstractmethod
+    async def disconnect(self):
+        """Close the link, also after a failed or dropped connection."""
+
+    @abstractmethod
+    async def read(self) -> bytes:
+        """Read the current value (or the bytes that arrived)."""
+
+    async def start_notify(self, callback: Callable):
+        """
+        Push data to callback as it arrives. Transports that can only be
+        polled refuse, and the manager falls back to read().
+        """
+        raise TransportError(f"{self.description} cannot push data")
+
+    async def stop_notify(self):
+        pass
+
+
+class BleTransport(ScoreboardTransport):
+    """An SFS-Link reached over Bluetooth LE with bleak."""
+
+    def __init__(
+        self,
+        device_name: str = SFS_DEVICE_NAME,
+        address: str = SFS_ADDRESS,
+        cache_file: Optional[str] = None,
+    ):
+        self.device_name = device_name
+        self.address = address
+        self.cache_file = cache_file or DEVICE_CACHE_FILE
+        # Shared by the transports of a MultiScoreboardManager so that
+        # only one of them scans at a time
+        self.scan_lock = None
+        self.client = None
+        self.char = None
+        self.description = device_name
+
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None and self.client.is_connected
+
+    @property
+    def supports_notify(self) -> bool:
+        return self.char is not None and bool(
+            {"notify", "indicate"} & set(self.char.properties)
+        )
+
+    async def connect(self) -> bool:
+        _import_bleak()
+        cache = load_device_cache(self.cache_file)
+        client = await self._connect(cache.get("address"))
+        if client is None:
+            return False
+
+        logger.info(f"Successfull connect to {client.address}")
+        # List available services and characteristics
+        logger.debug("Listing available services and characteristics:")
+        for service in client.services:
+            logger.debug(f"Service: {service.uuid}")
+            for char in service.characteristics:
+                logger.debug(
+                    f"  Characteristic: {char.uuid} "
+                    f"- Properties: {char.properties}"
+                )
+
+        char = self._find_characteristic(client, cache)
+        if char is None:
+            with suppress(Exception):
+                await client.disconnect()
+            raise TransportError(
+                f"Characteristic {SFS_CHARACTERISTIC_UUID} "
+                f"not found on the device."
+            )
+
+        self.client = client
+        self.char = char
+        self.description = f"{char.uuid} on {client.address}"
+        save_device_cache(
+            self.cache_file,
+            {"address": client.address, "char_handle": char.handle},
+        )
+        return True
+
+    async def disconnect(self):
+        client, self.client = self.client, None
+        if client is not None and client.is_connected:
+            with suppress(Exception):
+                await client.disconnect()
+
+    async def start_notify(self, callback: Callable):
+        await self.client.start_notify(self.char, callback)
+
+    async def stop_notify(self):
+        if self.is_connected:
+            with suppress(Exception):
+                await self.client.stop_notify(self.char)
+
+    async def read(self) -> bytes:
+        return await self.client.read_gatt_char(self.char)
+
+    async def _connect(self, cached_address):
+        """
+        Connect straight to the cached address if there is one, otherwise
+        (or if that fails) scan for the device first.
+        """
+        if cached_address:
+            logger.info(f"Connecting to cached device at {cached_address}")
+            client = BleakClient(
+                cached_address, timeout=DIRECT_CONNECT_TIMEOUT
+            )
+            try:
+                await client.connect()
+                return client
+            except Exception as connect_err:
+                logger.info(
+                    f"Cached device unavailable ({connect_err}), scanning."
+                )
+
+        logger.info("Scanning for BLE devices...")
+        if self.scan_lock is not None:
+            async with self.scan_lock:
+                target_device = await self._find_target_device()
+        else:
+            target_device = await self._find_target_device()
+        if not target_device:
+            logger.error(
+                f"Device with name {self.device_name} "
+                f"or address {self.address} not found."
+            )
+            return None
+
+        logger.info(
+            f"Connecting to device {target_device.name} "
+            f"at {target_device.address}"
+        )
+        client = BleakClient(target_device)
+        try:
+            await client.connect()
+        except Exception as connect_err:
+            logger.error(f"Failed to connect to the device: {connect_err}")
+            return None
+        return client
+
+    @staticmethod
+    def _find_characteristic(client, cache):
+        """Look the characteristic up by cached handle, then by UUID."""
+        handle = cache.get("char_handle")
+        if handle is not None and cache.get("address") == client.address:
+            char = client.services.get_characteristic(handle)
+            if char is not None and char.uuid == SFS_CHARACTERISTIC_UUID:
+                return char
+        return client.services.get_characteristic(SFS_CHARACTERISTIC_UUID)
+
+    async def _find_target_device(self):
+        """Scan until the first advertisement from the SFS-Link."""
+
+        def is_sfs_link(device, advertisement_data):
+            return (
+                device.name == self.device_name
+                or device.address == self.address
+            )
+
+        device = await BleakScanner.find_device_by_filter(
+            is_sfs_link, timeout=SCAN_TIMEOUT
+        )
+        if device:
+            logger.info(f"Found device: {device.name} - {device.address}")
+        return device
+
+
+class SimulatedTransport(ScoreboardTransport):
+    """
+    Replays a payload trace as if it came from an SFS-Link.
+
+    Payloads are pushed with their original timing divided by speed, or as
+    fast as the event loop allows when speed is None. The transport reports
+    itself disconnected once the trace is exhausted (or loops forever with
+    loop=True). With supports_notify=False it is polled with read(), which
+    returns the payload that is current at the time of the call; the last
+    payload stays readable for hold seconds so a backed-off poll sees it.
+    """
+
+    def __init__(
+        self,
+        trace: Trace,
+        speed: Optional[float] = 1.0,
+        loop: bool = False,
+        supports_notify: bool = True,
+        hold: float = 0.25,
+    ):
+        self.trace = trace
+        self.speed = speed
+        self.loop = loop
+        self.supports_notify = supports_notify
+        self.hold = hold
+        self.description = f"simulated trace ({len(trace)} payloads)"
+        self.sent_count = 0
+        self._connected = False
+        self._started = None
+        self._task = None
+
+    @property
+    def is_connected(self) -> bool:
+        if self._connected and not self.supports_notify and not self.loop:
+            # A polled replay ends once the trace has played out
+            return self._elapsed() <= self._length() + self.hold
+        return self._connected
+
+    async def connect(self) -> bool:
+        self._connected = bool(self.trace)
+        self._started = time.perf_counter()
+        return self._connected
+
+    async def disconnect(self):
+        await self.stop_notify()
+        self._connected = False
+
+    async def start_notify(self, callback: Callable):
+        self._started = time.perf_counter()
+        self._task = asyncio.ensure_future(self._replay(callback))
+
+    async def stop_notify(self):
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def read(self) -> bytes:
+        elapsed = self._elapsed()
+        if self.loop:
+            elapsed %= self._length() or 1.0
+        current = self.trace[0][1]
+        for offset, payload in self.trace:
+            if offset > elapsed:
+                break
+            current = payload
+        self.sent_count += 1
+        return bytearray(current)
+
+    def _elapsed(self) -> float:
+        elapsed = time.perf_counter() - self._started
+        return elapsed * self.speed if self.speed else float("inf")
+
+    def _length(self) -> float:
+        return self.trace[-1][0]
+
+    async def _replay(self, callback: Callable):
+        while True:
+            start = time.perf_counter()
+            for offset, payload in self.trace:
+                if self.speed:
+                    delay = start + offset / self.speed - time.perf_counter()
+                    await asyncio.sleep(max(0.0, delay))
+                else:
+                    await asyncio.sleep(0)
+                self.sent_count += 1
+                callback(None, bytearray(payload))
+            if not self.loop:
+                break
+        self._connected = False
+
+
+class SerialTransport(ScoreboardTransport):
+    """
+    A scoring machine on a serial port (or a pty standing in for one).
+
+    On POSIX the port is read from the event loop without a thread. On
+    Windows pyserial is required and reads run in the default executor.
+    """
+
+    supports_notify = True
+    message_framed = False
+
+    def __init__(self, path: str, baudrate: int = FAVERO_BAUDRATE):
+        if baudrate not in SERIAL_BAUDRATES:
+            raise ValueError(
+                f"Unsupported baud rate {baudrate!r}, expected one of "
+                f"{', '.join(map(str, SERIAL_BAUDRATES))}"
+            )
+        self.path = path
+        self.baudrate = baudrate
+        self.description = f"serial port {path}"
+        self._fd = None
+        self._port = None
+        self._task = None
+        self._connected = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def connect(self) -> bool:
+        try:
+            if termios is not None:
+                self._fd = os.open(
+                    self.path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK
+                )
+                self._configure(self._fd)
+            elif serial is not None:
+                self._port = serial.Serial(
+                    self.path, self.baudrate, timeout=0.1
+                )
+            else:
+                raise TransportError(
+                    "pyserial is required for serial scoring machines"
+                )
+        except OSError as e:
+            logger.error(f"Could not open {self.path}: {e}")
+            self._close()
+            return False
+        self._connected = True
+        return True
+
+    async def disconnect(self):
+        await self.stop_notify()
+        self._close()
+
+    async def start_notify(self, callback: Callable):
+        loop = asyncio.get_running_loop()
+        if self._fd is not None:
+            loop.add_reader(self._fd, self._on_readable, callback)
+        else:
+            self._task = asyncio.ensure_future(self._read_port(callback))
+
+    async def stop_notify(self):
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def read(self) -> bytes:
+        if self._fd is not None:
+            with suppress(BlockingIOError):
+                return os.read(self._fd, 4096)
+            return b""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._port.read, 4096)
+
+    def _configure(self, fd):
+        """Raw 8N1 at the configured baud rate."""
+        speed = getattr(termios, f"B{self.baudrate}", None)
+        if speed is None:
+            # connect() reports it like any other failure to open the port
+            raise OSError(f"baud rate {self.baudrate} is not supported here")
+        tty.setraw(fd)
+        attrs = termios.tcgetattr(fd)
+        attrs[4] = attrs[5] = speed
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+
+    def _on_readable(self, callback):
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            # The device went away (EIO on a pty whose master closed)
+            asyncio.get_running_loop().remove_reader(self._fd)
+            self._connected = False
+            return
+        callback(None, data)
+
+    async def _read_port(self, callback):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._connected:
+                data = await loop.run_in_executor(None, self._port.read, 4096)
+                if data:
+                    callback(None, data)
+        except serial.SerialException as e:
+            logger.error(f"Error reading {self.path}: {e}")
+            self._connected = False
+
+    def _close(self):
+        self._connected = False
+        if self._fd is not None:
+            with suppress(OSError):
+                os.close(self._fd)
+            self._fd = None
+        if self._port is not None:
+            self._port.close()
+            self._port = None
+
+
+class PtyScoringMachine:
+    """
+    A pseudo-terminal standing in for a scoring machine's serial port
+    (POSIX only). Open path with SerialTransport and write() frames.
+    """
+
+    def __init__(self):
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.path = os.ttyname(self._slave)
+
+    def write(self, data: bytes):
+        os.write(self._master, data)
+
+    def close(self):
+        for fd in (self._master, self._slave):
+            with suppress(OSError):
+                os.close(fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordingTransport(ScoreboardTransport):
+    """Wraps another transport and records every payload it delivers."""
+
+    def __init__(self, inner: ScoreboardTransport, path: str):
+        self.inner = inner
+        self.path = path
+        self.trace = []
+        self._started = None
+
+    @property
+    def description(self):
+        return f"{self.inner.description} (recording to {self.path})"
+
+    @property
+    def supports_notify(self):
+        return self.inner.supports_notify
+
+    @property
+    def message_framed(self):
+        return self.inner.message_framed
+
+    @property
+    def is_connected(self):
+        return self.inner.is_connected
+
+    async def connect(self) -> bool:
+        self._started = time.perf_counter()
+        return await self.inner.connect()
+
+    async def disconnect(self):
+        await self.inner.disconnect()
+        save_trace(self.path, self.trace)
+
+    async def start_notify(self, callback: Callable):
+        def record(sender, data):
+            self._record(data)
+            callback(sender, data)
+
+        await self.inner.start_notify(record)
+
+    async def stop_notify(self):
+        await self.inner.stop_notify()
+
+    async def read(self) -> bytes:
+        data = await self.inner.read()
+        self._record(data)
+        return data
+
+    def _record(self, data):
+        payload = bytes(data)
+        if not self.trace or self.trace[-1][1] != payload:
+            self.trace.append((time.perf_counter() - self._started, payload))
+
+
+def load_trace(path: str) -> Trace:
+    """
+    Load a trace file, one "<seconds> <payload>" pair per line.
+    Blank lines and lines starting with # are ignored.
+    """
+    trace = []
+    with open(path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            offset, payload = line.split()
+            trace.append((float(offset), payload.encode("ascii")))
+    return trace
+
+
+def save_trace(path: str, trace: Iterable[Tuple[float, bytes]]):
+    with open(path, "w") as file:
+        for offset, payload in trace:
+            file.write(f"{offset:.4f} {payload.decode('ascii')}\n")
+
+
+def encode_sfs_link_payload(
+    right_score: int = 0,
+    left_score: int = 0,
+    minutes: int = 3,
+    seconds: int = 0,
+    lamp_bits: int = 0,
+    match_bits: int = 1,
+    penalty_bits: int = 0,
+) -> bytes:
+    """Build a 14-character SFS-Link payload, the inverse of the decoder."""
+    raw = bytes(
+        (
+            encode_bcd(right_score),
+            encode_bcd(left_score),
+            encode_bcd(seconds),
+            encode_bcd(minutes),
+            lamp_bits,
+            match_bits,
+            penalty_bits,
+        )
+    )
+    return raw.hex().upper().encode("ascii")
+
+
+def synthetic_bout(
+    rate_hz: float = 100.0, duration: float = 180.0, seed: int = 0
+) -> Trace:
+    """
+    Generate a plausible bout sampled at rate_hz: the clock counts down,
+    and every few seconds a touch lights a lamp for a second and scores.
+    """
+    rng = random.Random(seed)
+    trace = []
+    left = right = 0
+    next_touch = rng.uniform(2.0, 6.0)
+    lamp_bits = 0
+    lamp_off_at = 0.0
+    for i in range(int(duration * rate_hz)):
+        t = i / rate_hz
+        if t >= next_touch:
+            if rng.random() < 0.5:
+                lamp_bits, left = 0x04, left + 1  # left red
+            else:
+                lamp_bits, right = 0x08, right + 1  # right green
+            lamp_off_at = t + 1.0
+            next_touch = t + rng.uniform(2.0, 6.0)
+        elif lamp_bits and t >= lamp_off_at:
+            lamp_bits = 0
+        remaining = max(0, int(duration - t))
+        payload = encode_sfs_link_payload(
+            right % 100,
+            left % 100,
+            min(remaining // 60, 9),
+            remaining % 60,
+            lamp_bits,
+        )
+        trace.append((t, payload))
+    return trace
+
+
+def stress_trace(count: int, rate_hz: float) -> Trace:
+    """A trace where every payload differs, for maximum-rate testing."""
+    return [
+        (
+            i / rate_hz,
+            encode_sfs_link_payload(
+                right_score=i % 100,
+                seconds=(i // 100) % 60,
+                lamp_bits=0x04 if i % 2 else 0x08,
+            ),
+        )
+        for i in range(count)
+    ]
@@ -0,0 +1,216 @@
+import logging
+import re
+from typing import List, Optional
+
+from scoreboard_state import (
+    BCD_TABLE,
+    LAMP_TABLE,
+    MATCH_TABLE,
+    PENALTY_TABLE,
+    ScoreboardState,
+    decode_sfs_link_payload,
+    encode_bcd,
+)
+
+logger = logging.getLogger("reposte.scoreboard.backend")
+
+SFS_PAYLOAD_CHARS = 14
+SFS_BLANK_PAYLOAD = b"0" * SFS_PAYLOAD_CHARS
+NON_HEX = re.compile(rb"[^0-9A-Fa-f]+")
+
+# Favero FA-01 serial frame (2400 baud 8N1), 10 bytes:
+#   0xFF, right score, left score, seconds, minutes, lamps,
+#   matches/priority, reserved, penalty cards, checksum
+# The checksum is the sum of the first nine bytes, modulo 256. Bytes 1-8
+# carry the same fields the SFS-Link relays as hex (b2..b9).
+FAVERO_HEADER = 0xFF
+FAVERO_FRAME_BYTES = 10
+FAVERO_BAUDRATE = 2400
+
+
+class ScoringBackend:
+    """
+    Incremental parser for the data stream of one kind of scoring machine.
+
+    feed() accepts chunks of any size, split anywhere, and returns the
+    states of the complete frames they finished. A frame identical to the
+    previous one is dropped before it is decoded, and a blank scoreboard is
+    returned as None. Transports that deliver whole messages (a BLE
+    notification) pass complete=True so a short message is not carried
+    over into the next one.
+    """
+
+    name = "backend"
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._last_frame = None
+        self.frames_received = 0
+        self.duplicates_dropped = 0
+        self.resyncs = 0
+        self.checksum_errors = 0
+
+    def reset(self):
+        """Forget partial data and the previous frame (e.g. on reconnect)."""
+        self._buffer.clear()
+        self._last_frame = None
+
+    def feed(
+        self, data, timestamp: float = 0.0, complete: bool = False
+    ) -> List[Optional[ScoreboardState]]:
+        raise NotImplementedError
+
+    def _is_duplicate(self, frame) -> bool:
+        """Compare a frame (bytes or memoryview slice) with the last one."""
+        self.frames_received += 1
+        if self._last_frame is not None and frame == self._last_frame:
+            self.duplicates_dropped += 1
+            return True
+        self._last_frame = bytes(frame)
+        return False
+
+
+class SfsLinkBackend(ScoringBackend):
+    """
+    SFS-Link payloads: 14 ASCII hex characters per frame. On a stream the
+    frames are separated by any non-hex byte (usually CR/LF).
+    """
+
+    name = "sfs-link"
+
+    def feed(self, data, timestamp=0.0, complete=False):
+        # Fast path, one whole BLE notification
+        if complete and not self._buffer:
+            return self._decode(bytes(data).strip(), timestamp)
+
+        self._buffer += data
+        states = []
+        start = 0
+        buffer = self._buffer
+        with memoryview(buffer) as view:
+            for delimiter in NON_HEX.finditer(buffer):
+                stop = delimiter.start()
+                self._take(view[start:stop], timestamp, states)
+                start = delimiter.end()
+            if complete:
+                self._take(view[start:], timestamp, states)
+                start = len(buffer)
+        del buffer[:start]
+        if len(buffer) > SFS_PAYLOAD_CHARS:
+            # Hex with no delimiter in sight, keep only the newest frame
+            self.resyncs += 1
+            del buffer[:-SFS_PAYLOAD_CHARS]
+        return states
+
+    def _take(self, frame, timestamp, states):
+        if len(frame):
+            states.extend(self._decode(frame, timestamp))
+
+    def _decode(self, frame, timestamp):
+        if self._is_duplicate(frame):
+            return []
+        if len(frame) != SFS_PAYLOAD_CHARS:
+            self.resyncs += 1
+            logger.warning(
+                f"Unexpected scoreboard data len={len(frame)}: "
+                f"{bytes(frame)}"
+            )
+            return []
+        if frame == SFS_BLANK_PAYLOAD:
+            return [None]
+        state = decode_sfs_link_payload(bytes(frame), timestamp)
+        if state is None:
+            logger.error(f"Invalid hex in scoreboard data: {bytes(frame)}")
+            return []
+        return [state]
+
+
+class FaveroBackend(ScoringBackend):
+    """Favero FA-01 binary frames, verified by their checksum."""
+
+    name = "favero"
+
+    def feed(self, data, timestamp=0.0, complete=False):
+        self._buffer += data
+        states = []
+        buffer = self._buffer
+        start = 0
+        end = len(buffer)
+        with memoryview(buffer) as view:
+            while True:
+                start = buffer.find(FAVERO_HEADER, start)
+                if start < 0:
+                    start = end
+                    break
+                if end - start < FAVERO_FRAME_BYTES:
+                    break
+                stop = start + FAVERO_FRAME_BYTES
+                with view[start:stop] as frame:
+                    if sum(frame[:9]) & 0xFF != frame[9]:
+                        # Not a real frame start, look for the next header
+                        self.checksum_errors += 1
+                        self.resyncs += 1
+                        start += 1
+                        continue
+                    start = stop
+                    if not self._is_duplicate(frame):
+                        states.append(decode_favero_frame(frame, timestamp))
+        del buffer[:start]
+        return states
+
+
+def decode_favero_frame(frame, timestamp: float = 0.0) -> ScoreboardState:
+    """Decode a checked 10-byte Favero frame (any bytes-like object)."""
+    return ScoreboardState(
+        BCD_TABLE[frame[1]],
+        BCD_TABLE[frame[2]],
+        BCD_TABLE[frame[4]],
+        BCD_TABLE[frame[3]],
+        LAMP_TABLE[frame[5]],
+        MATCH_TABLE[frame[6]],
+        PENALTY_TABLE[frame[8]],
+        timestamp,
+    )
+
+
+def encode_favero_frame(
+    right_score: int = 0,
+    left_score: int = 0,
+    minutes: int = 3,
+    seconds: int = 0,
+    lamp_bits: int = 0,
+    match_bits: int = 1,
+    penalty_bits: int = 0,
+) -> bytes:
+    """Build a Favero frame, for simulators and tests."""
+    body = bytes(
+        (
+            FAVERO_HEADER,
+            encode_bcd(right_score),
+            encode_bcd(left_score),
+            encode_bcd(seconds),
+            encode_bcd(minutes),
+            lamp_bits,
+            match_bits,
+            0,
+            penalty_bits,
+        )
+    )
+    return body + bytes((sum(body) & 0xFF,))
+
+
+BACKENDS = {
+    SfsLinkBackend.name: SfsLinkBackend,
+    FaveroBackend.name: FaveroBackend,
+}
+
+
+def create_backend(name: str) -> ScoringBackend:
+    """Create a backend by name ("sfs-link" or "favero")."""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown scoring backend {name!r}, "
+            f"expected one of {', '.join(BACKENDS)}"
+        ) from None
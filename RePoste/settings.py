@@ -6,9 +6,18 @@ from PyQt6.QtWidgets import (
     QLabel,
     QFormLayout,
     QDialogButtonBox,
+    QHBoxLayout,
+    QPushButton,
+    QSpinBox,
 )
 
 
+from memory_governor import MIN_BUFFER_DURATION, format_bytes
+
+# Longest replay the buffer can be resized to (seconds)
+MAX_BUFFER_DURATION = 60
+
+
 class SettingsWindow(QDialog):
     """
     Displays settings information, including camera, microphone,
@@ -23,12 +32,13 @@ class SettingsWindow(QDialog):
         CONFIG_DIR, "camera_config.json"
     )  # Adjust path
 
-    def __init__(self, video_recorder):
+    def __init__(self, video_recorder, memory_governor=None):
         super().__init__()
         self.setWindowTitle("Settings")
-        self.setFixedSize(400, 300)
+        self.setFixedSize(420, 440)
 
         self.video_recorder = video_recorder
+        self.memory_governor = memory_governor
 
         # Load config settings
         self.config = self.load_config()
@@ -57,12 +67,38 @@ class SettingsWindow(QDialog):
         self.fps_label = QLabel(str(self.video_recorder.fps))
         form_layout.addRow("FPS Lock:", self.fps_label)
 
-        # Buffer Duration
-        buffer_duration = (
-            len(self.video_recorder.buffer) // self.video_recorder.fps
-        )
-        self.buffer_label = QLabel(str(buffer_duration))
-        form_layout.addRow("Buffer Duration (sec):", self.buffer_label)
+        # Capture mode the camera actually delivers
+        self.capture_mode_label = QLabel(self.describe_capture_mode())
+        self.capture_mode_label.setWordWrap(True)
+        form_layout.addRow("Capture Mode:", self.capture_mode_label)
+
+        # Buffer capacity and how much of it is filled
+        self.buffer_label = QLabel()
+        form_layout.addRow("Buffer Capacity:", self.buffer_label)
+        self.buffer_fill_label = QLabel()
+        form_layout.addRow("Buffer Fill:", self.buffer_fill_label)
+
+        # New buffer duration, with its memory cost shown before applying
+        self.duration_spin = QSpinBox()
+        self.duration_spin.setRange(MIN_BUFFER_DURATION, MAX_BUFFER_DURATION)
+        self.duration_spin.setSuffix(" s")
+        self.duration_spin.setValue(self.video_recorder.buffer_duration)
+        self.duration_spin.valueChanged.connect(self.update_duration_cost)
+        self.duration_cost_label = QLabel()
+        self.apply_button = QPushButton("Apply")
+        self.apply_button.clicked.connect(self.apply_buffer_duration)
+        duration_layout = QHBoxLayout()
+        duration_layout.addWidget(self.duration_spin)
+        duration_layout.addWidget(self.duration_cost_label)
+        duration_layout.addWidget(self.apply_button)
+        form_layout.addRow("Buffer Duration:", duration_layout)
+
+        # What the memory governor granted
+        self.memory_label = QLabel()
+        self.memory_label.setWordWrap(True)
+        form_layout.addRow("Memory Budget:", self.memory_label)
+
+        self.update_buffer_labels()
 
         layout.addLayout(form_layout)
 
@@ -80,6 +116,66 @@ class SettingsWindow(QDialog):
                 return json.load(file)
         return {}  # Return empty config if file doesn't exist
 
+    def update_buffer_labels(self):
+        stats = self.video_recorder.buffer_stats()
+        self.buffer_label.setText(
+            f"{stats['capacity_seconds']:g} s "
+            f"({format_bytes(stats['capacity_bytes'])})"
+        )
+        self.buffer_fill_label.setText(
+            f"{stats['fill_seconds']:.1f} s "
+            f"({format_bytes(stats['fill_bytes'])})"
+        )
+        plan = self.memory_governor and self.memory_governor.plan
+        self.memory_label.setText(plan.describe() if plan else "Not limited")
+        self.update_duration_cost()
+
+    def update_duration_cost(self):
+        recorder = self.video_recorder
+        duration = self.duration_spin.value()
+        if self.memory_governor is None:
+            cost = recorder.buffer_cost(duration)
+            changed = duration != recorder.buffer_duration
+            text = format_bytes(cost) if cost else "size unknown"
+        else:
+            plan = self.memory_governor.preview(duration)
+            changed = (plan.duration, plan.scale) != (
+                recorder.buffer_duration,
+                recorder.frame_scale,
+            )
+            text = format_bytes(plan.total_bytes)
+            if plan.scale > 1:
+                text += f" at 1/{plan.scale} size"
+            if plan.duration < duration:
+                text += f", capped to {plan.duration} s"
+        self.duration_cost_label.setText(text)
+        self.apply_button.setEnabled(changed)
+
+    def apply_buffer_duration(self):
+        """
+        Resize the buffer, the newest frames are kept. The governor may
+        grant less than asked for.
+        """
+        duration = self.duration_spin.value()
+        if self.memory_governor is None:
+            self.video_recorder.set_buffer_duration(duration)
+        else:
+            self.memory_governor.apply(duration)
+        self.update_buffer_labels()
+
+    def describe_capture_mode(self):
+        mode = self.video_recorder.capture_mode
+        if not mode.get("size"):
+            return "Unknown"
+        width, height = mode["size"]
+        text = f"{width}x{height} {mode.get('fps') or 0:g} fps"
+        if mode.get("codec"):
+            text += f" {mode['codec']}"
+        mismatches = self.video_recorder.capture_mismatches
+        if mismatches:
+            text += f" (configured mode refused: {', '.join(mismatches)})"
+        return text
+
     def load_keybinds(self):
         """Load keybinds from the config file (or defaults if missing)."""
         keybinds = self.config.get(
@@ -93,6 +189,10 @@ class SettingsWindow(QDialog):
                 "Down": "Stop In-App Replay",
                 "Left": "Previous Frame",
                 "Right": "Next Frame",
+                "T": "Start Tracing / Save Trace",
+                "H": "Toggle Performance HUD",
+                "A": "Open / Close Audience Window",
+                "M": "Audience Window: Live / Replays Only",
                 "F11(Fn+F11)": "Toggle Fullscreen",
             },
         )
@@ -0,0 +1,526 @@
+"""
+Capture in a child process: a CaptureProcess reads the camera off the GUI
+process's GIL and writes each frame into a FrameRing in shared memory. The
+ring is the replay buffer, the GUI shows, replays and saves frames from it
+in place, without pickling or copying them through a pipe. The pipe only
+carries the start up handshake, pause/resume/stop and switches to a
+resized ring; the write index, capture times and drop count are in the
+ring's header. The process's log records are queued back to the GUI
+process and written by its handlers.
+
+Ring layout: int64 header fields (frames written, frames dropped), the
+sequence number and capture time (perf_counter_ns, the same clock in
+every process) of each slot, then the slots. A slot's sequence number is
+WRITING while its frame is written, so a reader can tell a frame was
+replaced under it.
+"""
+
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from perf_counters import FrameCounters
+
+logger = logging.getLogger("reposte.video")
+
+WRITTEN, DROPPED = 0, 1
+HEADER_FIELDS = 2
+WRITING = -1
+SLOT_ALIGNMENT = 64
+# Slots beyond the buffered ones, so the oldest buffered frame is not the
+# next one overwritten while a save copies it out
+SPARE_SLOTS = 16
+# How long the capture process may take to open the camera (seconds)
+OPEN_TIMEOUT = 30.0
+# And to move the buffered frames to a resized ring
+RESIZE_TIMEOUT = 10.0
+STOP_TIMEOUT = 2.0
+# How often the log forwarder checks whether it should stop (seconds)
+LOG_POLL_INTERVAL = 0.1
+
+
+def _slots_offset(slots: int) -> int:
+    header = 8 * (HEADER_FIELDS + 2 * slots)
+    return -(-header // SLOT_ALIGNMENT) * SLOT_ALIGNMENT
+
+
+class FrameRing:
+    """
+    Frames of one shape in a shared memory ring, written by one process
+    and read by others. Reads the replay buffer's deque would serve
+    (len(), indexing, iteration, maxlen) cover the newest window frames.
+    """
+
+    def __init__(self, shm, shape: tuple, slots: int, owner: bool = False):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.slots = slots
+        # The creator unlinks the memory when it closes the ring
+        self.owner = owner
+        self.header = np.ndarray(
+            (HEADER_FIELDS + 2 * slots,), np.int64, buffer=shm.buf
+        )
+        self.sequences, self.times = self.header[HEADER_FIELDS:].reshape(
+            2, slots
+        )
+        self.frames = np.ndarray(
+            (slots,) + self.shape,
+            np.uint8,
+            buffer=shm.buf,
+            offset=_slots_offset(slots),
+        )
+        # Frames readers see, the newest ones up to the buffer's length
+        self.window = self.capacity
+
+    @classmethod
+    def create(cls, shape: tuple, buffered: int) -> "FrameRing":
+        """A new ring buffering buffered frames of shape."""
+        slots = buffered + SPARE_SLOTS
+        size = _slots_offset(slots) + slots * int(np.prod(shape))
+        ring = cls(
+            shared_memory.SharedMemory(create=True, size=size),
+            shape,
+            slots,
+            owner=True,
+        )
+        ring.header[:HEADER_FIELDS] = 0
+        ring.sequences[:] = WRITING
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, shape: tuple, slots: int) -> "FrameRing":
+        return cls(shared_memory.SharedMemory(name=name), shape, slots)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def written(self) -> int:
+        return int(self.header[WRITTEN])
+
+    @property
+    def dropped(self) -> int:
+        return int(self.header[DROPPED])
+
+    @property
+    def capacity(self) -> int:
+        """The most frames window can be set to."""
+        return max(1, self.slots - SPARE_SLOTS)
+
+    @property
+    def maxlen(self) -> int:
+        return self.window
+
+    def publish(self, frame, captured_ns: int):
+        """Write the next frame. Only one process may publish."""
+        sequence = int(self.header[WRITTEN])
+        slot = sequence % self.slots
+        self.sequences[slot] = WRITING
+        self.frames[slot] = frame
+        self.times[slot] = captured_ns
+        self.sequences[slot] = sequence
+        self.header[WRITTEN] = sequence + 1
+
+    def carry_over(self, other: "FrameRing"):
+        """
+        Take over the newest frames of other (as many as fit) and its
+        counts, so sequence numbers carry on. Only the writer may call it.
+        """
+        stop = other.written
+        for sequence in range(max(0, stop - self.capacity), stop):
+            frame = other.frame(sequence)
+            if frame is None:
+                continue
+            slot = sequence % self.slots
+            self.frames[slot] = frame
+            self.times[slot] = other.times[sequence % other.slots]
+            self.sequences[slot] = sequence
+        self.header[DROPPED] = other.dropped
+        self.header[WRITTEN] = stop
+
+    def frame(self, sequence: int):
+        """Frame number sequence in place, None if not (or no longer) held."""
+        slot = sequence % self.slots
+        if sequence < 0 or self.sequences[slot] != sequence:
+            return None
+        return self.frames[slot]
+
+    def holds(self, sequence: int) -> bool:
+        """Whether frame sequence is still in its slot, unchanged."""
+        return self.sequences[sequence % self.slots] == sequence
+
+    def latest(self) -> Optional[tuple]:
+        """(sequence, capture time, frame in place) of the newest frame."""
+        sequence = self.written - 1
+        frame = self.frame(sequence)
+        if frame is None:
+            return None
+        return sequence, int(self.times[sequence % self.slots]), frame
+
+    def span(self) -> range:
+        """Sequence numbers of the frames in the window."""
+        stop = self.written
+        return range(max(0, stop - self.window), stop)
+
+    def views(self) -> tuple:
+        """
+        The window's frames in place and the sequence of the first. They
+        change as frames are published, use copy_frames() unless the
+        writer is paused.
+        """
+        frames = []
+        first = None
+        for sequence in self.span():
+            frame = self.frame(sequence)
+            if frame is not None:
+                first = sequence if first is None else first
+                frames.append(frame)
+        return frames, first if first is not None else self.written
+
+    def copy_frames(self, span: Optional[range] = None) -> tuple:
+        """
+        Copies of the window's frames (or those of span) and the sequence
+        of the first, leaving out any overwritten while being copied.
+        """
+        frames = []
+        first = None
+        for sequence in self.span() if span is None else span:
+            frame = self.frame(sequence)
+            if frame is None:
+                continue
+            frame = frame.copy()
+            if self.holds(sequence):
+                first = sequence if first is None else first
+                frames.append(frame)
+        return frames, first if first is not None else self.written
+
+    def __len__(self) -> int:
+        return len(self.span())
+
+    def __getitem__(self, index: int):
+        span = self.span()
+        frame = self.frame(span[index])
+        if frame is None:
+            raise IndexError("frame overwritten")
+        return frame
+
+    def __iter__(self):
+        return iter(self.views()[0])
+
+    def close(self):
+        """Unmap the ring (and free it, for its creator)."""
+        self.header = self.sequences = self.times = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # Frames of the ring are still referenced, e.g. by a replay;
+            # the mapping goes when they do
+            logger.warning("Shared frames still in use, left mapped.")
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingCopy:
+    """
+    Frames of a ring being copied out by a worker thread, standing in for
+    the list of a snapshot: len() is the number of frames asked for,
+    iterating waits for the copy, which leaves out frames overwritten
+    before it got to them.
+    """
+
+    def __init__(self, future, count: int):
+        self.future = future
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        return iter(self.future.result()[0])
+
+
+def forward_child_logs(log_queue, stopped: threading.Event):
+    """
+    Hand the records the capture process queues to this process's loggers,
+    so they reach its handlers like its own, until stopped is set.
+    """
+    while not stopped.is_set():
+        try:
+            record = log_queue.get(timeout=LOG_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+        except (EOFError, OSError, ValueError):
+            # The queue was closed or the process died mid record
+            return
+        logging.getLogger(record.name).handle(record)
+
+
+def capture_main(
+    control, options: dict, log_queue=None, log_level: int = logging.INFO
+):
+    """
+    The capture process: opens the camera with a RecorderCore set up from
+    options, reports it, then publishes frames into the ring it is handed
+    until told to stop. Log records go to log_queue.
+    """
+    from recorder_core import RecorderCore
+
+    if log_queue is not None:
+        root = logging.getLogger()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(log_level)
+    core = RecorderCore(**options)
+    try:
+        reader = core._open_reader()
+        frame = reader.get_next_data()
+        captured_ns = time.perf_counter_ns()
+    except Exception as e:
+        control.send(("error", str(e)))
+        return
+    control.send(
+        (
+            "opened",
+            core.capture_mode,
+            core.capture_mismatches,
+            frame.shape,
+        )
+    )
+    ring = None
+    try:
+        message = control.recv()
+        if message[0] != "ring":
+            return
+        ring = FrameRing.attach(*message[1:])
+        counters = FrameCounters()
+        counters.frame_captured(captured_ns, core.fps)
+        ring.publish(frame, captured_ns)
+        paused = False
+        while True:
+            if control.poll(None if paused else 0):
+                command = control.recv()
+                if command == "stop":
+                    break
+                if isinstance(command, tuple):
+                    # ("ring", name, shape, slots): the buffer was resized
+                    resized = FrameRing.attach(*command[1:])
+                    resized.carry_over(ring)
+                    ring.close()
+                    ring = resized
+                    control.send(("resized",))
+                    continue
+                paused = command == "pause"
+                # Time paused is not frames dropped
+                counters.last_capture_ns = 0
+                continue
+            frame = reader.get_next_data()
+            captured_ns = time.perf_counter_ns()
+            counters.frame_captured(captured_ns, core.fps)
+            ring.publish(frame, captured_ns)
+            ring.header[DROPPED] = counters.dropped
+    except (EOFError, OSError):
+        # The GUI process went away
+        pass
+    except Exception as e:
+        try:
+            control.send(("error", str(e)))
+        except OSError:
+            pass
+    finally:
+        reader.close()
+        if ring is not None:
+            ring.close()
+
+
+class CaptureProcess:
+    """
+    A capture process and the FrameRing it fills, from the GUI side. Has
+    the close() of a camera reader, so it can stand in for one.
+    """
+
+    def __init__(
+        self,
+        fps: int,
+        buffer_duration: int,
+        output_dir: str,
+        camera_config: dict,
+        reader_factory=None,
+    ):
+        self.buffered = fps * buffer_duration
+        # The child is spawned, reader_factory must pickle (e.g. a
+        # functools.partial of a reader class)
+        self.options = {
+            "fps": fps,
+            "buffer_duration": 0,
+            "output_dir": output_dir,
+            "camera_config": camera_config,
+            "reader_factory": reader_factory,
+        }
+        self.process = None
+        self.control = None
+        self.ring = None
+        self.log_forwarder = None
+        self.log_stopped = None
+        self.paused = False
+        self.capture_mode = {}
+        self.capture_mismatches = []
+        # Of the frames the camera delivers, known once it is open
+        self.shape = None
+
+    def start(self, timeout: float = OPEN_TIMEOUT) -> FrameRing:
+        """
+        Start the process, wait for the camera and give it a ring of
+        buffered frames. Raises on failure.
+        """
+        self.open(timeout)
+        return self.allocate(self.buffered)
+
+    def open(self, timeout: float = OPEN_TIMEOUT):
+        """
+        Start the process and wait for the camera, which then waits for
+        allocate(). Raises on failure.
+        """
+        # Spawned, not forked: forking a process running Qt threads is
+        # unsafe
+        context = multiprocessing.get_context("spawn")
+        self.control, child = context.Pipe()
+        log_queue = context.Queue()
+        # A new event each time, a forwarder still draining the last
+        # process's queue keeps its own
+        self.log_stopped = threading.Event()
+        self.log_forwarder = threading.Thread(
+            target=forward_child_logs,
+            args=(log_queue, self.log_stopped),
+            name="reposte-capture-logs",
+            daemon=True,
+        )
+        self.log_forwarder.start()
+        self.process = context.Process(
+            target=capture_main,
+            args=(
+                child,
+                self.options,
+                log_queue,
+                logging.getLogger().getEffectiveLevel(),
+            ),
+            name="reposte-capture",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        try:
+            if not self.control.poll(timeout):
+                raise RuntimeError("capture process did not open the camera")
+            message = self.control.recv()
+        except EOFError:
+            message = ("error", "capture process exited")
+        if message[0] != "opened":
+            self.close()
+            raise RuntimeError(message[1])
+        _, self.capture_mode, self.capture_mismatches, self.shape = message
+
+    def allocate(self, buffered: int) -> FrameRing:
+        """
+        Create the ring, sized for buffered frames of the camera's shape
+        (e.g. as the memory governor allows), and start capturing into it.
+        """
+        self.buffered = buffered
+        self.ring = FrameRing.create(self.shape, buffered)
+        self._send(self._ring_message(self.ring))
+        return self.ring
+
+    def resize(
+        self, buffered: int, timeout: float = RESIZE_TIMEOUT
+    ) -> FrameRing:
+        """
+        Move the capture to a new ring of buffered frames. The process
+        carries the newest frames over between two captures, then the old
+        ring is freed. Raises on failure, leaving the old ring in use.
+        """
+        ring = FrameRing.create(self.shape, buffered)
+        self._send(self._ring_message(ring))
+        try:
+            if not self.control.poll(timeout):
+                raise RuntimeError("capture process did not resize")
+            message = self.control.recv()
+        except EOFError:
+            message = ("error", "capture process exited")
+        except RuntimeError as e:
+            message = ("error", str(e))
+        if message[0] != "resized":
+            ring.close()
+            raise RuntimeError(message[1])
+        self.ring, old = ring, self.ring
+        self.buffered = buffered
+        old.close()
+        return ring
+
+    @staticmethod
+    def _ring_message(ring: FrameRing) -> tuple:
+        return ("ring", ring.name, ring.shape, ring.slots)
+
+    def pause(self):
+        self._send("pause")
+        self.paused = True
+
+    def resume(self):
+        self._send("resume")
+        self.paused = False
+
+    def error(self) -> Optional[str]:
+        """Why the capture process stopped, None while it runs."""
+        try:
+            if self.control.poll():
+                message = self.control.recv()
+                if message[0] != "error":
+                    # e.g. a resize answered after resize() gave up
+                    return f"capture process sent {message[0]} unasked"
+                return message[1]
+        except (EOFError, OSError):
+            return "capture process exited"
+        if not self.process.is_alive():
+            return f"capture process exited ({self.process.exitcode})"
+        return None
+
+    def close(self, timeout: float = STOP_TIMEOUT) -> bool:
+        """
+        Stop the process and free the ring. A process still running after
+        timeout seconds (e.g. stuck in a camera read) is terminated, not
+        waited for, and False is returned.
+        """
+        self._send("stop")
+        stopped = True
+        if self.process is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                logger.warning(
+                    f"Capture process did not stop within {timeout} s, "
+                    "terminating it."
+                )
+                self.process.terminate()
+                stopped = False
+        if self.log_forwarder is not None:
+            # Not waited for, records still in flight are dropped
+            self.log_stopped.set()
+            self.log_forwarder = None
+        if self.control is not None:
+            self.control.close()
+            self.control = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        return stopped
+
+    def _send(self, command):
+        try:
+            if self.control is not None:
+                self.control.send(command)
+        except OSError:
+            pass
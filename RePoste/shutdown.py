@@ -0,0 +1,70 @@
+import logging
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+logger = logging.getLogger("reposte.shutdown")
+
+# Total time the app may take to shut down (seconds)
+SHUTDOWN_BUDGET = 0.5
+
+
+class ShutdownStep(NamedTuple):
+    name: str
+    # Called with the step's budget in seconds; returning False means the
+    # step gave up before finishing
+    stop: Callable[[float], Optional[bool]]
+    budget: float
+
+
+class ShutdownReport(NamedTuple):
+    elapsed: dict  # step name -> seconds
+    overruns: List[str]
+    total: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.overruns
+
+
+class ShutdownCoordinator:
+    """
+    Stops the app's components in order, each within its own deadline,
+    and reports the ones that blew their budget.
+    """
+
+    def __init__(self, budget: float = SHUTDOWN_BUDGET):
+        self.budget = budget
+        self.steps = []
+
+    def add(self, name: str, stop: Callable, budget: float):
+        self.steps.append(ShutdownStep(name, stop, budget))
+
+    def run(self) -> ShutdownReport:
+        started = time.perf_counter()
+        elapsed = {}
+        overruns = []
+        for step in self.steps:
+            step_started = time.perf_counter()
+            try:
+                finished = step.stop(step.budget) is not False
+            except Exception as e:
+                logger.error(f"Error stopping {step.name}: {e}")
+                finished = False
+            elapsed[step.name] = time.perf_counter() - step_started
+            if not finished or elapsed[step.name] > step.budget:
+                overruns.append(step.name)
+                logger.warning(
+                    f"Shutdown of {step.name} took "
+                    f"{elapsed[step.name] * 1000:.0f} ms "
+                    f"(budget {step.budget * 1000:.0f} ms)"
+                    f"{'' if finished else ', gave up waiting'}"
+                )
+
+        total = time.perf_counter() - started
+        if total > self.budget and not overruns:
+            overruns.append("total")
+        logger.info(
+            f"Shutdown finished in {total * 1000:.0f} ms "
+            f"(budget {self.budget * 1000:.0f} ms)"
+        )
+        return ShutdownReport(elapsed, overruns, total)
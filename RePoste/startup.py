@@ -0,0 +1,70 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+
+class StartupProfiler:
+    """
+    Records how long each start-up phase takes, and when milestones that
+    happen in the background (camera open, scoreboard connected) are
+    reached. The breakdown is printed once every expected milestone is in,
+    or by report() at the latest. Does nothing unless enabled.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        started: Optional[float] = None,
+        expected: Iterable[str] = (),
+    ):
+        self.enabled = enabled
+        self.started = time.perf_counter() if started is None else started
+        self.expected = list(expected)
+        self.phases = []  # (name, start, end) in seconds since started
+        self.marks = {}  # milestone -> seconds since started
+        self.printed = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        begin = time.perf_counter() - self.started
+        try:
+            yield
+        finally:
+            end = time.perf_counter() - self.started
+            self.phases.append((name, begin, end))
+
+    def mark(self, name: str):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.marks.setdefault(name, time.perf_counter() - self.started)
+            complete = all(m in self.marks for m in self.expected)
+        if complete:
+            self.report()
+
+    def format(self) -> str:
+        lines = ["Startup profile:"]
+        for name, begin, end in self.phases:
+            lines.append(
+                f"  {name:<24} {(end - begin) * 1000:8.1f} ms "
+                f"(done at {end * 1000:.1f} ms)"
+            )
+        for name in self.expected + [
+            m for m in self.marks if m not in self.expected
+        ]:
+            at = self.marks.get(name)
+            when = "pending" if at is None else f"at {at * 1000:.1f} ms"
+            lines.append(f"  {name:<24} {'':>8}    reached {when}")
+        return "\n".join(lines)
+
+    def report(self):
+        """Print the breakdown, once."""
+        if not self.enabled or self.printed:
+            return
+        self.printed = True
+        print(self.format(), flush=True)
@@ -0,0 +1,129 @@
+"""
+A stand-in camera for benchmarks and tests. SyntheticReader has the
+reader interface of imageio.get_reader (get_next_data, get_meta_data,
+close), so a VideoRecorder can run on it without a camera attached.
+"""
+
+import time
+from typing import Optional, Tuple
+
+# Test resolutions, (width, height)
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+# Distinct frames generated up front and cycled through
+PATTERN_FRAMES = 8
+# Most frames decoded from a video file source
+MAX_FILE_FRAMES = 120
+
+
+def pattern_frames(size: Tuple[int, int], count: int = PATTERN_FRAMES):
+    """Colour gradient frames with a white bar moving across them."""
+    import numpy as np
+
+    width, height = size
+    x = np.linspace(0, 255, width, dtype=np.uint8)
+    y = np.linspace(0, 255, height, dtype=np.uint8)
+    base = np.empty((height, width, 3), dtype=np.uint8)
+    base[:, :, 0] = x
+    base[:, :, 1] = y[:, None]
+    base[:, :, 2] = 128
+    bar_width = max(1, width // count)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        start = i * bar_width
+        stop = start + bar_width
+        frame[:, start:stop] = 255
+        frames.append(frame)
+    return frames
+
+
+def file_frames(path: str, max_frames: int = MAX_FILE_FRAMES):
+    """Decode up to max_frames of a video file, and its frame rate."""
+    import imageio
+
+    with imageio.get_reader(path, "ffmpeg") as reader:
+        fps = reader.get_meta_data().get("fps")
+        frames = []
+        for frame in reader:
+            frames.append(frame)
+            if len(frames) >= max_frames:
+                break
+    return frames, fps
+
+
+class SyntheticReader:
+    """
+    Delivers frames like a camera would. The frames are generated (or
+    decoded from source, a local video file) before the first read, so
+    reads only cost a copy; with realtime=True a read blocks until the
+    next frame is due at fps. captured_at holds the perf_counter time the
+    last frame was handed out.
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int] = RESOLUTIONS["1080p"],
+        fps: float = 60,
+        realtime: bool = True,
+        source: Optional[str] = None,
+    ):
+        if source:
+            self.frames, source_fps = file_frames(source)
+            if not self.frames:
+                raise ValueError(f"No frames in {source}")
+            height, width = self.frames[0].shape[:2]
+            size = (width, height)
+            fps = source_fps or fps
+        else:
+            self.frames = pattern_frames(size)
+        self.size = tuple(size)
+        self.fps = fps
+        self.realtime = realtime
+        self.source = source
+        self.frame_count = 0
+        self.captured_at = None
+        self.closed = False
+        self._started = None
+
+    def get_meta_data(self) -> dict:
+        return {
+            "size": self.size,
+            "fps": self.fps,
+            "codec": "synthetic" if self.source is None else "file",
+            "pix_fmt": "rgb24",
+            "source": self.source or "pattern",
+        }
+
+    def get_next_data(self):
+        if self.closed:
+            raise RuntimeError("Reader is closed")
+        now = time.perf_counter()
+        if self._started is None:
+            self._started = now
+        if self.realtime:
+            due = self._started + self.frame_count / self.fps
+            if due > now:
+                time.sleep(due - now)
+        # A camera hands out a new array for every frame
+        frame = self.frames[self.frame_count % len(self.frames)].copy()
+        self.frame_count += 1
+        self.captured_at = time.perf_counter()
+        return frame
+
+    def close(self):
+        self.closed = True
+
+    def __iter__(self):
+        while not self.closed:
+            yield self.get_next_data()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,9 +1,32 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import scoreboard_manager
+import scoreboard_transport
+from scoring_backends import (
+    FaveroBackend,
+    SfsLinkBackend,
+    create_backend,
+    encode_favero_frame,
+)
+from scoreboard_state import encode_bcd
 from scoreboard_manager import (
+    ScoreboardManager,
+    ScoreboardTransport,
     decode_bcd,
+    decode_sfs_link_payload,
     parse_lamp_bits,
     parse_matches_and_priorities,
     parse_penalty_bits,
 )
+from worker_utils import LatencyStats
 
 
 def test_decode_bcd():
@@ -22,6 +45,11 @@ def test_decode_bcd():
     assert decode_bcd(0xAB) == 111
 
 
+def test_encode_bcd_inverts_decode_bcd():
+    assert encode_bcd(56) == 0x56
+    assert all(decode_bcd(encode_bcd(value)) == value for value in range(100))
+
+
 def test_parse_lamp_bits():
     # b6 = 0x14 => 00010100 in binary
     # D2=1 => left_red = True, D4=1 => right_yellow = True
@@ -108,3 +136,501 @@ def test_parse_penalty_bits():
     assert result["penalty_left_red"] is False
     assert result["penalty_right_yellow"] is True
     assert result["penalty_left_yellow"] is False
+
+
+class FakeTransport(ScoreboardTransport):
+    """Transport that serves a fixed list of values."""
+
+    def __init__(self, values, supports_notify):
+        self.values = list(values)
+        self.reads = 0
+        self.connected = True
+        self.supports_notify = supports_notify
+
+    @property
+    def is_connected(self):
+        return self.connected
+
+    async def connect(self):
+        return True
+
+    async def disconnect(self):
+        self.connected = False
+
+    async def read(self):
+        self.reads += 1
+        if self.reads >= len(self.values):
+            self.connected = False
+        return self.values[min(self.reads, len(self.values)) - 1]
+
+    async def start_notify(self, callback):
+        for value in self.values:
+            callback(None, value)
+        self.connected = False
+
+
+def test_transports_must_implement_the_link():
+    class Incomplete(ScoreboardTransport):
+        async def read(self):
+            return b""
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_poll_only_transport_refuses_to_notify():
+    class PollOnly(FakeTransport):
+        start_notify = ScoreboardTransport.start_notify
+
+    transport = PollOnly([b"06125602140A38"], False)
+
+    with pytest.raises(scoreboard_transport.TransportError):
+        asyncio.run(transport.start_notify(print))
+
+
+def test_latency_stats():
+    stats = LatencyStats()
+    assert stats.mean() == 0.0
+    assert stats.p99() == 0.0
+    for ms in range(1, 101):
+        stats.add(ms / 1000)
+    assert abs(stats.mean() - 0.0505) < 1e-9
+    assert stats.p99() == 0.1
+
+
+def test_worker_utils_import_without_qt_or_bleak():
+    # Act
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, worker_utils; "
+            "print(sorted({'PyQt6', 'bleak'} & set(sys.modules)))",
+        ],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Assert
+    assert result.stdout.strip() == "[]", "❌ Should not pull in Qt or bleak"
+
+
+def test_poll_backs_off_and_reports_latency(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(scoreboard_manager.asyncio, "sleep", fake_sleep)
+    manager = ScoreboardManager()
+    manager.running = True
+    states = []
+    manager.state_updated.connect(states.append)
+    value = bytearray(b"06125602140A38")
+    transport = FakeTransport(
+        [value] * 5 + [bytearray(b"07125602140A38")], False
+    )
+
+    asyncio.run(manager._poll_characteristic(transport))
+
+    # Only the two distinct values are emitted
+    assert len(states) == 2
+    assert sleeps[0] == scoreboard_manager.POLL_INTERVAL_MIN
+    assert sleeps[1] > sleeps[0]
+    assert max(sleeps) <= scoreboard_manager.POLL_INTERVAL_MAX
+    report = manager.latency_report()
+    assert report["mode"] == "poll"
+    assert report["samples"] == 2
+
+
+def test_notify_mode_uses_notification_handler():
+    manager = ScoreboardManager()
+    manager.running = True
+    manager._notification_handler = MagicMock(
+        wraps=manager._notification_handler
+    )
+    # A slow slot: the update is only delivered once the signal returns
+    manager.state_updated.connect(lambda state: time.sleep(0.02))
+    transport = FakeTransport(
+        [bytearray(b"06125602140A38"), bytearray(b"06125602140A38")], True
+    )
+
+    asyncio.run(manager._listen_for_notifications(transport))
+
+    assert transport.reads == 0
+    assert manager._notification_handler.call_count == 2
+    report = manager.latency_report()
+    assert report["mode"] == "notify"
+    # The duplicate is dropped, it is not an update
+    assert report["samples"] == 1
+    assert report["avg_ms"] >= 20, "❌ Latency runs from arrival to emit"
+
+
+def test_duplicate_payloads_are_dropped():
+    manager = ScoreboardManager()
+    states = []
+    manager.state_updated.connect(states.append)
+
+    assert manager._notification_handler(0, b"06125602140A38") is True
+    assert manager._notification_handler(0, b"06125602140A38") is False
+    assert manager._notification_handler(0, b"06125602140A38") is False
+    assert manager._notification_handler(0, b"06125702140A38") is True
+
+    assert [state.seconds for state in states] == [56, 57]
+    assert manager.update_counters() == {
+        "received": 4,
+        "dropped_duplicate": 2,
+        "resyncs": 0,
+        "checksum_errors": 0,
+        "emitted": 2,
+    }
+
+
+def test_decode_sfs_link_payload():
+    state = decode_sfs_link_payload(b"06125602140A38", timestamp=1.5)
+    assert state.right_score == 6
+    assert state.left_score == 12
+    assert state.seconds == 56
+    assert state.minutes == 2
+    assert state.lamps.left_red is True
+    assert state.lamps.right_yellow is True
+    assert state.match.num_matches == 2
+    assert state.match.left_priority is True
+    assert state.penalty.penalty_left_yellow is True
+    assert state.timestamp == 1.5
+
+    assert decode_sfs_link_payload(b"06125602140A") is None
+    assert decode_sfs_link_payload(b"0612560214ZZ38") is None
+
+
+def test_state_equality_ignores_timestamp():
+    first = decode_sfs_link_payload(b"06125602140A38", timestamp=1.0)
+    second = decode_sfs_link_payload(b"06125602140A38", timestamp=2.0)
+    third = decode_sfs_link_payload(b"06125702140A38", timestamp=2.0)
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first != third
+    assert len({first, second, third}) == 2
+    # Table entries are shared between states with equal bytes
+    assert first.lamps is second.lamps
+
+
+def test_state_to_dict_matches_legacy_parser():
+    manager = ScoreboardManager()
+    state = decode_sfs_link_payload(b"06125602140A38")
+    assert state.to_dict() == {
+        "right_score": 6,
+        "left_score": 12,
+        "seconds": "56",
+        "minutes": "02",
+        "lamp_bits": parse_lamp_bits(0x14),
+        "match_bits": parse_matches_and_priorities(0x0A),
+        "penalty": parse_penalty_bits(0x38),
+    }
+    assert manager._parse_sfs_link_hex("06125602140A38") == state.to_dict()
+
+
+def test_delta_signals_only_fire_for_changed_fields():
+    manager = ScoreboardManager()
+    emitted = []
+    manager.score_changed.connect(lambda *a: emitted.append("score"))
+    manager.clock_changed.connect(lambda *a: emitted.append("clock"))
+    manager.lamps_changed.connect(lambda *a: emitted.append("lamps"))
+    manager.cards_changed.connect(lambda *a: emitted.append("cards"))
+    manager.priority_changed.connect(lambda *a: emitted.append("priority"))
+
+    # The first state reports everything
+    manager._notification_handler(0, b"06125602140A38")
+    assert emitted == ["score", "clock", "lamps", "cards", "priority"]
+
+    # A clock tick only reports the clock
+    emitted.clear()
+    manager._notification_handler(0, b"06125502140A38")
+    assert emitted == ["clock"]
+
+    # A blank scoreboard keeps the last state, so nothing is reported
+    emitted.clear()
+    manager._notification_handler(0, b"00000000000000")
+    manager._notification_handler(0, b"06125502000A38")
+    assert emitted == ["lamps"]
+
+
+def test_reconnect_delay_is_bounded_exponential():
+    for failures in range(10):
+        delay = scoreboard_manager.reconnect_delay(failures)
+        ceiling = min(
+            scoreboard_manager.RECONNECT_DELAY_MAX,
+            scoreboard_manager.RECONNECT_DELAY_MIN * 2**failures,
+        )
+        assert ceiling / 2 <= delay <= ceiling
+
+
+class FakeBleakClient:
+    """Stand-in for BleakClient that connects to a known address."""
+
+    reachable = set()
+
+    def __init__(self, address, timeout=10.0):
+        self.address = getattr(address, "address", address)
+        self.is_connected = False
+        char = MagicMock(
+            uuid=scoreboard_transport.SFS_CHARACTERISTIC_UUID,
+            handle=42,
+            properties=["read"],
+        )
+        self.services = MagicMock()
+        self.services.__iter__.return_value = []
+        self.services.get_characteristic.return_value = char
+
+    async def connect(self):
+        if self.address not in self.reachable:
+            raise TimeoutError("unreachable")
+        self.is_connected = True
+
+    async def disconnect(self):
+        self.is_connected = False
+
+
+def test_session_connects_to_cached_address_without_scanning(
+    monkeypatch, tmp_path
+):
+    cache_file = str(tmp_path / "cache.json")
+    scoreboard_transport.save_device_cache(
+        cache_file, {"address": "AA:BB", "char_handle": 42}
+    )
+    scanner = MagicMock()
+    FakeBleakClient.reachable = {"AA:BB"}
+    monkeypatch.setattr(scoreboard_transport, "BleakClient", FakeBleakClient)
+    monkeypatch.setattr(scoreboard_transport, "BleakScanner", scanner)
+    manager = ScoreboardManager(cache_file=cache_file)
+    manager._poll_characteristic = AsyncMock()
+
+    assert asyncio.run(manager._run_session()) is True
+
+    scanner.find_device_by_filter.assert_not_called()
+    manager._poll_characteristic.assert_called_once()
+    assert manager.client is None
+
+
+def test_session_scans_and_caches_when_cached_device_is_gone(
+    monkeypatch, tmp_path
+):
+    cache_file = str(tmp_path / "cache.json")
+    scoreboard_transport.save_device_cache(cache_file, {"address": "OLD"})
+
+    async def find_device_by_filter(filterfunc, timeout):
+        return MagicMock(address="NEW")
+
+    scanner = MagicMock()
+    scanner.find_device_by_filter = find_device_by_filter
+    FakeBleakClient.reachable = {"NEW"}
+    monkeypatch.setattr(scoreboard_transport, "BleakClient", FakeBleakClient)
+    monkeypatch.setattr(scoreboard_transport, "BleakScanner", scanner)
+    manager = ScoreboardManager(cache_file=cache_file)
+    manager._poll_characteristic = AsyncMock()
+
+    assert asyncio.run(manager._run_session()) is True
+
+    assert scoreboard_transport.load_device_cache(cache_file) == {
+        "address": "NEW",
+        "char_handle": 42,
+    }
+
+
+def test_multi_manager_runs_every_piste_on_one_loop():
+    devices = [
+        {"piste": 1, "name": "SFS-Link [001]"},
+        {"piste": 2, "name": "SFS-Link [002]"},
+        {"piste": 3, "name": "SFS-Link [003]"},
+    ]
+    multi = scoreboard_manager.MultiScoreboardManager(devices)
+    threads = set()
+
+    def fake_session(manager, score):
+        async def run_session():
+            threads.add(threading.get_ident())
+            manager._notification_handler(0, b"%02d125602140A38" % score)
+            manager.running = False
+            return True
+
+        return run_session
+
+    for score, manager in enumerate(multi.managers.values()):
+        manager._run_session = fake_session(manager, score)
+
+    multi.start()
+    multi.thread.join(timeout=5)
+    multi.stop()
+
+    assert len(threads) == 1, "All pistes should share one thread"
+    assert threading.get_ident() not in threads
+    scores = [multi.manager(p).current_state.right_score for p in (1, 2, 3)]
+    assert scores == [0, 1, 2], "Each piste should get its own state"
+    stats = multi.stats()
+    assert set(stats) == {"1", "2", "3"}
+    assert stats["2"]["rate_hz"] > 0
+    assert multi.manager(2).transport.device_name == "SFS-Link [002]"
+
+
+def test_encode_payload_round_trips_through_decoder():
+    payload = scoreboard_transport.encode_sfs_link_payload(
+        right_score=6,
+        left_score=12,
+        minutes=2,
+        seconds=56,
+        lamp_bits=0x14,
+        match_bits=0x0A,
+        penalty_bits=0x38,
+    )
+    assert payload == b"06125602140A38"
+
+
+def test_simulated_transport_replays_trace_through_manager():
+    trace = scoreboard_transport.synthetic_bout(rate_hz=50, duration=10)
+    transport = scoreboard_transport.SimulatedTransport(trace, speed=None)
+    manager = ScoreboardManager(transport=transport)
+    manager.running = True
+
+    assert asyncio.run(manager._run_session()) is True
+
+    distinct = len({payload for _, payload in trace})
+    assert transport.sent_count == len(trace)
+    assert manager.update_counters()["received"] == len(trace)
+    assert distinct <= manager.update_counters()["emitted"] < len(trace)
+    assert manager.latency_report()["mode"] == "notify"
+
+
+def test_simulated_transport_can_be_polled():
+    trace = [(0.0, b"06125602140A38"), (0.05, b"06125502140A38")]
+    transport = scoreboard_transport.SimulatedTransport(
+        trace, supports_notify=False
+    )
+    manager = ScoreboardManager(transport=transport)
+    manager.running = True
+
+    asyncio.run(manager._run_session())
+
+    assert manager.current_state.seconds == 55
+    assert manager.latency_report()["mode"] == "poll"
+
+
+def test_trace_save_and_load(tmp_path):
+    path = str(tmp_path / "bout.trace")
+    trace = scoreboard_transport.stress_trace(10, rate_hz=100)
+    scoreboard_transport.save_trace(path, trace)
+    loaded = scoreboard_transport.load_trace(path)
+    assert [payload for _, payload in loaded] == [p for _, p in trace]
+    assert loaded[-1][0] == trace[-1][0]
+
+
+def test_favero_backend_parses_frames_split_anywhere():
+    frames = b"".join(
+        encode_favero_frame(right, 1, 2, 30 - right, lamp_bits=0x08)
+        for right in range(5)
+    )
+    backend = FaveroBackend()
+    states = []
+    for i in range(0, len(frames), 3):
+        states += backend.feed(frames[i:][:3])
+
+    assert [state.right_score for state in states] == [0, 1, 2, 3, 4]
+    assert [state.seconds for state in states] == [30, 29, 28, 27, 26]
+    assert states[0].minutes == 2
+    assert states[0].lamps.right_green is True
+    assert backend.resyncs == 0
+
+
+def test_favero_backend_resyncs_after_noise_and_bad_checksum():
+    good = encode_favero_frame(5, 3)
+    corrupt = bytearray(encode_favero_frame(6, 3))
+    corrupt[-1] ^= 0x01
+    backend = FaveroBackend()
+
+    states = backend.feed(b"\x12\xff\x00" + bytes(corrupt) + good + good)
+
+    assert [state.right_score for state in states] == [5]
+    assert backend.checksum_errors == 2
+    assert backend.duplicates_dropped == 1
+    # A partial frame waits for the rest of its bytes
+    assert backend.feed(encode_favero_frame(7, 3)[:4]) == []
+    assert backend.feed(encode_favero_frame(7, 3)[4:])[0].right_score == 7
+
+
+def test_sfs_link_backend_parses_a_delimited_stream():
+    backend = SfsLinkBackend()
+
+    states = backend.feed(b"06125602140A38\r\n0612")
+    states += backend.feed(b"5702140A38\r\n00000000000000\r\n")
+
+    assert [state.seconds for state in states[:2]] == [56, 57]
+    assert states[2] is None
+    assert backend.resyncs == 0
+    assert backend.feed(b"0612\r\n") == []
+    assert backend.resyncs == 1
+    with pytest.raises(ValueError):
+        create_backend("unknown")
+
+
+def test_serial_transport_rejects_unsupported_baud_rate():
+    with pytest.raises(ValueError, match="baud rate 2401"):
+        scoreboard_transport.SerialTransport("/dev/ttyUSB0", 2401)
+
+
+@pytest.mark.skipif(
+    scoreboard_transport.termios is None, reason="needs a POSIX pty"
+)
+def test_favero_over_pty_through_manager():
+    machine = scoreboard_transport.PtyScoringMachine()
+    transport = scoreboard_transport.SerialTransport(machine.path)
+    manager = ScoreboardManager(transport=transport, backend=FaveroBackend())
+    manager.running = True
+
+    async def scoring_machine():
+        for right in range(3):
+            machine.write(encode_favero_frame(right, 4))
+            await asyncio.sleep(0.05)
+        manager.running = False
+
+    async def run():
+        await asyncio.gather(manager._run_session(), scoring_machine())
+
+    try:
+        asyncio.run(run())
+    finally:
+        machine.close()
+
+    assert manager.current_state.right_score == 2
+    assert manager.current_state.left_score == 4
+    assert manager.update_counters()["emitted"] == 3
+    assert not transport.is_connected
+
+
+class HangingTransport(FakeTransport):
+    """Notifies once, then never lets go of the link."""
+
+    def __init__(self):
+        super().__init__([b"06125602140A38"], True)
+        self.subscribed = threading.Event()
+
+    async def start_notify(self, callback):
+        callback(None, self.values[0])
+        self.subscribed.set()
+
+    async def disconnect(self):
+        await asyncio.sleep(10)
+
+
+def test_stop_cancels_session_within_deadline():
+    transport = HangingTransport()
+    manager = ScoreboardManager(transport=transport)
+    manager.start()
+    assert transport.subscribed.wait(2)
+
+    started = time.perf_counter()
+    assert manager.stop(timeout=0.5) is True
+    assert time.perf_counter() - started < 0.5
+    assert manager.loop.is_closed()
+    assert manager.current_state.seconds == 56
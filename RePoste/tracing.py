@@ -0,0 +1,162 @@
+"""
+Lightweight tracing of the hot paths (capture, convert, scale, paint,
+scoreboard parse and render, replay encode, scoreboard reads).
+
+Spans go into a preallocated ring of perf_counter_ns records; when tracing
+is disabled a span costs one attribute check. dump() writes the ring as a
+Chrome trace JSON, which chrome://tracing and https://ui.perfetto.dev open.
+"""
+
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+from array import array
+from time import perf_counter_ns
+
+logger = logging.getLogger("reposte.tracing")
+
+# Spans kept, the oldest are overwritten once the ring is full
+TRACE_CAPACITY = 1 << 16
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.name, self.start, perf_counter_ns())
+        return False
+
+
+class Tracer:
+    """Ring buffer of (name, start, duration, thread) spans."""
+
+    def __init__(self, capacity: int = TRACE_CAPACITY, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._names = [None] * capacity
+        self._starts = array("q", bytes(8 * capacity))
+        self._durations = array("q", bytes(8 * capacity))
+        self._threads = array("q", bytes(8 * capacity))
+        self._thread_names = {}
+        # next() on a count is atomic, so threads never share a slot
+        self._slots = itertools.count()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._names = [None] * self.capacity
+        self._slots = itertools.count()
+
+    def span(self, name: str):
+        """Context manager recording a span, e.g. with tracer.span("x"):"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, start_ns: int, end_ns: int):
+        slot = next(self._slots) % self.capacity
+        thread = threading.get_native_id()
+        if thread not in self._thread_names:
+            self._thread_names[thread] = threading.current_thread().name
+        self._names[slot] = name
+        self._starts[slot] = start_ns
+        self._durations[slot] = end_ns - start_ns
+        self._threads[slot] = thread
+
+    def spans(self) -> list:
+        """Recorded (name, start_ns, duration_ns, thread), oldest first."""
+        recorded = [
+            (name, self._starts[i], self._durations[i], self._threads[i])
+            for i, name in enumerate(self._names)
+            if name is not None
+        ]
+        recorded.sort(key=lambda span: span[1])
+        return recorded
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": thread,
+                "args": {"name": name},
+            }
+            for thread, name in self._thread_names.items()
+        ]
+        for name, start, duration, thread in self.spans():
+            events.append(
+                {
+                    "name": name,
+                    "cat": "reposte",
+                    "ph": "X",
+                    "ts": start / 1000,
+                    "dur": duration / 1000,
+                    "pid": pid,
+                    "tid": thread,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str) -> str:
+        """Write the trace to path as Chrome trace JSON."""
+        trace = self.to_chrome_trace()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(trace, file)
+        logger.info(
+            f"Trace of {len(trace['traceEvents'])} events saved to {path}"
+        )
+        return path
+
+
+# The app's tracer, off until enabled (--trace or the T key)
+tracer = Tracer()
+
+
+def traced(name: str):
+    """Decorator recording each call of a function as a span."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.record(name, start, perf_counter_ns())
+
+        return wrapper
+
+    return decorate
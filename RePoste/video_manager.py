@@ -1,72 +1,155 @@
-import os
-import imageio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 import numpy as np
 from PyQt6.QtGui import QImage, QPixmap
-from PyQt6.QtCore import QTimer
-from collections import deque
-from datetime import datetime
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 import logging
+import time
 from typing import Callable, Optional
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+from recorder_core import (  # noqa: F401 (re-exported)
+    RecorderCore,
+    camera_uri,
+    check_capture_mode,
+    downscale_frame,
+    load_camera_config,
+    mode_input_params,
+    upscale_frame,
 )
-logger = logging.getLogger()
+from shared_frames import STOP_TIMEOUT, CaptureProcess, RingCopy
+from tracing import traced, tracer
+
+logger = logging.getLogger("reposte.video")
+
+
+class ReaderOpened(QObject):
+    """Hands a reader opened on a worker thread to the GUI thread."""
+
+    opened = pyqtSignal(object, object)  # reader, exception
 
 
-class VideoRecorder:
+class VideoRecorder(RecorderCore):
+    """
+    The recorder of the Qt app: captures on the GUI thread's event loop,
+    converts each frame shown to a QImage once for every view of it and
+    plays the buffer back in the window. Buffering and saving are
+    RecorderCore's.
+    """
+
     def __init__(
         self,
         fps: int = 60,
         buffer_duration: int = 5,
         output_dir: str = "output",
+        camera_config: Optional[dict] = None,
+        reader_factory: Optional[Callable[[], object]] = None,
     ):
-        self.fps = fps
-        self.buffer = deque(
-            maxlen=fps * buffer_duration,
+        super().__init__(
+            fps, buffer_duration, output_dir, camera_config, reader_factory
         )
-        self.output_dir = output_dir
         self.recording = False
         self.paused = False
-        self.reader = None
         self.update_callback = None
+        self.ready_callback = None
         self.replaying = False
         self.replay_frames = []
         self.replay_index = 0
         self.replay_timer = None
         self.replay_speed = 1.0
+        # Called with each frame shown, live or replayed, e.g. to stream it
+        self.frame_listeners = []
+        # Called with the QImage of each frame shown and whether it was
+        # replayed, e.g. by the audience window, after update_callback
+        self.image_listeners = []
 
-        os.makedirs(output_dir, exist_ok=True)
+    def start_recording(
+        self,
+        update_callback: Callable[[QImage], None],
+        background: bool = False,
+        ready_callback: Optional[Callable[[bool], None]] = None,
+    ):
+        """
+        Open the camera and start capturing. With background=True the
+        camera is opened on a worker thread and capture starts once it is
+        ready; ready_callback(success) is then called on the GUI thread.
+        """
+        self.recording = True
+        self.paused = False
+        self.update_callback = update_callback
+        # Time stopped is not frames dropped
+        self.counters.last_capture_ns = 0
+        if not background:
+            try:
+                self._on_reader_opened(self._open_reader(), None)
+            except Exception as e:
+                self._on_reader_opened(None, e)
+            return
 
-    def start_recording(self, update_callback: Callable[[QPixmap], None]):
+        self.ready_callback = ready_callback
+        self._reader_opened = ReaderOpened()
+        self._reader_opened.opened.connect(self._on_reader_opened)
+        threading.Thread(
+            target=self._open_reader_in_background,
+            name="camera-open",
+            daemon=True,
+        ).start()
+
+    def _open_reader_in_background(self):
         try:
-            self.recording = True
-            self.paused = False
-            self.update_callback = update_callback
+            reader = self._open_reader()
+        except Exception as e:
+            self._reader_opened.opened.emit(None, e)
+        else:
+            self._reader_opened.opened.emit(reader, None)
 
-            # Try initializing with imageio first
-            self.reader = imageio.get_reader("<video0>", "ffmpeg")
+    def _on_reader_opened(self, reader, error):
+        ready_callback, self.ready_callback = self.ready_callback, None
+        if error is not None:
+            logger.error(f"Error starting recording: {error}")
+            self.recording = False
+        elif not self.recording:
+            # Stopped while the camera was still opening
+            reader.close()
+        else:
+            self.reader = reader
             logger.info("Successfully initialized video with imageio.")
-
             self.capture_frame()
             logger.info("Recording started.")
-        except Exception as e:
-            logger.error(f"Error starting recording: {e}")
-            self.recording = False
+        if ready_callback:
+            ready_callback(self.reader is not None and self.recording)
 
     def capture_frame(self):
         if not self.recording or self.paused:
             return
         try:
-            frame = self.reader.get_next_data()
-            pixmap = self.convert_frame_to_pixmap(frame)
-            self.update_callback(pixmap)
-            self.buffer.append(frame)
+            with tracer.span("camera read"):
+                frame = self.reader.get_next_data()
+            self.counters.frame_captured(time.perf_counter_ns(), self.fps)
+            self.display_frame(frame)
+            self.ingest_frame(frame)
             QTimer.singleShot(int(1000 / self.fps), self.capture_frame)
         except Exception as e:
             logger.error(f"Error capturing frame: {e}")
 
+    def display_frame(self, frame, replayed: bool = False):
+        """
+        Convert frame to a QImage once and hand that same image to
+        update_callback and every image listener, each scaling it for
+        itself.
+        """
+        image = self.convert_frame_to_image(frame)
+        with tracer.span("show frame"):
+            if self.update_callback:
+                self.update_callback(image)
+            for listener in self.image_listeners:
+                listener(image, replayed)
+        self.notify_frame(frame)
+
+    def notify_frame(self, frame):
+        for listener in self.frame_listeners:
+            listener(frame)
+
     def pause_recording(self):
         if self.recording:
             self.paused = True
@@ -75,36 +158,20 @@ class VideoRecorder:
     def resume_recording(self):
         if self.recording and self.paused:
             self.paused = False
+            self.counters.last_capture_ns = 0
             self.capture_frame()
             logger.info("Recording resumed.")
 
-    def stop_recording(self):
+    def stop_recording(self, timeout: Optional[float] = None):
+        # A camera reader closes at once, timeout is for the capture
+        # process of ProcessVideoRecorder
         self.recording = False
         if self.reader:
             self.reader.close()
-            self.reader.close()
         logger.info("Recording stopped.")
 
-    def save_replay(self, filename: Optional[str] = None):
-        if not filename:
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            filename = f"replay_{timestamp}.mp4"
-
-        output_path = os.path.join(self.output_dir, filename)
-        try:
-            with imageio.get_writer(output_path, fps=self.fps) as writer:
-                for frame in self.buffer:
-                    writer.append_data(frame)
-            logger.info(f"Replay saved to {output_path}")
-        except Exception as e:
-            logger.error(f"Failed to save replay: {e}")
-
-    def set_buffer_duration(self, duration: int):
-        self.buffer = deque(maxlen=self.fps * duration)
-        logger.info(f"Buffer duration set to {duration} seconds.")
-
     def start_in_app_replay(
-        self, update_callback: Optional[Callable[[QPixmap], None]] = None
+        self, update_callback: Optional[Callable[[QImage], None]] = None
     ):
         if self.recording:
             self.stop_recording()
@@ -112,7 +179,7 @@ class VideoRecorder:
         self.replaying = True
         self.replay_speed = 1.0
         self.replay_index = 0
-        self.replay_frames = list(self.buffer)
+        self.replay_frames = self._replay_frames()
         self.update_callback = update_callback or self.update_callback
 
         if not self.replay_frames:
@@ -124,6 +191,9 @@ class VideoRecorder:
         )
         self.show_replay_frame()
 
+    def _replay_frames(self) -> list:
+        return self.snapshot()[0]
+
     def show_replay_frame(self):
         if not self.replaying and (
             self.replay_index < 0
@@ -131,10 +201,9 @@ class VideoRecorder:
         ):
             return
 
-        frame = self.replay_frames[self.replay_index]
-        pixmap = self.convert_frame_to_pixmap(frame)
-        if self.update_callback:
-            self.update_callback(pixmap)
+        self.display_frame(
+            self.replay_frames[self.replay_index], replayed=True
+        )
 
         if self.replaying:
             self.replay_index += 1
@@ -172,6 +241,17 @@ class VideoRecorder:
         else:
             logger.info("At the first frame of the replay.")
 
+    def seek_replay(self, index: int):
+        """Hold the replay on frame index, clamped to the replay."""
+        if not self.replay_frames:
+            return
+        if self.replaying:
+            self.replaying = False
+            if self.replay_timer:
+                self.replay_timer.stop()
+        self.replay_index = min(max(index, 0), len(self.replay_frames) - 1)
+        self.show_replay_frame()
+
     def set_replay_speed(self, speed: float):
         self.replay_speed = speed
         logger.info(f"Replay speed set to {speed}x.")
@@ -187,16 +267,218 @@ class VideoRecorder:
         if resume_live:
             self.start_recording(self.update_callback)
 
-    def convert_frame_to_pixmap(self, frame) -> QPixmap:
-        mirrored_frame = np.fliplr(frame)
-
-        height, width, channel = mirrored_frame.shape
-        bytes_per_line = channel * width
+    @traced("convert")
+    def convert_frame_to_image(self, frame) -> QImage:
+        """
+        The frame as shown, mirrored, in a QImage of its own: the frame
+        (or ring slot) is read once and may be reused right after.
+        """
+        frame = np.ascontiguousarray(frame)
+        height, width = frame.shape[:2]
         qt_image = QImage(
-            mirrored_frame.data.tobytes(),
+            frame.data,
             width,
             height,
-            bytes_per_line,
+            frame.strides[0],
             QImage.Format.Format_RGB888,
         )
-        return QPixmap.fromImage(qt_image)
+        with tracer.span("mirror copy"):
+            return qt_image.mirrored(True, False)
+
+    def convert_frame_to_pixmap(self, frame) -> QPixmap:
+        image = self.convert_frame_to_image(frame)
+        with tracer.span("to pixmap"):
+            return QPixmap.fromImage(image)
+
+
+class ProcessVideoRecorder(VideoRecorder):
+    """
+    A VideoRecorder capturing and buffering in a CaptureProcess, so the
+    camera reads on its own core and a busy GUI thread only skips frames
+    on screen, never in the buffer. The buffer is the process's FrameRing:
+    frames are shown and replayed from shared memory in place, and copied
+    out only to be saved. The ring is sized by buffer_planner (the memory
+    governor) once the camera's frame size is known, and resizes move the
+    capture to a new ring. The live view is read from the ring, so frames
+    are kept at full size and the governor caps the duration instead.
+    """
+
+    frame_scales = (1,)
+
+    # Polls of the ring per frame period, so a frame waits at most half a
+    # period to be shown
+    POLLS_PER_FRAME = 2
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shown_sequence = -1
+        # Called with the requested buffer duration once the camera is
+        # open, before the ring is allocated; returns the BufferPlan to
+        # size it for (e.g. MemoryGovernor.preview)
+        self.buffer_planner = None
+        # Copies frames out of the ring for saves, off the GUI thread
+        self.copy_executor = None
+        self.ring_copy = None
+
+    def _open_reader(self):
+        capture = CaptureProcess(
+            self.fps,
+            self.buffer_duration,
+            self.output_dir,
+            self.camera_config,
+            self.reader_factory,
+        )
+        capture.open()
+        # The capture process logged any mismatch
+        self.capture_mode = capture.capture_mode
+        self.capture_mismatches = capture.capture_mismatches
+        duration = self.buffer_duration
+        if self.buffer_planner is not None:
+            try:
+                duration = self.buffer_planner(duration).duration
+            except Exception:
+                capture.close()
+                raise
+        capture.allocate(self.fps * duration)
+        return capture
+
+    def _on_reader_opened(self, capture, error):
+        if capture is not None and self.recording:
+            with self.buffer_lock:
+                self.buffer = capture.ring
+        super()._on_reader_opened(capture, error)
+
+    def start_recording(
+        self,
+        update_callback: Callable[[QImage], None],
+        background: bool = False,
+        ready_callback: Optional[Callable[[bool], None]] = None,
+    ):
+        if self.reader is None:
+            super().start_recording(
+                update_callback, background, ready_callback
+            )
+            return
+        # Back from an in-app replay, the process is waiting paused
+        self.recording = True
+        self.paused = True
+        self.update_callback = update_callback
+        self.resume_recording()
+        if ready_callback:
+            ready_callback(True)
+
+    def capture_frame(self):
+        if not self.recording or self.paused:
+            return
+        capture = self.reader
+        error = capture.error()
+        if error is not None:
+            logger.error(f"Error capturing frame: {error}")
+            self.recording = False
+            return
+        ring = capture.ring
+        latest = ring.latest()
+        if latest is not None and latest[0] != self.shown_sequence:
+            sequence, captured_ns, frame = latest
+            self.shown_sequence = sequence
+            counters = self.counters
+            counters.captured = ring.written
+            counters.dropped = ring.dropped
+            counters.last_capture_ns = captured_ns
+            # Scoreboard states are numbered like the ring's frames
+            self.frames_buffered = ring.written
+            try:
+                self.display_frame(frame)
+            except Exception as e:
+                logger.error(f"Error showing frame: {e}")
+        QTimer.singleShot(
+            int(1000 / (self.fps * self.POLLS_PER_FRAME)), self.capture_frame
+        )
+
+    def pause_recording(self):
+        if self.recording and not self.paused and self.reader is not None:
+            self.reader.pause()
+        super().pause_recording()
+
+    def resume_recording(self):
+        if self.recording and self.paused and self.reader is not None:
+            self.reader.resume()
+        super().resume_recording()
+
+    def stop_recording(self, timeout: float = STOP_TIMEOUT) -> bool:
+        """
+        Stop the capture process within timeout seconds, returning False
+        if it had to be terminated.
+        """
+        self._wait_for_ring_copy()
+        with self.buffer_lock:
+            self.buffer = deque(maxlen=self.fps * self.buffer_duration)
+        capture, self.reader = self.reader, None
+        stopped = capture.close(timeout) if capture is not None else True
+        super().stop_recording()
+        return stopped
+
+    def start_in_app_replay(
+        self, update_callback: Optional[Callable[[QImage], None]] = None
+    ):
+        if self.recording and self.reader is not None:
+            # Only pause capture: the replay plays from the ring
+            self.recording = False
+            self.reader.pause()
+        super().start_in_app_replay(update_callback)
+
+    def _replay_frames(self) -> list:
+        if self.reader is None:
+            return super()._replay_frames()
+        # Capture is paused until the replay ends, nothing overwrites them
+        return self.reader.ring.views()[0]
+
+    def snapshot(self):
+        if self.reader is None:
+            return super().snapshot()
+        # Copying the whole ring would stall the GUI thread: it only
+        # notes the frames, the copy thread copies them out at once (the
+        # ring's spare slots cover the copy) and the encoder reads them
+        ring = self.reader.ring
+        span = ring.span()
+        if self.copy_executor is None:
+            self.copy_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="ring-copy"
+            )
+        self.ring_copy = self.copy_executor.submit(ring.copy_frames, span)
+        return RingCopy(self.ring_copy, len(span)), span.start
+
+    def _wait_for_ring_copy(self):
+        # The ring must stay open until the frames are out
+        if self.ring_copy is not None:
+            wait([self.ring_copy])
+            self.ring_copy = None
+
+    def set_buffer_duration(self, duration: int):
+        if self.reader is None:
+            super().set_buffer_duration(duration)
+            return
+        capture = self.reader
+        frames = self.fps * duration
+        if frames != capture.ring.capacity:
+            # Frames being copied out for a save must not move under it
+            self._wait_for_ring_copy()
+            try:
+                ring = capture.resize(frames)
+            except RuntimeError as e:
+                logger.error(f"Could not resize the capture buffer: {e}")
+                return
+            with self.buffer_lock:
+                self.buffer = ring
+        self.buffer_duration = duration
+        logger.info(
+            f"Buffer duration set to {duration} seconds "
+            f"({len(capture.ring)} frames kept)."
+        )
+
+    def set_frame_scale(self, scale: int):
+        if scale != 1:
+            logger.warning(
+                "The capture process buffers full size frames, replay "
+                "frames are not downscaled."
+            )
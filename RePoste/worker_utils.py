@@ -0,0 +1,75 @@
+"""
+Helpers shared by the background workers (scoreboard, remote control,
+benchmarks). Kept free of Qt and bleak so any of them can import it.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import suppress
+
+logger = logging.getLogger("reposte.workers")
+
+LATENCY_SAMPLES = 1000
+
+
+class LatencyStats:
+    """
+    Rolling window of scoreboard update latencies, in seconds.
+
+    In notify mode a sample is the time from the notification arriving to
+    the update's signals being emitted. In poll mode the change happened
+    at some point after the previous read was issued, so a sample is the
+    time from that read to the emit (the worst case staleness of the
+    update).
+    """
+
+    def __init__(self, maxlen: int = LATENCY_SAMPLES):
+        self.samples = deque(maxlen=maxlen)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def clear(self):
+        self.samples.clear()
+
+    def mean(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(self.samples) / len(self.samples)
+
+    def p99(self) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+async def bounded(coro, description: str, timeout: float):
+    """Await a teardown step, giving up on it after timeout seconds."""
+    try:
+        await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Gave up disconnecting {description} after {timeout} s"
+        )
+    except Exception as e:
+        logger.warning(f"Error disconnecting {description}: {e}")
+
+
+def cancel_task(loop, task):
+    """Cancel an asyncio task from another thread, if it is still running."""
+    if loop is None or task is None:
+        return
+    with suppress(RuntimeError):  # The loop closed in the meantime
+        loop.call_soon_threadsafe(task.cancel)
+
+
+def join_thread(thread, timeout: float, name: str) -> bool:
+    if thread is None:
+        return True
+    thread.join(timeout)
+    if thread.is_alive():
+        logger.warning(f"{name} did not stop within {timeout} s")
+        return False
+    return True
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from RePoste.gui import AudienceWindow
+from RePoste.video_manager import VideoRecorder
+from scoreboard_manager import ScoreboardManager
+
+
+@pytest.fixture(scope="module", autouse=True)
+def qapplication():
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    recorder = VideoRecorder(
+        fps=30, buffer_duration=1, output_dir=str(tmp_path), camera_config={}
+    )
+    recorder.buffer.extend(np.zeros((4, 8, 3), np.uint8) for _ in range(3))
+    return recorder
+
+
+def test_frame_is_converted_once_for_both_windows(recorder):
+    # Arrange
+    conversions = []
+    convert = recorder.convert_frame_to_image
+
+    def counting_convert(frame):
+        conversions.append(frame)
+        return convert(frame)
+
+    recorder.convert_frame_to_image = counting_convert
+    operator = []
+    recorder.update_callback = operator.append
+    audience = AudienceWindow(None)
+    recorder.image_listeners.append(audience.show_image)
+
+    # Act
+    recorder.start_in_app_replay()
+    recorder.stop_in_app_replay()
+
+    # Assert
+    assert len(conversions) == 1, "❌ One conversion per frame shown"
+    assert audience.video_view.image is operator[0], "❌ The image is shared"
+
+
+def test_converted_image_is_mirrored_and_owns_its_pixels(recorder):
+    # Arrange, red on the left
+    frame = np.zeros((4, 8, 3), np.uint8)
+    frame[:, :4] = (255, 0, 0)
+
+    # Act
+    image = recorder.convert_frame_to_image(frame)
+    frame[:] = 0
+
+    # Assert
+    assert image.pixelColor(6, 1).red() == 255, "❌ Mirrored as shown"
+    assert image.pixelColor(1, 1).red() == 0
+
+
+def test_replay_only_mode_leaves_out_live_frames(recorder):
+    # Arrange
+    audience = AudienceWindow(None, replay_only=True)
+    audience.show()
+    live = recorder.convert_frame_to_image(recorder.buffer[0])
+    replayed = recorder.convert_frame_to_image(recorder.buffer[1])
+
+    # Act
+    audience.show_image(live, replayed=False)
+    hidden_for_live = audience.video_view.isHidden()
+    audience.show_image(replayed, replayed=True)
+
+    # Assert
+    assert hidden_for_live, "❌ The scoreboard fills in between replays"
+    assert not audience.video_view.isHidden()
+    assert audience.video_view.image is replayed
+    audience.close()
+
+
+def test_window_opened_mid_bout_shows_the_current_scoreboard():
+    # Arrange, a connected manager that already published a state
+    manager = ScoreboardManager()
+    manager.client = object()
+    manager._notification_handler(0, b"06125602140A38")
+    state = manager.current_state
+
+    # Act
+    audience = AudienceWindow(manager)
+    scoreboard = audience.scoreboard
+
+    # Assert
+    assert scoreboard.left_score_label.text() == str(
+        state.left_score
+    ), "❌ The score should be shown before the next change"
+    assert scoreboard.right_score_label.text() == str(state.right_score)
+    assert (
+        scoreboard.timer_label.text() == f"{state.minutes}:{state.seconds:02}"
+    )
+    assert scoreboard.status_label.isHidden(), "❌ The session is already up"
+    audience.close()
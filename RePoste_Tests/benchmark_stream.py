@@ -0,0 +1,201 @@
+"""
+MJPEG stream benchmark: the station's CPU use (encoder, server and frame
+publishing, all in this process) against the number of viewers, with the
+viewers reading in a separate process. Frames of a SyntheticReader are
+published at the capture fps, as the GUI would.
+
+Run from the repository root:
+    python RePoste_Tests/benchmark_stream.py [--clients 0 1 4 16]
+        [--rendition small] [--resolution 1080p] [--output results.json]
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import selectors
+import socket
+import sys
+import time
+
+REPOSTE_DIR = os.path.join(os.path.dirname(__file__), "..", "RePoste")
+sys.path.insert(0, os.path.abspath(REPOSTE_DIR))
+
+from benchmark_video import RESULTS_DIR, machine_info  # noqa: E402
+from mjpeg_stream import (  # noqa: E402
+    BOUNDARY,
+    RENDITIONS,
+    MjpegBroadcaster,
+)
+from remote_control import RemoteControlServer  # noqa: E402
+from synthetic_camera import RESOLUTIONS, SyntheticReader  # noqa: E402
+
+FPS = 30
+SECONDS = 3.0
+CLIENTS = (0, 1, 2, 4, 8, 16)
+MARKER = f"--{BOUNDARY}".encode()
+
+
+def read_viewers(port, rendition, clients, stop, results):
+    """
+    Viewer process: reads clients streams until stop is set, then puts
+    the frames each received and the total bytes on results.
+    """
+    selector = selectors.DefaultSelector()
+    for index in range(clients):
+        sock = socket.create_connection(("127.0.0.1", port))
+        sock.sendall(f"GET /stream/{rendition} HTTP/1.1\r\n\r\n".encode())
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ, index)
+    frames = [0] * clients
+    # The end of the last chunk, for markers split across chunks
+    tails = [b""] * clients
+    keep = len(MARKER) - 1
+    received = 0
+    while not stop.is_set():
+        for key, _ in selector.select(0.05):
+            chunk = key.fileobj.recv(1 << 16)
+            if not chunk:
+                selector.unregister(key.fileobj)
+                continue
+            received += len(chunk)
+            data = tails[key.data] + chunk
+            frames[key.data] += data.count(MARKER)
+            tails[key.data] = data[-keep:]
+    for key in list(selector.get_map().values()):
+        key.fileobj.close()
+    results.put({"frames": frames, "bytes": received})
+
+
+def bench_clients(
+    clients: int, rendition: str, frames: list, seconds: float = SECONDS
+) -> dict:
+    stream = MjpegBroadcaster()
+    server = RemoteControlServer({}, stream=stream)
+    port = server.start()
+    context = multiprocessing.get_context("spawn")
+    stop, results = context.Event(), context.Queue()
+    viewers = context.Process(
+        target=read_viewers, args=(port, rendition, clients, stop, results)
+    )
+    viewers.start()
+    try:
+        while sum(map(len, stream.viewers.values())) < clients:
+            time.sleep(0.01)
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        published = 0
+        while time.perf_counter() - started < seconds:
+            stream.publish(frames[published % len(frames)])
+            published += 1
+            # Paced like a camera at FPS
+            delay = started + published / FPS - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        stop.set()
+        received = results.get(timeout=10)
+    finally:
+        stop.set()
+        viewers.join(5)
+        server.stop()
+    stats = stream.stats()["renditions"][rendition]
+    per_viewer = [count / elapsed for count in received["frames"]]
+    return {
+        "clients": clients,
+        "cpu_percent": cpu / elapsed * 100,
+        "published_fps": published / elapsed,
+        "encoded_fps": stats["encoded"] / elapsed,
+        "encode_ms": stats["encode_ms"],
+        "viewer_fps_min": min(per_viewer) if per_viewer else None,
+        "viewer_fps_avg": (
+            sum(per_viewer) / len(per_viewer) if per_viewer else None
+        ),
+        "skipped_frames": stream.skipped,
+        "sent_mb_per_s": received["bytes"] / elapsed / 1e6,
+    }
+
+
+def run(
+    clients=CLIENTS,
+    rendition: str = "small",
+    resolution: str = "1080p",
+    seconds: float = SECONDS,
+) -> dict:
+    reader = SyntheticReader(RESOLUTIONS[resolution], realtime=False)
+    frames = [reader.get_next_data() for _ in range(FPS)]
+    results = [
+        bench_clients(count, rendition, frames, seconds) for count in clients
+    ]
+    return {
+        "machine": machine_info(),
+        "rendition": rendition,
+        "resolution": resolution,
+        "fps": FPS,
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="RePoste stream benchmark")
+    parser.add_argument(
+        "--clients", nargs="+", type=int, default=list(CLIENTS)
+    )
+    parser.add_argument(
+        "--rendition", choices=list(RENDITIONS), default="small"
+    )
+    parser.add_argument(
+        "--resolution", choices=list(RESOLUTIONS), default="1080p"
+    )
+    parser.add_argument("--seconds", type=float, default=SECONDS)
+    parser.add_argument(
+        "--output",
+        help=f"JSON file to write, by default in {RESULTS_DIR}/ named "
+        "after the commit and host",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.disable(logging.INFO)
+    try:
+        report = run(
+            args.clients, args.rendition, args.resolution, args.seconds
+        )
+    finally:
+        logging.disable(logging.NOTSET)
+    output = args.output
+    if not output:
+        machine = report["machine"]
+        output = os.path.join(
+            RESULTS_DIR,
+            f"stream_{machine['commit'] or 'unknown'}_{machine['host']}.json",
+        )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=4)
+
+    print(
+        f"{report['rendition']} stream of {report['resolution']} at "
+        f"{report['fps']} fps"
+    )
+    print(
+        f"{'clients':>8} {'cpu %':>8} {'encoded fps':>12} "
+        f"{'viewer fps min':>15} {'MB/s':>8}"
+    )
+    for result in report["results"]:
+        viewer_fps = result["viewer_fps_min"]
+        print(
+            f"{result['clients']:>8} {result['cpu_percent']:>8.1f} "
+            f"{result['encoded_fps']:>12.1f} "
+            f"{'-' if viewer_fps is None else f'{viewer_fps:.1f}':>15} "
+            f"{result['sent_mb_per_s']:>8.2f}"
+        )
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
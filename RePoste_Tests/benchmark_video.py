@@ -0,0 +1,323 @@
+"""
+End-to-end video benchmarks on a SyntheticReader: sustained capture fps,
+capture-to-paint latency, convert_frame_to_pixmap cost, save_replay
+throughput, replay step latency and buffer bytes per second, at 480p,
+720p, 1080p and 4K. Results are written to JSON so runs can be compared
+across commits and machines.
+
+Run from the repository root:
+    python RePoste_Tests/benchmark_video.py [--resolutions 480p 1080p]
+        [--source clip.mp4] [--output results.json]
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+REPOSTE_DIR = os.path.join(os.path.dirname(__file__), "..", "RePoste")
+sys.path.insert(0, os.path.abspath(REPOSTE_DIR))
+
+from worker_utils import LatencyStats  # noqa: E402
+from synthetic_camera import RESOLUTIONS, SyntheticReader  # noqa: E402
+from video_manager import VideoRecorder  # noqa: E402
+
+FPS = 60
+CAPTURE_SECONDS = 3.0
+SAVE_SECONDS = 1.0
+REPLAY_STEPS = 60
+# Size of the live view, the frames are scaled to it as in MainWindow
+VIEW_SIZE = (960, 540)
+RESULTS_DIR = "benchmark_results"
+
+
+_app = None
+
+
+def qt_app():
+    """The QApplication, created once and kept alive between benchmarks."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    _app = QApplication.instance() or QApplication([])
+    return _app
+
+
+def video_view():
+    """A shown QLabel standing in for MainWindow.video_feed."""
+    from PyQt6.QtWidgets import QLabel
+
+    label = QLabel()
+    label.resize(*VIEW_SIZE)
+    label.show()
+    return label
+
+
+def show_image(label, image):
+    """Show the recorder's QImage in label, as MainWindow.update_frame."""
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QPixmap
+
+    label.setPixmap(
+        QPixmap.fromImage(
+            image.scaled(label.size(), Qt.AspectRatioMode.KeepAspectRatio)
+        )
+    )
+
+
+def best_ms(func, number: int, repeat: int = 5) -> float:
+    """Best of repeat runs, in milliseconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best * 1000
+
+
+def bench_capture(reader_factory, seconds: float = CAPTURE_SECONDS) -> dict:
+    """
+    Run the recorder's capture loop on the synthetic camera for seconds.
+    Latency runs from the reader handing out a frame to the paint of the
+    view showing it; paints coalesce, so a sample is taken from the oldest
+    frame not yet painted.
+    """
+    from PyQt6.QtCore import QEvent, QObject
+
+    class PaintProbe(QObject):
+        def __init__(self):
+            super().__init__()
+            self.oldest_unpainted = None
+            self.latency = LatencyStats(maxlen=None)
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and self.oldest_unpainted:
+                self.latency.add(time.perf_counter() - self.oldest_unpainted)
+                self.oldest_unpainted = None
+            return False
+
+    app = qt_app()
+    label = video_view()
+    probe = PaintProbe()
+    label.installEventFilter(probe)
+    readers = []
+
+    def open_reader():
+        readers.append(reader_factory())
+        return readers[-1]
+
+    def on_frame(image):
+        if probe.oldest_unpainted is None:
+            probe.oldest_unpainted = readers[0].captured_at
+        show_image(label, image)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        recorder = VideoRecorder(
+            fps=FPS,
+            buffer_duration=1,
+            output_dir=output_dir,
+            camera_config={},
+            reader_factory=open_reader,
+        )
+        started = time.perf_counter()
+        recorder.start_recording(on_frame)
+        while time.perf_counter() - started < seconds:
+            app.processEvents()
+        recorder.stop_recording()
+        elapsed = time.perf_counter() - started
+    label.close()
+
+    frame_bytes = recorder.buffer_stats()["frame_bytes"]
+    return {
+        "capture_fps": readers[0].frame_count / elapsed,
+        "target_fps": FPS,
+        "capture_to_paint_avg_ms": probe.latency.mean() * 1000,
+        "capture_to_paint_p99_ms": probe.latency.p99() * 1000,
+        "paints": len(probe.latency.samples),
+        "buffer_bytes_per_second": frame_bytes * FPS,
+    }
+
+
+def bench_convert(frame) -> dict:
+    qt_app()
+    recorder = VideoRecorder(
+        output_dir=tempfile.gettempdir(), camera_config={}
+    )
+    return {
+        "convert_frame_to_pixmap_ms": best_ms(
+            lambda: recorder.convert_frame_to_pixmap(frame), number=10
+        )
+    }
+
+
+def bench_save(frames) -> dict:
+    """Encode frames with save_replay, as the Space key does."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        recorder = VideoRecorder(
+            fps=FPS, output_dir=output_dir, camera_config={}
+        )
+        recorder.buffer.extend(frames)
+        started = time.perf_counter()
+        recorder.save_replay("benchmark.mp4")
+        elapsed = time.perf_counter() - started
+        path = os.path.join(output_dir, "benchmark.mp4")
+        if not os.path.exists(path):
+            return {"save_error": "replay was not written, see the log"}
+        return {
+            "save_seconds": elapsed,
+            "save_fps": len(frames) / elapsed,
+            "save_mb_per_s": sum(f.nbytes for f in frames) / elapsed / 1e6,
+            "replay_file_bytes": os.path.getsize(path),
+        }
+
+
+def bench_replay_step(frames, steps: int = REPLAY_STEPS) -> dict:
+    """Time from a frame step (Left/Right key) to the frame painted."""
+    qt_app()
+    label = video_view()
+    recorder = VideoRecorder(
+        output_dir=tempfile.gettempdir(), camera_config={}
+    )
+    recorder.replay_frames = list(frames)
+    recorder.update_callback = lambda image: show_image(label, image)
+    latency = LatencyStats(maxlen=None)
+    for _ in range(steps):
+        if recorder.replay_index >= len(frames) - 1:
+            recorder.replay_index = 0
+        started = time.perf_counter()
+        recorder.show_next_frame()
+        label.repaint()
+        latency.add(time.perf_counter() - started)
+    label.close()
+    return {
+        "replay_step_avg_ms": latency.mean() * 1000,
+        "replay_step_p99_ms": latency.p99() * 1000,
+    }
+
+
+def run_resolution(
+    size,
+    source=None,
+    capture_seconds: float = CAPTURE_SECONDS,
+    save_seconds: float = SAVE_SECONDS,
+) -> dict:
+    def reader_factory():
+        return SyntheticReader(size, fps=FPS, source=source)
+
+    results = bench_capture(reader_factory, capture_seconds)
+    # Generated after the capture run so both never hold frames at once
+    frames_reader = SyntheticReader(size, realtime=False, source=source)
+    frames = [
+        frames_reader.get_next_data() for _ in range(int(FPS * save_seconds))
+    ]
+    results["size"] = list(frames_reader.size)
+    results.update(bench_convert(frames[0]))
+    results.update(bench_replay_step(frames))
+    results.update(bench_save(frames))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def machine_info() -> dict:
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "qt_platform": os.environ.get("QT_QPA_PLATFORM", ""),
+    }
+
+
+def run(
+    resolutions=tuple(RESOLUTIONS),
+    source=None,
+    capture_seconds: float = CAPTURE_SECONDS,
+    save_seconds: float = SAVE_SECONDS,
+) -> dict:
+    results = {}
+    for name in resolutions:
+        results[name] = run_resolution(
+            RESOLUTIONS[name], source, capture_seconds, save_seconds
+        )
+    return {"machine": machine_info(), "results": results}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="RePoste video benchmarks")
+    parser.add_argument(
+        "--resolutions",
+        nargs="+",
+        choices=list(RESOLUTIONS),
+        default=list(RESOLUTIONS),
+    )
+    parser.add_argument(
+        "--source", help="loop a local video file instead of a pattern"
+    )
+    parser.add_argument(
+        "--capture-seconds", type=float, default=CAPTURE_SECONDS
+    )
+    parser.add_argument("--save-seconds", type=float, default=SAVE_SECONDS)
+    parser.add_argument(
+        "--output",
+        help=f"JSON file to write, by default in {RESULTS_DIR}/ named "
+        "after the commit and host",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Per-frame INFO logging would dominate the timings
+    logging.disable(logging.INFO)
+    try:
+        report = run(
+            args.resolutions,
+            args.source,
+            args.capture_seconds,
+            args.save_seconds,
+        )
+    finally:
+        logging.disable(logging.NOTSET)
+    output = args.output
+    if not output:
+        machine = report["machine"]
+        output = os.path.join(
+            RESULTS_DIR,
+            f"video_{machine['commit'] or 'unknown'}_{machine['host']}.json",
+        )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=4)
+
+    for name, result in report["results"].items():
+        print(f"{name}:")
+        for key, value in result.items():
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            print(f"  {key:>28}: {value}")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
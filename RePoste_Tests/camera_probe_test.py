@@ -0,0 +1,138 @@
+import os
+
+from Config_Generator.camera_probe import (
+    CameraMode,
+    best_mode,
+    discover_cameras,
+    list_v4l2_cameras,
+    parse_dshow_devices,
+    parse_dshow_options,
+    parse_v4l2_ctl_formats,
+)
+
+V4L2_CTL_OUTPUT = """ioctl: VIDIOC_ENUM_FMT
+\tType: Video Capture
+
+\t[0]: 'MJPG' (Motion-JPEG, compressed)
+\t\tSize: Discrete 1920x1080
+\t\t\tInterval: Discrete 0.033s (30.000 fps)
+\t\tSize: Discrete 1280x720
+\t\t\tInterval: Discrete 0.017s (60.000 fps)
+\t\t\tInterval: Discrete 0.033s (30.000 fps)
+\t[1]: 'YUYV' (YUYV 4:2:2)
+\t\tSize: Discrete 1280x720
+\t\t\tInterval: Discrete 0.100s (10.000 fps)
+\t\tSize: Discrete 640x480
+\t\t\tInterval: Discrete 0.033s (30.000 fps)
+"""
+
+DSHOW_OUTPUT = """[dshow @ 0000] "USB2.0 HD UVC WebCam" (video)
+[dshow @ 0000]   Alternative name "@device_pnp_\\\\?\\usb#vid_13d3"
+[dshow @ 0000] "Microphone (Realtek Audio)" (audio)
+[dshow @ 0000]   Alternative name "@device_cm_{33D9A762}"
+"""
+
+DSHOW_OPTIONS = """[dshow @ 0000] DirectShow video device options
+[dshow @ 0000]  Pin "Capture" (alternative pin name "0")
+[dshow @ 0000]   vcodec=mjpeg  min s=1280x720 fps=30 max s=1280x720 fps=60
+[dshow @ 0000]   pixel_format=yuyv422  min s=640x480 fps=5 max s=640x480 fps=30
+"""
+
+
+def test_parse_v4l2_ctl_formats():
+    # Act
+    modes = parse_v4l2_ctl_formats(V4L2_CTL_OUTPUT)
+
+    # Assert
+    assert CameraMode("mjpeg", 1280, 720, 60.0) in modes
+    assert CameraMode("yuyv422", 640, 480, 30.0) in modes
+    assert len(modes) == 5, "❌ Every size and interval should be a mode"
+    assert best_mode(modes) == CameraMode(
+        "mjpeg", 1280, 720, 60.0
+    ), "❌ The largest mode reaching 60 fps should be picked"
+
+
+def test_best_mode_falls_back_to_fastest():
+    # Arrange
+    modes = [
+        CameraMode("yuyv422", 1920, 1080, 5.0),
+        CameraMode("mjpeg", 640, 480, 30.0),
+    ]
+
+    # Act / Assert
+    assert best_mode(modes) == CameraMode("mjpeg", 640, 480, 30.0)
+    assert best_mode([]) is None
+
+
+def test_parse_dshow_devices_and_options():
+    # Act
+    cameras = parse_dshow_devices(DSHOW_OUTPUT)
+    modes = parse_dshow_options(DSHOW_OPTIONS)
+
+    # Assert
+    assert [camera["name"] for camera in cameras] == ["USB2.0 HD UVC WebCam"]
+    assert cameras[0]["camera_path"].startswith("@device_pnp_")
+    assert modes[0] == CameraMode("mjpeg", 1280, 720, 60.0)
+    assert CameraMode("yuyv422", 640, 480, 30.0) in modes
+
+
+def make_video_node(root, name, label, index, usb_dir):
+    node = root / "class" / name
+    node.mkdir(parents=True)
+    (node / "name").write_text(label + "\n")
+    (node / "index").write_text(f"{index}\n")
+    os.symlink(usb_dir / "1-2:1.0", node / "device")
+
+
+def test_list_v4l2_cameras_skips_metadata_nodes(tmp_path):
+    # Arrange
+    usb_dir = tmp_path / "devices" / "usb1" / "1-2"
+    (usb_dir / "1-2:1.0").mkdir(parents=True)
+    (usb_dir / "idVendor").write_text("046d\n")
+    (usb_dir / "idProduct").write_text("0825\n")
+    (usb_dir / "serial").write_text("ABC123\n")
+    make_video_node(tmp_path, "video0", "HD Webcam", 0, usb_dir)
+    make_video_node(tmp_path, "video1", "HD Webcam", 1, usb_dir)
+
+    # Act
+    cameras = list_v4l2_cameras(str(tmp_path / "class"))
+
+    # Assert
+    assert cameras == [
+        {
+            "name": "HD Webcam",
+            "camera_path": "/dev/video0",
+            "identity": "usb:046d:0825:ABC123",
+        }
+    ]
+
+
+def test_discover_cameras_probes_each_device_once(tmp_path, monkeypatch):
+    # Arrange
+    import Config_Generator.camera_probe as camera_probe
+
+    probes = []
+    monkeypatch.setattr(
+        camera_probe,
+        "list_cameras",
+        lambda: [
+            {"name": "Cam", "camera_path": "/dev/video0", "identity": "x"}
+        ],
+    )
+    monkeypatch.setattr(
+        camera_probe,
+        "probe_modes",
+        lambda camera: probes.append(camera)
+        or [CameraMode("mjpeg", 1920, 1080, 60.0)],
+    )
+    cache_file = str(tmp_path / "cache.json")
+
+    # Act
+    first = discover_cameras(cache_file)
+    second = discover_cameras(cache_file)
+    discover_cameras(cache_file, refresh=True)
+
+    # Assert
+    assert len(probes) == 2, "❌ Cached cameras should not be probed again"
+    assert first[0]["best_mode"] == second[0]["best_mode"]
+    assert second[0]["best_mode"] == CameraMode("mjpeg", 1920, 1080, 60.0)
@@ -1,9 +1,10 @@
 import pytest
-from unittest.mock import MagicMock
-from PyQt6.QtGui import QPixmap, QKeyEvent
+from unittest.mock import MagicMock, patch
+from PyQt6.QtGui import QImage, QPixmap, QKeyEvent
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QApplication
-from RePoste.gui import MainWindow
+from RePoste.gui import MainWindow, ScoreboardWidget
+from scoreboard_manager import ScoreboardManager
 
 
 # Create QApplication
@@ -134,3 +135,54 @@ def test_keyPressEvent_setReplaySpeed(key, expected_speed):
 
     # Assert
     window.recorder.set_replay_speed.assert_called_once_with(expected_speed)
+
+
+def test_scoreboard_widget_applies_only_changed_fields(create_app):
+    # Arrange
+    manager = ScoreboardManager()
+    widget = ScoreboardWidget(manager)
+    manager._notification_handler(0, b"06125602140A38")
+    widget.left_score_label.setText = MagicMock()
+    widget.left_red_flag.update = MagicMock()
+
+    # Act (a clock tick, then a lamp change)
+    manager._notification_handler(0, b"06125502140A38")
+    manager._notification_handler(0, b"06125502000A38")
+
+    # Assert
+    assert widget.timer_label.text() == "2:55", "❌ Clock should update"
+    widget.left_score_label.setText.assert_not_called()
+    widget.left_red_flag.update.assert_not_called()
+    assert widget.left_hit_indicator.color is None, "❌ Lamp should be off"
+
+
+@pytest.fixture
+def window_without_camera(create_app):
+    # Opening the camera would log from its thread after the test
+    with patch("RePoste.gui.VideoRecorder.start_recording"):
+        window = MainWindow(None)
+    yield window
+    window.shutdown()
+
+
+def test_shutdown_without_scoreboard(window_without_camera):
+    # Act
+    report = window_without_camera.shutdown()
+
+    # Assert
+    assert report.ok, "❌ Shutdown should finish within its budgets"
+    assert (
+        "scoreboard" not in report.elapsed
+    ), "❌ No scoreboard step without a scoreboard manager"
+
+
+def test_update_frame_skips_null_image(window_without_camera):
+    # Arrange
+    window = window_without_camera
+    window.video_feed.show_frame = MagicMock()
+
+    # Act
+    window.update_frame(QImage())
+
+    # Assert
+    window.video_feed.show_frame.assert_not_called()
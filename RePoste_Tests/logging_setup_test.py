@@ -0,0 +1,140 @@
+import logging
+import logging.handlers
+
+import pytest
+
+from RePoste.logging_setup import (
+    RepeatSuppressor,
+    parse_level_overrides,
+    setup_logging,
+)
+
+
+def make_record(message, name="reposte.scoreboard"):
+    return logging.makeLogRecord(
+        {"name": name, "levelno": logging.INFO, "msg": message}
+    )
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+    logging.getLogger("reposte.scoreboard.data").setLevel(logging.NOTSET)
+    logging.getLogger("reposte.video").setLevel(logging.NOTSET)
+
+
+def test_suppressor_collapses_identical_messages():
+    # Arrange
+    suppressor = RepeatSuppressor(interval=10.0, clock=lambda: 0.0)
+    messages = ["payload 06"] * 4 + ["connected"]
+
+    # Act
+    written = [
+        record.getMessage()
+        for message in messages
+        for record in suppressor.process(make_record(message))
+    ]
+
+    # Assert
+    assert written == [
+        "payload 06",
+        "connected",
+    ], "❌ Repeats should be dropped"
+    assert [record.getMessage() for record in suppressor.flush()] == [
+        "3 identical messages suppressed: payload 06"
+    ], "❌ A run of repeats should be summarised once"
+    assert suppressor.flush() == []
+
+
+def test_suppressor_collapses_interleaved_repeats():
+    # Arrange, two threads logging in turn
+    now = [0.0]
+    suppressor = RepeatSuppressor(interval=10.0, clock=lambda: now[0])
+    messages = ["payload 06", "frame dropped"] * 5
+
+    # Act
+    written = [
+        record.getMessage()
+        for message in messages
+        for record in suppressor.process(make_record(message))
+    ]
+    now[0] = 11.0
+    after_window = [
+        record.getMessage()
+        for record in suppressor.process(make_record("connected"))
+    ]
+
+    # Assert
+    assert written == [
+        "payload 06",
+        "frame dropped",
+    ], "❌ Repeats should be dropped with other messages in between"
+    assert after_window == [
+        "4 identical messages suppressed: payload 06",
+        "4 identical messages suppressed: frame dropped",
+        "connected",
+    ], "❌ Each message should be summarised when its window ends"
+
+
+def test_suppressor_summarises_long_runs():
+    # Arrange
+    now = [0.0]
+    suppressor = RepeatSuppressor(interval=10.0, clock=lambda: now[0])
+    suppressor.process(make_record("payload 06"))
+
+    # Act
+    counts = []
+    for second in range(1, 25):
+        now[0] = float(second)
+        counts.append(len(suppressor.process(make_record("payload 06"))))
+
+    # Assert
+    assert sum(counts) == 2, "❌ A long run is summarised every interval"
+    assert suppressor.flush()[0].getMessage().startswith("4 identical")
+
+
+def test_setup_logging_writes_file_through_queue(tmp_path, restore_logging):
+    # Arrange
+    log_file = tmp_path / "logs" / "reposte.log"
+    listener = setup_logging(
+        log_file=str(log_file),
+        levels={"reposte.video": logging.WARNING},
+        console=False,
+    )
+    root = logging.getLogger()
+
+    # Act
+    for _ in range(50):
+        logging.getLogger("reposte.scoreboard").info("Parsed data: 0:00")
+    logging.getLogger("reposte.video").info("Recording started.")
+    logging.getLogger("reposte.scoreboard.data").debug("Raw value")
+    listener.stop()
+
+    # Assert
+    assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 2, "❌ Repeats should be collapsed"
+    assert lines[0].endswith("reposte.scoreboard - Parsed data: 0:00")
+    assert "49 identical messages suppressed" in lines[1]
+
+
+def test_parse_level_overrides():
+    # Act
+    levels = parse_level_overrides(
+        ["scoreboard.data=debug", "reposte.video=WARNING"]
+    )
+
+    # Assert
+    assert levels == {
+        "reposte.scoreboard.data": logging.DEBUG,
+        "reposte.video": logging.WARNING,
+    }
+    with pytest.raises(ValueError):
+        parse_level_overrides(["scoreboard=LOUD"])
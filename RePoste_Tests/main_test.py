@@ -9,16 +9,17 @@ from RePoste.main import main
 def mock_app_and_window():
     with (
         patch("PyQt6.QtWidgets.QApplication") as mock_app,
-        patch("RePoste.gui.MainWindow") as mock_main_window,
-        patch(
-            "RePoste.scoreboard_manager.ScoreboardManager"
-        ) as mock_scoreboard_mgr,
+        # main imports the flat modules, as when run from RePoste/
+        patch("gui.MainWindow") as mock_main_window,
+        patch("scoreboard_manager.ScoreboardManager") as mock_scoreboard_mgr,
+        patch("RePoste.main.setup_logging"),
     ):
         # Mock QApplication, MainWindow, and ScoreboardManager classes
         mock_app_instance = MagicMock(spec=QApplication)
         mock_window_instance = MagicMock(spec=MainWindow)
         mock_scoreboard_mgr_instance = MagicMock()
 
+        mock_app.instance.return_value = None
         mock_app.return_value = mock_app_instance
         mock_main_window.return_value = mock_window_instance
         mock_scoreboard_mgr.return_value = mock_scoreboard_mgr_instance
@@ -46,7 +47,7 @@ def test_main(mock_app_and_window):
 
     # Act
     with patch("sys.exit") as mock_exit:
-        main()
+        main(argv=[])
 
     # Assert
     # QApplication initialization
@@ -0,0 +1,176 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from RePoste.memory_governor import (
+    MemoryGovernor,
+    available_memory,
+    plan_buffer,
+    read_meminfo,
+)
+from RePoste.video_manager import VideoRecorder
+
+GB = 1024**3
+FRAME_4K = (3840, 2160)
+
+
+def write_meminfo(path, available_kb, total_kb=16 * 1024 * 1024):
+    path.write_text(
+        f"MemTotal:       {total_kb} kB\n"
+        "MemFree:          123456 kB\n"
+        f"MemAvailable:   {available_kb} kB\n"
+        "HugePages_Total:       0\n"
+    )
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    recorder = VideoRecorder(
+        fps=10, buffer_duration=4, output_dir=str(tmp_path), camera_config={}
+    )
+    recorder.capture_mode = {"size": (8, 6)}
+    return recorder
+
+
+def test_read_meminfo(tmp_path):
+    # Arrange
+    meminfo = tmp_path / "meminfo"
+    write_meminfo(meminfo, available_kb=2048)
+
+    # Act
+    info = read_meminfo(str(meminfo))
+
+    # Assert
+    assert info["MemAvailable"] == 2048 * 1024, "❌ kB should become bytes"
+    assert info["HugePages_Total"] == 0, "❌ Unitless fields should parse"
+    assert available_memory(str(meminfo)) == 2048 * 1024
+    assert (
+        available_memory(str(tmp_path / "missing")) is None
+    ), "❌ No meminfo should mean unknown"
+
+
+def test_plan_buffer_keeps_request_that_fits():
+    # Act
+    plan = plan_buffer(5, 60, FRAME_4K, budget=8 * GB)
+
+    # Assert
+    assert (plan.duration, plan.scale) == (5, 1), "❌ Should not downgrade"
+    assert plan.total_bytes == 5 * 60 * 3840 * 2160 * 3
+    assert not plan.downgraded
+
+
+def test_plan_buffer_lowers_resolution_before_duration():
+    # 4K60 RGB is about 1.5 GB per second
+    plan = plan_buffer(5, 60, FRAME_4K, budget=2 * GB)
+
+    assert plan.duration == 5, "❌ The whole duration should be kept"
+    assert plan.scale == 2, "❌ Frames should be kept at half size"
+    assert plan.total_bytes <= 2 * GB
+    assert plan.downgraded
+
+
+def test_plan_buffer_caps_duration_when_smallest_frames_do_not_fit():
+    plan = plan_buffer(30, 60, FRAME_4K, budget=GB)
+
+    assert plan.scale == 4, "❌ Should use the smallest frames"
+    assert plan.duration < 30, "❌ Duration should be capped"
+    assert plan.total_bytes <= GB, "❌ Plan should fit the budget"
+
+
+def test_plan_buffer_caps_duration_for_full_size_frames_only():
+    # Frames of the capture process's ring stay full size
+    plan = plan_buffer(5, 60, FRAME_4K, budget=2 * GB, scales=(1,))
+
+    assert plan.scale == 1, "❌ Frames should not be downscaled"
+    assert plan.duration == 1, "❌ Only about 1.4 s fit at full size"
+    assert plan.total_bytes <= 2 * GB
+
+
+def test_plan_buffer_without_memory_info_grants_request():
+    plan = plan_buffer(5, 60, FRAME_4K, budget=None)
+
+    assert (plan.duration, plan.scale) == (5, 1)
+    assert "not limited" in plan.describe()
+
+
+def test_governor_apply_downscales_buffered_frames(recorder, tmp_path):
+    # Arrange, 10 fps * 4 s of 8x6 frames is 5760 bytes, the buffer holds
+    # 13 * 144 = 1872 and no memory is free
+    meminfo = tmp_path / "meminfo"
+    write_meminfo(meminfo, available_kb=0)
+    governor = MemoryGovernor(recorder, str(meminfo), fraction=1.0)
+    recorder.buffer = deque(
+        [np.zeros((6, 8, 3), dtype=np.uint8)] * 13, maxlen=40
+    )
+
+    # Act
+    plan = governor.apply(4)
+
+    # Assert
+    assert plan.scale == 2, "❌ Frames should be kept at half size"
+    assert recorder.frame_scale == 2
+    assert all(
+        frame.shape == (3, 4, 3) for frame in recorder.buffer
+    ), "❌ Buffered frames should be rescaled"
+    assert governor.plan is plan
+
+
+def test_governor_shrinks_buffer_under_memory_pressure(recorder, tmp_path):
+    # Arrange
+    meminfo = tmp_path / "meminfo"
+    write_meminfo(meminfo, available_kb=64 * 1024)
+    governor = MemoryGovernor(recorder, str(meminfo), min_free=1000)
+    frames = [np.full((6, 8, 3), i, dtype=np.uint8) for i in range(40)]
+    recorder.buffer = deque(frames, maxlen=40)
+
+    # Act, plenty of memory
+    unchanged = governor.check_pressure()
+    # Memory runs out, 2 * min_free has to be released
+    write_meminfo(meminfo, available_kb=0)
+    plan = governor.check_pressure()
+    scale = recorder.frame_scale
+
+    # Assert
+    assert unchanged is None, "❌ Nothing should change with enough memory"
+    assert plan is not None, "❌ Buffer should shrink under pressure"
+    assert (
+        recorder.buffer_stats()["capacity_bytes"] <= 5760 - 2000
+    ), "❌ Enough memory should be released"
+    assert np.array_equal(
+        recorder.buffer[-1], frames[-1][::scale, ::scale]
+    ), "❌ The newest frame should be kept"
+
+
+def test_pressure_costs_a_downscaled_buffer_at_its_own_scale(
+    recorder, tmp_path
+):
+    # Arrange, 40 half size frames of 8x6 hold 40 * 36 = 1440 bytes, 600
+    # have to go
+    meminfo = tmp_path / "meminfo"
+    write_meminfo(meminfo, available_kb=0)
+    governor = MemoryGovernor(recorder, str(meminfo), min_free=300)
+    recorder.buffer = deque(
+        [np.ones((6, 8, 3), dtype=np.uint8)] * 40, maxlen=40
+    )
+    recorder.set_frame_scale(2)
+
+    # Act
+    plan = governor.check_pressure()
+
+    # Assert
+    assert plan.budget == 1440 - 600, "❌ Held bytes should use scale 2"
+    assert (plan.duration, plan.scale) == (4, 4), "❌ Should shrink frames"
+    assert recorder.buffer_stats()["capacity_bytes"] == 40 * 12
+
+
+def test_set_frame_scale_back_to_full_size(recorder):
+    # Arrange
+    recorder.buffer = deque([np.ones((6, 8, 3), dtype=np.uint8)], maxlen=40)
+    recorder.set_frame_scale(4)
+
+    # Act
+    recorder.set_frame_scale(1)
+
+    # Assert
+    assert recorder.buffer[0].shape == (6, 8, 3), "❌ Should match capture"
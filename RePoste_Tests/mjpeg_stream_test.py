@@ -0,0 +1,158 @@
+import asyncio
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication
+
+from RePoste.mjpeg_stream import MjpegBroadcaster, Viewer, encode_jpeg
+from RePoste.remote_control import RemoteControlServer
+from RePoste.video_manager import VideoRecorder
+
+
+@pytest.fixture(scope="module", autouse=True)
+def qapplication():
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "❌ Timed out"
+        time.sleep(0.01)
+
+
+def read_until(sock, marker):
+    data = b""
+    while not data.endswith(marker):
+        chunk = sock.recv(1)
+        assert chunk, "❌ The stream closed"
+        data += chunk
+    return data
+
+
+def read_part(sock):
+    head = read_until(sock, b"\r\n\r\n").decode()
+    length = int(head.split("Content-Length: ")[1].split("\r\n")[0])
+    body = b""
+    while len(body) < length + 2:
+        body += sock.recv(length + 2 - len(body))
+    return body[:length]
+
+
+def open_stream(server, name):
+    sock = socket.create_connection(("127.0.0.1", server.port), 5)
+    sock.sendall(f"GET /stream/{name}.mjpeg HTTP/1.1\r\n\r\n".encode())
+    head = read_until(sock, b"\r\n\r\n")
+    assert b"multipart/x-mixed-replace" in head
+    return sock
+
+
+def test_encode_jpeg_mirrors_and_scales():
+    # Arrange, red on the left
+    frame = np.zeros((90, 160, 3), np.uint8)
+    frame[:, :80] = (255, 0, 0)
+
+    # Act
+    image = QImage.fromData(encode_jpeg(frame, 80, 90))
+
+    # Assert
+    assert (image.width(), image.height()) == (80, 45)
+    assert image.pixelColor(70, 20).red() > 200, "❌ Mirrored as shown"
+    assert image.pixelColor(10, 20).red() < 50
+
+
+def test_frames_are_encoded_once_per_watched_rendition():
+    # Arrange
+    stream = MjpegBroadcaster(
+        encode=lambda frame, width, quality: f"{width}:{frame}".encode()
+    )
+    server = RemoteControlServer({}, stream=stream)
+    server.start()
+    viewers = [open_stream(server, "small") for _ in range(2)]
+    viewers.append(open_stream(server, "medium"))
+    wait_for(lambda: sum(map(len, stream.viewers.values())) == 3)
+
+    try:
+        # Act
+        received = []
+        for frame in (1, 2):
+            stream.publish(frame)
+            received.append([read_part(sock) for sock in viewers])
+
+        # Assert
+        assert received == [
+            [b"640:1", b"640:1", b"1280:1"],
+            [b"640:2", b"640:2", b"1280:2"],
+        ]
+        assert stream.encoded == {"full": 0, "medium": 2, "small": 2}
+        assert stream.stats()["renditions"]["small"]["viewers"] == 2
+    finally:
+        for sock in viewers:
+            sock.close()
+        server.stop()
+
+
+def test_published_frame_is_copied_before_encoding():
+    # Arrange, an encoder held until the source frame is overwritten
+    release = threading.Event()
+
+    def held_encode(frame, width, quality):
+        release.wait(5)
+        return bytes(frame.ravel()[:1])
+
+    stream = MjpegBroadcaster(encode=held_encode)
+    server = RemoteControlServer({}, stream=stream)
+    server.start()
+    sock = open_stream(server, "small")
+    wait_for(lambda: stream.watched)
+    frame = np.full((4, 4, 3), 7, np.uint8)
+
+    try:
+        # Act
+        stream.publish(frame)
+        frame[:] = 99  # The ring slot is reused
+        release.set()
+
+        # Assert
+        assert read_part(sock) == bytes([7]), "❌ Frame torn by the reuse"
+    finally:
+        sock.close()
+        server.stop()
+
+
+def test_slow_viewer_drops_its_oldest_frames():
+    # Arrange
+    async def offer_all():
+        viewer = Viewer(size=2)
+        for frame in range(5):
+            viewer.offer(frame)
+        return viewer, [viewer.frames.get_nowait() for _ in range(2)]
+
+    # Act
+    viewer, queued = asyncio.run(offer_all())
+
+    # Assert
+    assert queued == [3, 4], "❌ The newest frames are kept"
+    assert viewer.dropped == 3
+
+
+def test_replayed_frames_reach_the_listeners(tmp_path):
+    # Arrange
+    recorder = VideoRecorder(
+        fps=30, buffer_duration=1, output_dir=str(tmp_path), camera_config={}
+    )
+    recorder.buffer.extend(np.zeros((4, 4, 3), np.uint8) for _ in range(3))
+    shown = []
+    recorder.frame_listeners.append(shown.append)
+
+    # Act
+    recorder.start_in_app_replay(lambda pixmap: None)
+    recorder.stop_in_app_replay()
+
+    # Assert
+    assert len(shown) == 1 and shown[0] is recorder.buffer[0]
@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QApplication
+
+from RePoste.perf_counters import (
+    FrameCounters,
+    HudSampler,
+    RateMeter,
+    format_hud,
+    hud_alerts,
+)
+from RePoste.video_manager import VideoRecorder
+
+MS = 1_000_000
+
+
+@pytest.fixture(scope="module", autouse=True)
+def qapplication():
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+def test_frame_counters_count_drops_and_latency():
+    # Arrange
+    counters = FrameCounters()
+    period = 1_000_000_000 // 50
+
+    # Act, a frame late by three periods, then two painted frames
+    counters.frame_captured(period, 50)
+    counters.frame_captured(2 * period, 50)
+    counters.frame_captured(5 * period, 50)
+    counters.frame_displayed(10 * MS, 14 * MS)
+    counters.frame_displayed(0, 20 * MS)
+
+    # Assert
+    assert counters.captured == 3
+    assert counters.dropped == 2, "❌ Two frame periods were missed"
+    assert counters.displayed == 2
+    assert (counters.latency_ns, counters.latency_samples) == (
+        4 * MS,
+        1,
+    ), "❌ Replayed frames (captured at 0) have no latency"
+
+
+def test_rate_meter_between_samples():
+    # Arrange
+    meter = RateMeter()
+
+    # Act
+    first = meter.sample(100, 10.0)
+    second = meter.sample(130, 10.5)
+
+    # Assert
+    assert first is None, "❌ One sample gives no rate yet"
+    assert second == 60.0
+
+
+def test_sampler_reads_recorder_and_scoreboard(tmp_path):
+    # Arrange
+    recorder = VideoRecorder(
+        fps=30, buffer_duration=2, output_dir=str(tmp_path), camera_config={}
+    )
+    recorder.buffer.extend([np.zeros((4, 4, 3), np.uint8)] * 15)
+    manager = SimpleNamespace(
+        backend=SimpleNamespace(frames_received=10), last_received_at=99.0
+    )
+    governor = SimpleNamespace(last_available=2 << 30)
+    sampler = HudSampler(recorder, manager, governor)
+    sampler.sample(now=100.0)
+    recorder.counters.captured += 15
+    recorder.counters.frame_displayed(1 * MS, 13 * MS)
+    manager.backend.frames_received += 4
+
+    # Act
+    stats = sampler.sample(now=101.0)
+
+    # Assert
+    assert stats["capture_fps"] == 15.0
+    assert stats["latency_ms"] == 12.0
+    assert stats["buffer_fill_seconds"] == 0.5
+    assert stats["buffer_capacity_seconds"] == 2.0
+    assert stats["available_bytes"] == 2 << 30
+    assert stats["encode_progress"] is None, "❌ No replay is encoding"
+    assert stats["scoreboard_rate"] == 4.0
+    assert stats["scoreboard_age"] == 2.0
+
+
+def test_format_hud_flags_a_failing_camera():
+    # Arrange
+    stats = {
+        "target_fps": 60,
+        "capture_fps": 31.0,
+        "display_fps": 30.5,
+        "dropped": 12,
+        "skipped": 1,
+        "latency_ms": 18.3,
+        "buffer_fill_seconds": 4.0,
+        "buffer_capacity_seconds": 5.0,
+        "buffer_bytes": 3 << 20,
+        "available_bytes": None,
+        "encode_queue": 1,
+        "encode_progress": 0.5,
+        "scoreboard_rate": 2.0,
+        "scoreboard_age": 0.4,
+    }
+
+    # Act
+    text = format_hud(stats)
+
+    # Assert
+    assert hud_alerts(stats) == ["camera below target fps"]
+    assert "Capture 31.0 / 60 fps" in text
+    assert "Latency 18.3 ms" in text
+    assert "Buffer 4.0 / 5.0 s (3.0 MB)" in text
+    assert "Encode 1 queued, 50%" in text
+    assert "Scoreboard 2.0/s, last 0.4 s ago" in text
+    assert text.endswith("! camera below target fps")
+
+
+def test_video_feed_counts_skipped_frames():
+    # Arrange
+    from RePoste.gui import VideoFeed
+
+    feed = VideoFeed()
+    feed.resize(32, 24)
+    feed.show()
+    QApplication.processEvents()
+    pixmap = QPixmap(32, 24)
+
+    # Act, two frames before a paint: the first is never seen
+    feed.show_frame(pixmap, 1)
+    feed.show_frame(pixmap, 2)
+    feed.repaint()
+
+    # Assert
+    assert feed.counters.skipped == 1, "❌ The replaced frame was skipped"
+    assert feed.counters.displayed == 1
@@ -0,0 +1,404 @@
+"""
+Performance regression harness for the video and scoreboard hot paths.
+
+Each benchmark is warmed up, then timed over repeated trials alternating
+with trials of a fixed calibration loop. Its best time is divided by the
+loop's best time, so results from a faster or slower (or momentarily
+busy) machine stay comparable. The normalized times are compared with the
+committed baseline of the platform, and a benchmark fails when it got
+slower by more than its tolerance.
+
+Run from the repository root (headless, on the Qt offscreen platform):
+    python RePoste_Tests/perf_harness.py            # compare
+    python RePoste_Tests/perf_harness.py --update   # record the baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+REPO_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(REPO_DIR))
+
+# benchmark_video puts the RePoste directory on the path
+from RePoste_Tests.benchmark_video import (  # noqa: E402
+    machine_info,
+    qt_app,
+    show_image,
+    video_view,
+)
+from synthetic_camera import RESOLUTIONS, SyntheticReader  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "perf_baselines")
+WARMUP_CALLS = 5
+TRIALS = 7
+# Calls per trial are doubled until a trial takes at least this long
+MIN_TRIAL_SECONDS = 0.01
+# A benchmark may be this much slower than its baseline (0.5 = +50%)
+DEFAULT_TOLERANCE = 0.5
+FRAME_SIZE = RESOLUTIONS["1080p"]
+
+
+def time_per_call(op: Callable, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        op()
+    return (time.perf_counter() - started) / number
+
+
+def calls_per_trial(op: Callable) -> int:
+    number = 1
+    while time_per_call(op, number) * number < MIN_TRIAL_SECONDS:
+        number *= 2
+    return number
+
+
+def measure(
+    op: Callable, warmup: int = WARMUP_CALLS, trials: int = TRIALS
+) -> Tuple[float, float]:
+    """
+    Seconds per call of op and of the calibration loop, each in its
+    fastest trial. Noise only ever adds time, so the minimum is the
+    stablest estimate.
+    """
+    for _ in range(warmup):
+        op()
+    number = calls_per_trial(op)
+    calibration_number = calls_per_trial(calibration_loop)
+    op_times = []
+    calibration_times = []
+    for _ in range(trials):
+        calibration_times.append(
+            time_per_call(calibration_loop, calibration_number)
+        )
+        op_times.append(time_per_call(op, number))
+    return min(op_times), min(calibration_times)
+
+
+def calibration_loop():
+    """
+    Fixed work mixing interpreter speed and memory bandwidth, like the
+    hot paths do.
+    """
+    import numpy as np
+
+    total = 0
+    for i in range(20_000):
+        total += i * i
+    frame = np.empty((540, 960, 3), dtype=np.uint8)
+    frame.fill(total & 0xFF)
+    frame[:, ::-1].copy()
+
+
+# --- Hot paths ---
+# Each function sets its benchmark up and returns the operation to time.
+
+# Qt objects the benchmarks need alive, and cleanups to run after them
+_keep_alive = []
+_teardown = []
+
+
+def frame_1080p():
+    return SyntheticReader(FRAME_SIZE, realtime=False).get_next_data()
+
+
+def convert_frame_to_pixmap_1080p():
+    from video_manager import VideoRecorder
+
+    recorder = VideoRecorder(
+        camera_config={}, output_dir=tempfile.gettempdir()
+    )
+    frame = frame_1080p()
+    return lambda: recorder.convert_frame_to_pixmap(frame)
+
+
+def capture_frame_1080p():
+    """One live frame: read, convert, show in the view and buffer."""
+    from video_manager import VideoRecorder
+
+    label = video_view()
+    recorder = VideoRecorder(
+        fps=60,
+        buffer_duration=1,
+        camera_config={},
+        output_dir=tempfile.gettempdir(),
+    )
+    recorder.reader = SyntheticReader(FRAME_SIZE, realtime=False)
+    recorder.update_callback = lambda image: show_image(label, image)
+    recorder.recording = True
+    _keep_alive.append(label)
+    _teardown.append(recorder.stop_recording)
+    return recorder.capture_frame
+
+
+def replay_step_1080p():
+    """A frame step of the in-app replay, up to the repaint."""
+    from video_manager import VideoRecorder
+
+    label = video_view()
+    recorder = VideoRecorder(
+        camera_config={}, output_dir=tempfile.gettempdir()
+    )
+    recorder.replay_frames = [frame_1080p()] * 2
+    recorder.update_callback = lambda image: show_image(label, image)
+    _keep_alive.append(label)
+
+    def step():
+        recorder.replay_index = 0
+        recorder.show_next_frame()
+        label.repaint()
+
+    return step
+
+
+def buffer_resize_1080p():
+    """Live resize of a full one-second buffer."""
+    from video_manager import VideoRecorder
+
+    recorder = VideoRecorder(
+        fps=60,
+        buffer_duration=1,
+        camera_config={},
+        output_dir=tempfile.gettempdir(),
+    )
+    frame = frame_1080p()
+    recorder.buffer.extend([frame] * 60)
+    durations = [2, 1]
+    return lambda: recorder.set_buffer_duration(
+        durations.reverse() or durations[0]
+    )
+
+
+def downscale_frame_1080p():
+    from video_manager import downscale_frame
+
+    frame = frame_1080p()
+    return lambda: downscale_frame(frame, 2)
+
+
+def sfs_link_feed():
+    from scoring_backends import SfsLinkBackend
+
+    backend = SfsLinkBackend()
+    stream = [b"06125602140A38\r\n", b"06125702140A38\r\n"]
+    return lambda: backend.feed(stream.reverse() or stream[0])
+
+
+def scoreboard_update():
+    """A scoreboard update on the GUI thread, as the manager emits it."""
+    from gui import ScoreboardWidget
+    from scoreboard_state import decode_sfs_link_payload
+
+    widget = ScoreboardWidget(None)
+    _keep_alive.append(widget)
+    states = [
+        decode_sfs_link_payload(b"06125602140A38"),
+        decode_sfs_link_payload(b"06125702000A38"),
+    ]
+
+    def update():
+        state = states.reverse() or states[0]
+        widget.set_score(state.left_score, state.right_score)
+        widget.set_clock(state.minutes, state.seconds)
+        widget.set_lamps(state.lamps)
+        widget.set_cards(state.penalty)
+
+    return update
+
+
+BENCHMARKS = {
+    "convert_frame_to_pixmap_1080p": convert_frame_to_pixmap_1080p,
+    "capture_frame_1080p": capture_frame_1080p,
+    "replay_step_1080p": replay_step_1080p,
+    "buffer_resize_1080p": buffer_resize_1080p,
+    "downscale_frame_1080p": downscale_frame_1080p,
+    "sfs_link_feed": sfs_link_feed,
+    "scoreboard_update": scoreboard_update,
+}
+
+
+def run_benchmarks(names: Optional[List[str]] = None) -> dict:
+    """
+    Normalized time per call of each benchmark (divided by the calibration
+    loop's), with the raw milliseconds alongside.
+    """
+    qt_app()
+    logging.disable(logging.INFO)
+    raw = {}
+    calibrations = {}
+    try:
+        for name in names or BENCHMARKS:
+            raw[name], calibrations[name] = measure(BENCHMARKS[name]())
+            while _teardown:
+                _teardown.pop()()
+    finally:
+        _keep_alive.clear()
+        logging.disable(logging.NOTSET)
+    return {
+        "calibration_ms": min(calibrations.values()) * 1000,
+        "raw_ms": {name: value * 1000 for name, value in raw.items()},
+        "normalized": {
+            name: value / calibrations[name] for name, value in raw.items()
+        },
+    }
+
+
+# --- Baselines ---
+
+
+def baseline_path(platform: Optional[str] = None) -> str:
+    return os.path.join(BASELINE_DIR, f"{platform or sys.platform}.json")
+
+
+def load_baseline(path: Optional[str] = None) -> Optional[dict]:
+    try:
+        with open(path or baseline_path(), "r") as file:
+            return json.load(file)
+    except OSError:
+        return None
+
+
+def save_baseline(results: dict, path: Optional[str] = None):
+    """
+    Record results as the baseline, keeping tuned tolerances and the
+    benchmarks that were not run.
+    """
+    path = path or baseline_path()
+    previous = load_baseline(path) or {"benchmarks": {}}
+    benchmarks = dict(previous["benchmarks"])
+    for name, value in results["normalized"].items():
+        old = previous["benchmarks"].get(name, {})
+        benchmarks[name] = {
+            "normalized": float(f"{value:.6g}"),
+            "tolerance": old.get("tolerance", DEFAULT_TOLERANCE),
+        }
+    baseline = {
+        "machine": machine_info(),
+        "calibration_ms": round(results["calibration_ms"], 4),
+        "benchmarks": benchmarks,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=4)
+        file.write("\n")
+
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: Optional[float]
+    current: float
+    tolerance: float
+
+    @property
+    def change(self) -> Optional[float]:
+        """Relative slow down, 0.25 is 25% slower than the baseline."""
+        if not self.baseline:
+            return None
+        return self.current / self.baseline - 1
+
+    @property
+    def regressed(self) -> bool:
+        return self.change is not None and self.change > self.tolerance
+
+    @property
+    def status(self) -> str:
+        if self.change is None:
+            return "new"
+        if self.regressed:
+            return "REGRESSED"
+        if self.change < -self.tolerance:
+            return "faster"
+        return "ok"
+
+
+def compare(normalized: Dict[str, float], baseline: dict) -> List[Comparison]:
+    comparisons = []
+    for name, current in normalized.items():
+        entry = baseline["benchmarks"].get(name, {})
+        comparisons.append(
+            Comparison(
+                name,
+                entry.get("normalized"),
+                current,
+                entry.get("tolerance", DEFAULT_TOLERANCE),
+            )
+        )
+    return comparisons
+
+
+def check(
+    baseline: dict, names: Optional[List[str]] = None
+) -> List[Comparison]:
+    """
+    Run the benchmarks and compare them with baseline. A benchmark that
+    regressed is measured again before it counts, and keeps its better
+    result, so one disturbed run does not fail the check.
+    """
+    normalized = run_benchmarks(names)["normalized"]
+    regressed = [c.name for c in compare(normalized, baseline) if c.regressed]
+    if regressed:
+        retry = run_benchmarks(regressed)["normalized"]
+        for name, value in retry.items():
+            normalized[name] = min(normalized[name], value)
+    return compare(normalized, baseline)
+
+
+def format_diff(comparisons: List[Comparison]) -> str:
+    """A table of baseline against current, in calibration units."""
+    width = max([len(c.name) for c in comparisons] + [9])
+    lines = [
+        f"{'benchmark':<{width}}  {'baseline':>9}  {'current':>9}  "
+        f"{'change':>8}  {'allowed':>8}  status"
+    ]
+    for c in comparisons:
+        baseline = "-" if c.baseline is None else f"{c.baseline:9.4g}"
+        change = "-" if c.change is None else f"{c.change:+8.0%}"
+        lines.append(
+            f"{c.name:<{width}}  {baseline:>9}  {c.current:9.4g}  "
+            f"{change:>8}  {c.tolerance:+8.0%}  {c.status}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="RePoste performance regression check"
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="record the results as this platform's baseline",
+    )
+    parser.add_argument(
+        "benchmarks", nargs="*", help="benchmarks to run, by default all"
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(
+            f"unknown benchmarks {', '.join(sorted(unknown))}, "
+            f"expected some of {', '.join(BENCHMARKS)}"
+        )
+
+    if args.update:
+        results = run_benchmarks(args.benchmarks or None)
+        save_baseline(results)
+        print(f"Calibration loop: {results['calibration_ms']:.3f} ms")
+        print(f"Baseline written to {baseline_path()}")
+        return 0
+    baseline = load_baseline()
+    if baseline is None:
+        print(f"No baseline at {baseline_path()}, record one with --update")
+        return 1
+    comparisons = check(baseline, args.benchmarks or None)
+    print(format_diff(comparisons))
+    return 1 if any(c.regressed for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
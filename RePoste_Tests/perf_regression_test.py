@@ -0,0 +1,151 @@
+import json
+import os
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from RePoste_Tests import perf_harness
+from RePoste_Tests.perf_harness import (
+    Comparison,
+    calibration_loop,
+    check,
+    compare,
+    format_diff,
+    load_baseline,
+    save_baseline,
+)
+
+# Set to skip the timing run, e.g. on a loaded CI machine
+SKIP_ENV = "REPOSTE_SKIP_PERF"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def qapplication():
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.mark.skipif(
+    bool(os.environ.get(SKIP_ENV)), reason=f"{SKIP_ENV} is set"
+)
+def test_no_performance_regressions():
+    # Arrange
+    baseline = load_baseline()
+    if baseline is None:
+        pytest.skip(
+            f"No baseline at {perf_harness.baseline_path()}, record one "
+            "with: python RePoste_Tests/perf_harness.py --update"
+        )
+
+    # Act
+    comparisons = check(baseline)
+
+    # Assert
+    assert not any(
+        c.regressed for c in comparisons
+    ), f"❌ Performance regressed:\n{format_diff(comparisons)}"
+
+
+def test_check_catches_halved_throughput(monkeypatch):
+    # Arrange, a hot path that now does the calibration work twice
+    monkeypatch.setitem(
+        perf_harness.BENCHMARKS,
+        "doubled",
+        lambda: lambda: (calibration_loop(), calibration_loop()),
+    )
+    baseline = {"benchmarks": {"doubled": {"normalized": 1.0}}}
+
+    # Act
+    (comparison,) = check(baseline, ["doubled"])
+
+    # Assert
+    assert comparison.regressed, "❌ A 2x slow down should fail the check"
+    assert "REGRESSED" in format_diff([comparison])
+
+
+def test_compare_applies_tolerances():
+    # Arrange
+    baseline = {
+        "benchmarks": {
+            "steady": {"normalized": 1.0, "tolerance": 0.5},
+            "slower": {"normalized": 1.0, "tolerance": 0.5},
+            "noisy": {"normalized": 1.0, "tolerance": 1.0},
+        }
+    }
+    normalized = {"steady": 1.2, "slower": 1.6, "noisy": 1.6, "added": 3.0}
+
+    # Act
+    statuses = {c.name: c.status for c in compare(normalized, baseline)}
+
+    # Assert
+    assert statuses == {
+        "steady": "ok",
+        "slower": "REGRESSED",
+        "noisy": "ok",
+        "added": "new",
+    }, "❌ Tolerances should decide what regressed"
+
+
+def test_format_diff_is_readable():
+    # Arrange
+    comparisons = [
+        Comparison("capture_frame_1080p", 5.0, 10.0, 0.5),
+        Comparison("sfs_link_feed", None, 0.001, 0.5),
+    ]
+
+    # Act
+    lines = format_diff(comparisons).splitlines()
+
+    # Assert
+    assert lines[0].split() == [
+        "benchmark",
+        "baseline",
+        "current",
+        "change",
+        "allowed",
+        "status",
+    ]
+    assert lines[1].split() == [
+        "capture_frame_1080p",
+        "5",
+        "10",
+        "+100%",
+        "+50%",
+        "REGRESSED",
+    ], "❌ Each row should show the slow down against the tolerance"
+    assert lines[2].split()[-1] == "new"
+
+
+def test_save_baseline_keeps_tuned_tolerances(tmp_path):
+    # Arrange, a baseline whose tolerance of "a" was raised by hand
+    path = str(tmp_path / "linux.json")
+    results = {"calibration_ms": 3.0, "normalized": {"a": 1.0, "b": 2.0}}
+    save_baseline(results, path)
+    baseline = load_baseline(path)
+    baseline["benchmarks"]["a"]["tolerance"] = 1.5
+    with open(path, "w") as file:
+        json.dump(baseline, file)
+
+    # Act
+    save_baseline(results, path)
+
+    # Assert
+    saved = load_baseline(path)["benchmarks"]
+    assert saved["a"] == {"normalized": 1.0, "tolerance": 1.5}
+    assert saved["b"]["tolerance"] == perf_harness.DEFAULT_TOLERANCE
+
+
+def test_save_baseline_of_some_benchmarks_keeps_the_rest(tmp_path):
+    # Arrange
+    path = str(tmp_path / "linux.json")
+    save_baseline(
+        {"calibration_ms": 3.0, "normalized": {"a": 1.0, "b": 2.0}}, path
+    )
+
+    # Act
+    save_baseline({"calibration_ms": 3.0, "normalized": {"a": 1.5}}, path)
+
+    # Assert
+    saved = load_baseline(path)["benchmarks"]
+    assert saved["a"]["normalized"] == 1.5
+    assert saved["b"]["normalized"] == 2.0, "❌ b was not run, keep it"
@@ -0,0 +1,101 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from RePoste.perf_counters import HudSampler
+from RePoste.record import ControlServer, Controller, parse_args
+from RePoste.recorder_core import RecorderCore
+
+REPO_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+@pytest.fixture
+def controller(tmp_path):
+    core = RecorderCore(output_dir=str(tmp_path), camera_config={})
+    return Controller(core, HudSampler(core))
+
+
+def test_controller_commands(controller):
+    # Act
+    stats = controller.handle("stats\n")
+    unknown = controller.handle("rewind")
+    blank = controller.handle("\n")
+    stopping = controller.handle("QUIT")
+
+    # Assert
+    assert stats.startswith("Capture"), "❌ stats should print the figures"
+    assert "expected save [filename], stats or quit" in unknown
+    assert blank == ""
+    assert stopping == "Stopping" and controller.stopped.is_set()
+
+
+def test_control_port_answers_commands(controller):
+    # Arrange
+    server = ControlServer(controller, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Act
+    try:
+        with socket.create_connection(("127.0.0.1", server.port), 5) as conn:
+            conn.sendall(b"stats\nquit\n")
+            conn.shutdown(socket.SHUT_WR)
+            reply = conn.makefile().read()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Assert
+    assert reply.startswith("Capture") and reply.endswith("Stopping\n")
+    assert controller.stopped.is_set()
+
+
+def test_parse_args_rejects_unknown_source():
+    # Act / Assert
+    with pytest.raises(SystemExit):
+        parse_args(["--source", "synthetic:8K"])
+
+
+def test_record_cli_runs_headless(tmp_path):
+    # Arrange, a run of the CLI that checks Qt was never imported
+    code = (
+        "import sys\n"
+        "from RePoste import record\n"
+        "code = record.main(sys.argv[1:])\n"
+        "print('Qt loaded' if 'PyQt6' in sys.modules else 'No Qt')\n"
+        "sys.exit(code)\n"
+    )
+    args = [
+        "--source",
+        "synthetic:480p",
+        "--fps",
+        "30",
+        "--duration",
+        "5",
+        "--stats-interval",
+        "0",
+        "--log-file",
+        "",
+        "--output",
+        str(tmp_path),
+    ]
+
+    # Act
+    result = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        input="stats\nquit\n",
+        capture_output=True,
+        text=True,
+        cwd=REPO_DIR,
+        timeout=60,
+    )
+
+    # Assert
+    assert result.returncode == 0, f"❌ {result.stderr}"
+    lines = result.stdout.splitlines()
+    assert lines[0].startswith("Capture"), "❌ stats should be answered"
+    assert "Stopping" in lines
+    assert lines[-1] == "No Qt", "❌ The recorder should not need Qt"
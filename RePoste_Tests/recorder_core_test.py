@@ -0,0 +1,122 @@
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from RePoste.recorder_core import (
+    CaptureWorker,
+    RecorderCore,
+    ScoreboardTimeline,
+    downscale_frame,
+)
+from RePoste.memory_governor import scaled_frame_bytes
+from RePoste.scoreboard_state import decode_sfs_link_payload
+from RePoste.synthetic_camera import SyntheticReader
+
+
+def make_core(tmp_path, **kwargs):
+    return RecorderCore(output_dir=str(tmp_path), camera_config={}, **kwargs)
+
+
+def test_timeline_span_starts_with_the_showing_state():
+    # Arrange
+    timeline = ScoreboardTimeline()
+    for frame, score in ((0, "0-0"), (40, "1-0"), (75, "1-1"), (90, "2-1")):
+        timeline.record(frame, {"score": score})
+
+    # Act
+    states = timeline.span(50, 90)
+
+    # Assert
+    assert states == [
+        (0, {"score": "1-0"}),
+        (25, {"score": "1-1"}),
+    ], "❌ The span should hold the states of frames 50 to 89"
+
+
+def test_downscale_frame_averages_blocks():
+    # Arrange, a black and white checkerboard of single pixels
+    frame = np.zeros((8, 8, 3), np.uint8)
+    frame[::2, ::2] = frame[1::2, 1::2] = 255
+    odd = np.full((7, 5, 3), 9, np.uint8)
+
+    # Act
+    halved = downscale_frame(frame, 2)
+    quartered = downscale_frame(frame, 4)
+    odd_halved = downscale_frame(odd, 2)
+
+    # Assert
+    assert halved.shape == (4, 4, 3)
+    assert (halved == 128).all(), "❌ Blocks average, no aliasing"
+    assert (quartered == 128).all()
+    assert odd_halved.nbytes == scaled_frame_bytes((5, 7), 2)
+    assert (odd_halved == 9).all(), "❌ Edge pixels are repeated"
+
+
+def test_save_replay_writes_scoreboard_timeline(tmp_path):
+    # Arrange
+    core = make_core(tmp_path, fps=10, buffer_duration=1)
+    frame = np.zeros((2, 2, 3), dtype=np.uint8)
+    core.record_scoreboard(decode_sfs_link_payload(b"06125602140A38"))
+    for _ in range(15):
+        core.ingest_frame(frame)
+    core.record_scoreboard(None)
+    for _ in range(3):
+        core.ingest_frame(frame)
+
+    # Act
+    with patch("imageio.get_writer", return_value=MagicMock()):
+        core.save_replay("touch.mp4")
+
+    # Assert
+    timeline = json.loads((tmp_path / "touch.scoreboard.json").read_text())
+    assert timeline["frames"] == 10, "❌ The buffer holds 10 frames"
+    offsets = [entry["frame"] for entry in timeline["states"]]
+    assert offsets == [0, 7], "❌ The blank board came 7 frames in"
+    assert timeline["states"][0]["state"]["left_score"] == 12
+    assert timeline["states"][1]["state"] is None
+
+
+def test_save_replay_keeps_the_file_in_output_dir(tmp_path):
+    # Arrange
+    core = make_core(tmp_path / "out", fps=10, buffer_duration=1)
+    core.ingest_frame(np.zeros((2, 2, 3), dtype=np.uint8))
+    writer = MagicMock()
+
+    # Act
+    with patch("imageio.get_writer", return_value=writer) as get_writer:
+        core.save_replay("../../escaped.mp4")
+
+    # Assert
+    path = get_writer.call_args[0][0]
+    assert path == str(
+        tmp_path / "out" / "escaped.mp4"
+    ), "❌ The name should be stripped of its directories"
+
+
+def test_capture_worker_fills_buffer_without_qt(tmp_path):
+    # Arrange
+    core = make_core(
+        tmp_path,
+        fps=30,
+        reader_factory=lambda: SyntheticReader((16, 12), realtime=False),
+    )
+    worker = CaptureWorker(core)
+
+    # Act
+    worker.start()
+    deadline = time.monotonic() + 5
+    while len(core.buffer) < core.buffer.maxlen:
+        if time.monotonic() > deadline:
+            break
+        time.sleep(0.01)
+    stopped = worker.stop(timeout=1)
+
+    # Assert
+    assert stopped, "❌ The capture thread should stop"
+    assert len(core.buffer) == core.buffer.maxlen, "❌ Buffer should fill"
+    assert core.counters.captured >= core.buffer.maxlen
+    assert core.reader.closed, "❌ Stopping should close the camera"
+    frames, first = core.snapshot()
+    assert first == core.frames_buffered - len(frames)
@@ -0,0 +1,160 @@
+import base64
+import http.client
+import json
+import os
+import socket
+import threading
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from RePoste.remote_control import (
+    OP_PING,
+    OP_PONG,
+    RemoteControlServer,
+    encode_frame,
+    websocket_accept,
+)
+
+
+@pytest.fixture
+def server():
+    saved = []
+    commands = {
+        "status": lambda params: {"saved": len(saved)},
+        "save": lambda params: saved.append(params) or {"frames": 300},
+        "replay/speed": lambda params: {"speed": float(params["speed"])},
+    }
+    server = RemoteControlServer(commands, token="secret")
+    server.start()
+    yield server
+    assert server.stop(), "❌ The server thread stopped"
+
+
+def request(server, method, path, body=None, token="secret"):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, 5)
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    connection.request(method, path, body, headers)
+    response = connection.getresponse()
+    reply = json.loads(response.read())
+    connection.close()
+    return response.status, reply
+
+
+def read_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        assert chunk, "❌ The server closed the connection"
+        data += chunk
+    return data
+
+
+def read_ws_frame(sock):
+    first, second = read_exactly(sock, 2)
+    size = second & 0x7F
+    if size == 126:
+        size = int.from_bytes(read_exactly(sock, 2), "big")
+    return first & 0x0F, read_exactly(sock, size)
+
+
+def open_websocket(server, path="/ws?token=secret"):
+    sock = socket.create_connection(("127.0.0.1", server.port), 5)
+    key = base64.b64encode(os.urandom(16)).decode()
+    sock.sendall(
+        (
+            f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        ).encode()
+    )
+    head = b""
+    while not head.endswith(b"\r\n\r\n"):
+        head += read_exactly(sock, 1)
+    assert head.startswith(b"HTTP/1.1 101")
+    assert websocket_accept(key).encode() in head
+    return sock
+
+
+def test_http_commands_report_their_latency(server):
+    # Act
+    status, reply = request(
+        server, "POST", "/replay/speed", json.dumps({"speed": 0.5})
+    )
+    bad_status, bad_reply = request(server, "POST", "/replay/speed", "{}")
+    _, status_reply = request(server, "GET", "/status")
+    missing, _ = request(server, "POST", "/replay/rewind")
+    wrong_method, _ = request(server, "GET", "/save")
+
+    # Assert
+    assert status == 200 and reply["result"] == {"speed": 0.5}
+    assert 0 <= reply["queue_ms"] <= reply["latency_ms"]
+    assert bad_status == 400 and "speed" in bad_reply["error"]
+    assert status_reply["result"]["latency"]["replay/speed"]["samples"] == 1
+    assert (missing, wrong_method) == (404, 405)
+
+
+def test_http_needs_the_token(server):
+    # Act
+    status, reply = request(server, "POST", "/save", token=None)
+    wrong, _ = request(server, "POST", "/save", token="guess")
+
+    # Assert
+    assert (status, wrong) == (401, 401), "❌ Unauthenticated saves refused"
+    assert request(server, "GET", "/status")[1]["result"]["saved"] == 0
+
+
+def test_websocket_commands_and_events(server):
+    # Arrange
+    sock = open_websocket(server)
+    message = json.dumps({"id": 7, "command": "save", "filename": "a.mp4"})
+
+    try:
+        # Act
+        sock.sendall(encode_frame(message.encode(), mask=os.urandom(4)))
+        _, reply = read_ws_frame(sock)
+        server.broadcast({"event": "saved", "path": "output/a.mp4"})
+        _, event = read_ws_frame(sock)
+        sock.sendall(encode_frame(b"hi", OP_PING, mask=os.urandom(4)))
+        pong = read_ws_frame(sock)
+
+        # Assert
+        reply = json.loads(reply)
+        assert reply["id"] == 7 and reply["result"] == {"frames": 300}
+        assert json.loads(event) == {"event": "saved", "path": "output/a.mp4"}
+        assert pong == (OP_PONG, b"hi")
+    finally:
+        sock.close()
+
+
+def test_commands_run_on_the_gui_thread():
+    # Arrange
+    from RePoste.gui import GuiCalls
+
+    app = QApplication.instance() or QApplication([])
+    threads = []
+
+    def status(params):
+        threads.append(threading.current_thread())
+        return {}
+
+    server = RemoteControlServer({"status": status}, call=GuiCalls().call)
+    server.start()
+    replies = []
+    client = threading.Thread(
+        target=lambda: replies.append(request(server, "GET", "/status"))
+    )
+
+    try:
+        # Act
+        client.start()
+        while client.is_alive():
+            app.processEvents()
+            client.join(0.01)
+
+        # Assert
+        assert replies[0][0] == 200
+        assert threads == [threading.main_thread()]
+    finally:
+        server.stop()
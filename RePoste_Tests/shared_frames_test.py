@@ -0,0 +1,259 @@
+import logging
+import os
+import time
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from RePoste.memory_governor import plan_buffer
+from RePoste.shared_frames import SPARE_SLOTS, CaptureProcess, FrameRing
+from RePoste.synthetic_camera import SyntheticReader
+from RePoste.video_manager import ProcessVideoRecorder
+
+SIZE = (64, 48)
+
+
+class LoggingReader(SyntheticReader):
+    """Logs from the capture process when it is opened."""
+
+    def get_meta_data(self):
+        logging.getLogger("reposte.video").warning("Opened in the child")
+        return super().get_meta_data()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def qapplication():
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "❌ Timed out"
+        QApplication.processEvents()
+        time.sleep(0.01)
+
+
+def test_ring_keeps_the_newest_frames_in_place():
+    # Arrange
+    ring = FrameRing.create((2, 2, 3), 4)
+
+    try:
+        # Act
+        for sequence in range(ring.slots + 5):
+            ring.publish(np.full((2, 2, 3), sequence % 256, np.uint8), 7)
+        frames, first = ring.views()
+        copies, copied_first = ring.copy_frames()
+
+        # Assert
+        newest = ring.slots + 4
+        assert ring.latest()[:2] == (newest, 7)
+        assert len(ring) == 4 and ring.maxlen == 4
+        assert first == copied_first == newest - 3
+        assert [int(frame[0, 0, 0]) for frame in frames] == list(
+            range(newest - 3, newest + 1)
+        )
+        assert ring.frame(0) is None, "❌ Frame 0 was overwritten"
+        assert np.shares_memory(frames[-1], ring.frames)
+        assert not np.shares_memory(copies[-1], ring.frames)
+    finally:
+        frames = copies = None
+        ring.close()
+
+
+def test_capture_process_fills_the_ring_until_paused(tmp_path):
+    # Arrange
+    capture = CaptureProcess(
+        fps=30,
+        buffer_duration=1,
+        output_dir=str(tmp_path),
+        camera_config={},
+        reader_factory=partial(SyntheticReader, SIZE, fps=30),
+    )
+
+    # Act
+    ring = capture.start()
+    name = ring.name
+    try:
+        wait_for(lambda: ring.written >= 5)
+        capture.pause()
+        time.sleep(0.2)
+        paused_at = ring.written
+        time.sleep(0.2)
+
+        # Assert
+        assert ring.slots == 30 + SPARE_SLOTS
+        assert ring.latest()[2].shape == (48, 64, 3)
+        assert ring.written == paused_at, "❌ Nothing is captured paused"
+        assert capture.error() is None
+    finally:
+        capture.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_capture_process_logs_reach_this_process(tmp_path, caplog):
+    # Arrange
+    capture = CaptureProcess(
+        fps=30,
+        buffer_duration=1,
+        output_dir=str(tmp_path),
+        camera_config={},
+        reader_factory=partial(LoggingReader, SIZE, fps=30),
+    )
+
+    # Act
+    capture.start()
+    try:
+        wait_for(lambda: "Opened in the child" in caplog.text)
+    finally:
+        capture.close()
+
+    # Assert
+    record = next(
+        r for r in caplog.records if r.getMessage() == "Opened in the child"
+    )
+    assert record.name == "reposte.video"
+    assert record.process != os.getpid(), "❌ Should be the child's record"
+
+
+def test_capture_process_stuck_in_a_read_is_terminated(tmp_path):
+    # Arrange, after the first frame the next is 10 s away
+    capture = CaptureProcess(
+        fps=1,
+        buffer_duration=1,
+        output_dir=str(tmp_path),
+        camera_config={},
+        reader_factory=partial(SyntheticReader, SIZE, fps=0.1),
+    )
+    ring = capture.start()
+    name = ring.name
+    wait_for(lambda: ring.written >= 1)
+    process = capture.process
+
+    # Act
+    started = time.monotonic()
+    stopped = capture.close(timeout=0.05)
+    elapsed = time.monotonic() - started
+
+    # Assert
+    assert not stopped, "❌ A terminated process should be reported"
+    assert elapsed < 1.0, "❌ close() should keep to its timeout"
+    wait_for(lambda: not process.is_alive())
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_capture_process_resize_carries_the_newest_frames_over(tmp_path):
+    # Arrange
+    capture = CaptureProcess(
+        fps=30,
+        buffer_duration=1,
+        output_dir=str(tmp_path),
+        camera_config={},
+        reader_factory=partial(SyntheticReader, SIZE, fps=30),
+    )
+    old = capture.start()
+    old_name = old.name
+    try:
+        wait_for(lambda: old.written >= 10)
+        capture.pause()
+        time.sleep(0.1)
+        written = old.written
+        newest = old.latest()[2].copy()
+        old = None
+
+        # Act
+        ring = capture.resize(5)
+        capture.resume()
+        wait_for(lambda: ring.written > written)
+
+        # Assert
+        assert ring.slots == 5 + SPARE_SLOTS and ring.maxlen == 5
+        assert np.array_equal(
+            ring.frame(written - 1), newest
+        ), "❌ Buffered frames should be carried over"
+        assert ring.frame(written - 6) is None, "❌ Only 5 frames fit"
+        assert capture.error() is None
+    finally:
+        capture.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=old_name)
+
+
+def test_process_recorder_shows_and_buffers_from_the_ring(tmp_path):
+    # Arrange
+    recorder = ProcessVideoRecorder(
+        fps=30,
+        buffer_duration=1,
+        output_dir=str(tmp_path),
+        camera_config={},
+        reader_factory=partial(SyntheticReader, SIZE, fps=30),
+    )
+    shown = []
+
+    # Act
+    recorder.start_recording(shown.append)
+    try:
+        wait_for(lambda: len(shown) >= 5)
+        snapshot, first = recorder.snapshot()
+        count = len(snapshot)
+        # Copied on the copy thread, iterating waits for it
+        frames = list(snapshot)
+        recorder.start_in_app_replay()
+        replay_frames = recorder.replay_frames
+
+        # Assert
+        ring = recorder.reader.ring
+        assert recorder.buffer is ring
+        assert recorder.counters.captured >= 5
+        assert frames and first == 0
+        assert len(frames) == count
+        assert recorder.ring_copy.done()
+        assert not np.shares_memory(
+            frames[0], ring.frames
+        ), "❌ Saves work on copies"
+        assert np.shares_memory(
+            replay_frames[0], ring.frames
+        ), "❌ The replay plays from the ring"
+    finally:
+        recorder.stop_in_app_replay()
+        replay_frames = None
+        recorder.stop_recording()
+    assert recorder.reader is None and len(recorder.buffer) == 0
+
+
+def test_process_recorder_sizes_the_ring_by_its_plan(tmp_path):
+    # Arrange, memory for 1 s of frames of the 4 s asked for
+    recorder = ProcessVideoRecorder(
+        fps=30,
+        buffer_duration=4,
+        output_dir=str(tmp_path),
+        camera_config={},
+        reader_factory=partial(SyntheticReader, SIZE, fps=30),
+    )
+    budget = 30 * SIZE[0] * SIZE[1] * 3
+    recorder.buffer_planner = lambda duration: plan_buffer(
+        duration, 30, SIZE, budget, recorder.frame_scales
+    )
+    shown = []
+
+    # Act
+    recorder.start_recording(shown.append)
+    try:
+        wait_for(lambda: shown)
+        planned = recorder.reader.ring.capacity
+        recorder.set_buffer_duration(2)
+        wait_for(lambda: len(shown) >= 3)
+
+        # Assert
+        assert planned == 30, "❌ The ring is allocated for the plan"
+        ring = recorder.reader.ring
+        assert recorder.buffer is ring and ring.maxlen == 60
+        assert recorder.buffer_duration == 2
+    finally:
+        recorder.stop_recording()
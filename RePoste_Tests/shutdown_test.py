@@ -0,0 +1,48 @@
+import time
+from unittest.mock import MagicMock
+
+from RePoste.shutdown import ShutdownCoordinator
+
+
+def test_shutdown_runs_steps_in_order_with_budgets():
+    # Arrange
+    calls = []
+    coordinator = ShutdownCoordinator(budget=0.5)
+    coordinator.add(
+        "first", lambda budget: calls.append(("first", budget)), 0.1
+    )
+    coordinator.add(
+        "second", lambda budget: calls.append(("second", budget)), 0.2
+    )
+
+    # Act
+    report = coordinator.run()
+
+    # Assert
+    assert calls == [
+        ("first", 0.1),
+        ("second", 0.2),
+    ], "❌ Steps should run in order and receive their budget"
+    assert report.ok, "❌ No step should have overrun"
+    assert set(report.elapsed) == {"first", "second"}
+
+
+def test_shutdown_reports_overruns_and_keeps_going():
+    # Arrange
+    last_step = MagicMock()
+    coordinator = ShutdownCoordinator(budget=0.5)
+    coordinator.add("slow", lambda budget: time.sleep(0.05), 0.01)
+    coordinator.add("gave up", lambda budget: False, 0.1)
+    coordinator.add("broken", MagicMock(side_effect=RuntimeError), 0.1)
+    coordinator.add("last", last_step, 0.1)
+
+    # Act
+    report = coordinator.run()
+
+    # Assert
+    assert report.overruns == [
+        "slow",
+        "gave up",
+        "broken",
+    ], "❌ Every step that blew its budget should be reported"
+    last_step.assert_called_once_with(0.1)
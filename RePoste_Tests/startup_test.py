@@ -0,0 +1,36 @@
+from RePoste.startup import StartupProfiler
+
+
+def test_startup_profiler_reports_once_all_milestones_are_in(capsys):
+    # Arrange
+    profiler = StartupProfiler(expected=("window shown", "camera ready"))
+
+    # Act
+    with profiler.phase("import gui"):
+        pass
+    profiler.mark("window shown")
+    before_camera = capsys.readouterr().out
+    profiler.mark("camera ready")
+    profiler.report()
+
+    # Assert
+    assert before_camera == "", "❌ Report should wait for every milestone"
+    output = capsys.readouterr().out
+    assert output.count("Startup profile:") == 1, "❌ Report prints once"
+    assert "import gui" in output
+    assert "camera ready" in output and "pending" not in output
+
+
+def test_startup_profiler_disabled_does_nothing(capsys):
+    # Arrange
+    profiler = StartupProfiler(enabled=False, expected=("window shown",))
+
+    # Act
+    with profiler.phase("import gui"):
+        pass
+    profiler.mark("window shown")
+    profiler.report()
+
+    # Assert
+    assert profiler.phases == [] and profiler.marks == {}
+    assert capsys.readouterr().out == ""
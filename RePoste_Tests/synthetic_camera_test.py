@@ -0,0 +1,106 @@
+import json
+import time
+
+import numpy as np
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from RePoste.synthetic_camera import SyntheticReader
+from RePoste.video_manager import VideoRecorder
+from RePoste_Tests import benchmark_video
+
+
+@pytest.fixture(scope="module", autouse=True)
+def qapplication():
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+def test_synthetic_reader_has_reader_interface():
+    # Arrange
+    reader = SyntheticReader((32, 24), fps=30, realtime=False)
+
+    # Act
+    first = reader.get_next_data()
+    second = reader.get_next_data()
+    meta = reader.get_meta_data()
+    reader.close()
+
+    # Assert
+    assert first.shape == (24, 32, 3), "❌ Frames should be height x width"
+    assert first.dtype == np.uint8
+    assert not np.array_equal(first, second), "❌ The pattern should move"
+    assert meta["size"] == (32, 24) and meta["fps"] == 30
+    assert reader.frame_count == 2
+    with pytest.raises(RuntimeError):
+        reader.get_next_data()
+
+
+def test_synthetic_reader_paces_frames_in_realtime():
+    # Arrange
+    reader = SyntheticReader((8, 8), fps=100)
+
+    # Act
+    started = time.perf_counter()
+    for _ in range(11):
+        reader.get_next_data()
+    elapsed = time.perf_counter() - started
+
+    # Assert
+    assert elapsed >= 0.095, "❌ 11 frames at 100 fps should take 100 ms"
+    assert reader.captured_at >= started
+
+
+def test_recorder_captures_from_reader_factory(tmp_path):
+    # Arrange
+    frames = []
+    recorder = VideoRecorder(
+        fps=30,
+        output_dir=str(tmp_path),
+        camera_config={},
+        reader_factory=lambda: SyntheticReader((16, 12), realtime=False),
+    )
+
+    # Act
+    recorder.start_recording(frames.append)
+    recorder.stop_recording()
+
+    # Assert
+    assert len(frames) == 1, "❌ The first frame should be shown"
+    assert recorder.capture_mode["size"] == (16, 12)
+    assert recorder.buffer[0].shape == (12, 16, 3)
+
+
+def test_benchmark_writes_json(tmp_path, monkeypatch):
+    # Arrange, a tiny frame size and short runs
+    monkeypatch.setitem(benchmark_video.RESOLUTIONS, "tiny", (32, 24))
+    output = tmp_path / "results.json"
+
+    # Act
+    benchmark_video.main(
+        [
+            "--resolutions",
+            "tiny",
+            "--capture-seconds",
+            "0.2",
+            "--save-seconds",
+            "0.1",
+            "--output",
+            str(output),
+        ]
+    )
+
+    # Assert
+    report = json.loads(output.read_text())
+    result = report["results"]["tiny"]
+    assert report["machine"]["python"], "❌ Machine info should be saved"
+    for key in (
+        "capture_fps",
+        "capture_to_paint_p99_ms",
+        "convert_frame_to_pixmap_ms",
+        "replay_step_avg_ms",
+        "buffer_bytes_per_second",
+    ):
+        assert key in result, f"❌ {key} should be measured"
+    assert result["capture_fps"] > 0
+    assert result["buffer_bytes_per_second"] == 60 * 32 * 24 * 3
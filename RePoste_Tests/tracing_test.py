@@ -0,0 +1,90 @@
+import json
+import threading
+
+import pytest
+
+from RePoste.tracing import Tracer, traced, tracer
+
+
+@pytest.fixture
+def app_tracer():
+    tracer.clear()
+    tracer.enable()
+    yield tracer
+    tracer.disable()
+    tracer.clear()
+
+
+def test_disabled_tracer_records_nothing():
+    # Arrange
+    disabled = Tracer(capacity=4)
+
+    # Act
+    with disabled.span("capture"):
+        pass
+
+    # Assert
+    assert disabled.spans() == [], "❌ A disabled tracer should not record"
+
+
+def test_ring_keeps_newest_spans():
+    # Arrange
+    ring = Tracer(capacity=4, enabled=True)
+
+    # Act
+    for i in range(6):
+        ring.record(f"span {i}", i * 1000, i * 1000 + 500)
+
+    # Assert
+    assert [span[0] for span in ring.spans()] == [
+        "span 2",
+        "span 3",
+        "span 4",
+        "span 5",
+    ], "❌ The oldest spans should be overwritten"
+    assert ring.spans()[0][2] == 500, "❌ Duration should be end - start"
+
+
+def test_traced_decorator_and_threads(app_tracer):
+    # Arrange
+    @traced("encode")
+    def encode(value):
+        return value * 2
+
+    # Act
+    result = encode(21)
+    worker = threading.Thread(target=encode, args=(1,), name="replay-save")
+    worker.start()
+    worker.join()
+
+    # Assert
+    assert result == 42, "❌ The decorated function should still work"
+    spans = app_tracer.spans()
+    assert [span[0] for span in spans] == ["encode", "encode"]
+    assert spans[0][3] != spans[1][3], "❌ Threads should be told apart"
+
+
+def test_dump_writes_chrome_trace(app_tracer, tmp_path):
+    # Arrange
+    with app_tracer.span("camera read"):
+        with app_tracer.span("convert"):
+            pass
+
+    # Act
+    path = app_tracer.dump(str(tmp_path / "trace.json"))
+
+    # Assert
+    with open(path) as file:
+        trace = json.load(file)
+    events = trace["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    names = [event for event in events if event["ph"] == "M"]
+    assert [span["name"] for span in spans] == ["camera read", "convert"]
+    outer, inner = spans
+    assert outer["ts"] <= inner["ts"], "❌ ts should be in start order"
+    assert (
+        inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    ), "❌ The nested span should lie within its parent"
+    assert "MainThread" in [
+        event["args"]["name"] for event in names
+    ], "❌ Threads should be named in the trace"
@@ -1,14 +1,28 @@
 import os
 import sys
+import time
 import pytest
 import logging
 import numpy as np
 from unittest.mock import MagicMock, patch
 from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
+from collections import deque
 from datetime import datetime
 
-from RePoste.video_manager import VideoRecorder
+from RePoste.video_manager import (
+    VideoRecorder,
+    camera_uri,
+    check_capture_mode,
+    mode_input_params,
+)
+
+MODE_1080P60 = {
+    "pixel_format": "mjpeg",
+    "width": 1920,
+    "height": 1080,
+    "fps": 60.0,
+}
 
 
 # Fixture to create a VideoRecorder instance with mocked dependencies
@@ -54,6 +68,98 @@ def test_start_recording():
     mock_reader.assert_called_once_with("<video0>", "ffmpeg")
 
 
+def test_start_recording_forces_configured_mode(caplog):
+    # Arrange
+    recorder = VideoRecorder(
+        camera_config={"camera_path": "/dev/video2", "mode": MODE_1080P60}
+    )
+    reader = MagicMock()
+    reader.get_meta_data.return_value = {
+        "size": (1920, 1080),
+        "fps": 30.0,
+        "codec": "mjpeg",
+    }
+
+    # Act
+    with (
+        patch("sys.platform", "linux"),
+        patch("imageio.get_reader", return_value=reader) as mock_reader,
+    ):
+        recorder.start_recording(MagicMock())
+
+    # Assert
+    mock_reader.assert_called_once_with(
+        "<video2>",
+        "ffmpeg",
+        input_params=mode_input_params(MODE_1080P60, "linux"),
+    )
+    assert recorder.capture_mismatches == [
+        "30 fps instead of 60"
+    ], "❌ A camera falling back to 30 fps should be reported"
+    assert "did not accept the configured mode" in caplog.text
+
+
+def test_camera_uri_and_mode_params():
+    # Assert
+    assert camera_uri({"camera_path": "/dev/video1"}, "linux") == "<video1>"
+    assert camera_uri({"camera_path": "@device_pnp_x"}, "linux") is None
+    assert camera_uri(
+        {"camera_path": "@device_pnp_x", "index": 1}, "win32"
+    ) == ("<video1>")
+    assert mode_input_params(MODE_1080P60, "linux") == [
+        "-input_format",
+        "mjpeg",
+        "-video_size",
+        "1920x1080",
+        "-framerate",
+        "60",
+    ]
+    assert mode_input_params(MODE_1080P60, "win32")[:2] == [
+        "-vcodec",
+        "mjpeg",
+    ]
+
+
+def test_check_capture_mode():
+    # Assert
+    assert (
+        check_capture_mode(
+            MODE_1080P60,
+            {"size": (1920, 1080), "fps": 59.94, "codec": "mjpeg"},
+        )
+        == []
+    )
+    assert check_capture_mode(
+        MODE_1080P60, {"size": (640, 480), "fps": 5.0, "codec": "rawvideo"}
+    ) == [
+        "size 640x480 instead of 1920x1080",
+        "5 fps instead of 60",
+        "rawvideo instead of mjpeg",
+    ]
+
+
+def test_start_recording_in_background(qapplication):
+    # Arrange
+    recorder = VideoRecorder()
+    ready = []
+
+    # Act
+    with patch("imageio.get_reader", return_value=MagicMock()) as mock_reader:
+        recorder.start_recording(
+            MagicMock(), background=True, ready_callback=ready.append
+        )
+        deadline = time.monotonic() + 5
+        while not ready and time.monotonic() < deadline:
+            qapplication.processEvents()
+
+    # Assert
+    assert ready == [True], "❌ ready_callback should report success"
+    assert (
+        recorder.reader is mock_reader.return_value
+    ), "❌ The reader opened in the background should be used"
+    recorder.stop_recording()
+
+
 def test_start_recording_exception():
     # Arrange
     recorder = VideoRecorder()
@@ -292,7 +398,7 @@ def test_save_replay(recorder):
     ) as mock_get_writer:
         timestamp = "2025-02-18_12-30-00"
 
-        with patch("RePoste.video_manager.datetime") as mock_datetime:
+        with patch("recorder_core.datetime") as mock_datetime:
             mock_datetime.now.return_value = datetime(2025, 2, 18, 12, 30, 0)
 
             recorder.save_replay()
@@ -331,6 +437,25 @@ def test_save_replay_with_custom_filename(recorder):
         mock_writer.close.assert_not_called()
 
 
+def test_save_replay_in_background(recorder):
+    # Arrange
+    mock_writer = MagicMock()
+    recorder.buffer = [np.zeros((2, 2, 3), dtype=np.uint8)] * 3
+    with patch("imageio.get_writer", return_value=mock_writer):
+        # Act
+        future = recorder.save_replay("background.mp4", background=True)
+        recorder.buffer.clear()  # The save works on a snapshot
+        finished = recorder.wait_for_saves(timeout=5)
+
+    # Assert
+    assert finished is True, "❌ Background save should have finished"
+    assert future.done(), "❌ save_replay() should return the Future"
+    assert (
+        mock_writer.__enter__.return_value.append_data.call_count == 3
+    ), "❌ All buffered frames should be written"
+    assert not recorder.pending_saves, "❌ Finished saves should be dropped"
+
+
 def test_save_replay_failure(recorder, caplog):
     # Arrange
     with patch("imageio.get_writer", side_effect=Exception("Mocked error")):
@@ -351,14 +476,48 @@ def test_set_buffer_duration(recorder):
     # Assert
     expected_buffer_length = recorder.fps * 10  # 30 FPS * 10 seconds
     assert (
-        len(recorder.buffer) == expected_buffer_length
-    ), f"Buffer length should be {expected_buffer_length}."
+        recorder.buffer.maxlen == expected_buffer_length
+    ), f"Buffer capacity should be {expected_buffer_length}."
+    assert recorder.buffer_duration == 10, "❌ Duration should be stored"
     recorder.replay_manager.buffer = recorder.buffer
     assert (
         recorder.replay_manager.buffer == recorder.buffer
     ), "❌ The replay manager's buffer was not updated correctly."
 
 
+def test_set_buffer_duration_keeps_newest_frames(recorder):
+    # Arrange
+    frames = [np.full((2, 2, 3), i, dtype=np.uint8) for i in range(90)]
+    recorder.buffer = deque(frames, maxlen=90)
+
+    # Act
+    recorder.set_buffer_duration(2)  # 60 frames at 30 FPS
+    shrunk = list(recorder.buffer)
+    recorder.set_buffer_duration(4)
+
+    # Assert
+    assert shrunk == frames[30:], "❌ Shrinking should keep the newest frames"
+    assert (
+        list(recorder.buffer) == frames[30:]
+    ), "❌ Growing should keep every buffered frame"
+    stats = recorder.buffer_stats()
+    assert stats["capacity_seconds"] == 4, "❌ Capacity should be 4 s"
+    assert stats["fill_seconds"] == 2, "❌ Fill should be 2 s"
+    assert stats["fill_bytes"] == 60 * 12, "❌ Fill should count frame bytes"
+    assert recorder.buffer_cost(10) == 300 * 12, "❌ Wrong candidate cost"
+
+
+def test_buffer_cost_from_capture_mode(recorder):
+    # Arrange, no frame captured yet
+    recorder.capture_mode = {"size": (1920, 1080)}
+
+    # Act
+    cost = recorder.buffer_cost(5)
+
+    # Assert
+    assert cost == 30 * 5 * 1920 * 1080 * 3, "❌ Cost should use the mode"
+
+
 def test_start_in_app_replay(recorder, caplog):
     # Arrange
     recorder.buffer = [